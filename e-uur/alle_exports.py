@@ -0,0 +1,57 @@
+from modules.selenium import EuurSessionManager
+from modules.env_tool import env_check
+import plaatsing_inactief
+import ontbrekende_uren
+import plaatsing_actief
+import looncomponenten
+import urenrapportage
+import logging
+import time
+import os
+
+# Exports die na elkaar in dezelfde browser sessie draaien
+EXPORTS = [
+    ("Plaatsingen actief", plaatsing_actief.main),
+    ("Plaatsingen inactief", plaatsing_inactief.main),
+    ("Looncomponenten", looncomponenten.main),
+    ("Ontbrekende uren", ontbrekende_uren.main),
+    ("Urenrapportage", urenrapportage.main),
+]
+
+def main():
+    """
+    Draai alle E-Uur exports na elkaar in één gedeelde, ingelogde browser sessie,
+    zodat Chrome één keer start en er één keer ingelogd wordt.
+    Een mislukte export stopt de overige exports niet.
+    """
+    
+    # Lokaal of productieomgeving bepaling
+    env_check()
+    
+    # Verbindingsinstellingen
+    euurusername = os.getenv('EUURUSERNAME')
+    euurpassword = os.getenv('EUURPASSWORD')
+    euururl = os.getenv('EUURURL')
+    base_dir = os.getenv("BASE_DIR")
+    download_dir = os.path.join(base_dir, "stiek/file")
+    
+    mislukt = []
+    start_time = time.time()
+    
+    with EuurSessionManager(euururl, euurusername, euurpassword, download_dir) as sessie:
+        # Chrome start op de achtergrond terwijl de eerste export zijn configuratie ophaalt
+        sessie.selenium_manager.prewarm()
+        for naam, export in EXPORTS:
+            logging.info(f"Start export: {naam}")
+            try:
+                export(sessie=sessie)
+            except Exception as e:
+                logging.error(f"Export {naam} mislukt: {e}")
+                mislukt.append(naam)
+    
+    logging.info(f"{len(EXPORTS)} exports verwerkt in {time.time() - start_time:.0f}s met {sessie.logins} login(s)")
+    if mislukt:
+        raise RuntimeError(f"Mislukte exports: {', '.join(mislukt)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark van de writer backends van DatabaseManager.
+
+Vergelijkt de doorvoer (rijen per seconde) van de huidige to_sql route met
+de executemany writer op een UrenRapportage-achtige tabel. Draai dit tegen
+een lokale SQL Server container, bijvoorbeeld:
+
+    docker run -e ACCEPT_EULA=Y -e MSSQL_SA_PASSWORD=Bench_Wachtwoord1 -p 1433:1433 -d mcr.microsoft.com/mssql/server:2022-latest
+    
+    export BENCH_CONNECTION_STRING="DRIVER={ODBC Driver 18 for SQL Server};SERVER=localhost;DATABASE=master;UID=sa;PWD=Bench_Wachtwoord1;Encrypt=no;"
+    python benchmarks/bench_database_writer.py --rows 50000
+"""
+from pathlib import Path
+from datetime import datetime, timedelta
+import argparse
+import logging
+import time
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.database import DatabaseManager
+from modules.type_mapping import TypeMapper
+
+
+BENCH_TABLE = "BenchUrenRapportage"
+
+# Subset van de UrenRapportage kolommen met alle voorkomende SQL types
+BENCH_COLUMNS = {
+    "Datum": "date",
+    "Jaar": "int",
+    "Aantal uren": "decimal",
+    "Starttijd": "time",
+    "Projectnaam": "nvarchar",
+    "Status": "nvarchar",
+    "Tarief": "decimal",
+    "Plaatsing": "bigint",
+    "werknemer": "nvarchar",
+    "Laatst gewijzigd": "datetime",
+    "Id": "bigint",
+    "Callcenter": "bit",
+}
+
+SQL_DDL_TYPES = {
+    "date": "date",
+    "int": "int",
+    "decimal": "decimal(18, 2)",
+    "time": "time",
+    "nvarchar": "nvarchar(255)",
+    "bigint": "bigint",
+    "datetime": "datetime",
+    "bit": "bit",
+}
+
+
+def generate_frame(rows):
+    """
+    Genereer een synthetisch, al geconverteerd UrenRapportage DataFrame.
+    """
+    rng = np.random.default_rng(42)
+    start = datetime(2024, 1, 1)
+    raw = pd.DataFrame({
+        "Datum": [(start + timedelta(days=int(d))).strftime('%d-%m-%Y') for d in rng.integers(0, 365, rows)],
+        "Jaar": 2024,
+        "Aantal uren": rng.uniform(0, 12, rows),
+        "Starttijd": "08:30",
+        "Projectnaam": [f"Project {i % 250}" for i in range(rows)],
+        "Status": rng.choice(["Geaccordeerd", "Ingediend", "Afgewezen"], rows),
+        "Tarief": rng.uniform(15, 60, rows),
+        "Plaatsing": rng.integers(100000, 999999, rows),
+        "werknemer": [f"Werknemer {i % 1000}" for i in range(rows)],
+        "Laatst gewijzigd": (start + timedelta(hours=3)).strftime('%d-%m-%Y %H:%M'),
+        "Id": np.arange(rows),
+        "Callcenter": rng.choice(["Ja", "Nee"], rows),
+    })
+    type_mapper = TypeMapper()
+    return type_mapper.convert_column_types(raw, BENCH_COLUMNS)
+
+
+def recreate_table(database_manager):
+    column_ddl = ', '.join(f"[{column}] {SQL_DDL_TYPES[sql_type]}" for column, sql_type in BENCH_COLUMNS.items())
+    with database_manager.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS dbo.[{BENCH_TABLE}]")
+        cursor.execute(f"CREATE TABLE dbo.[{BENCH_TABLE}] ({column_ddl})")
+        connection.commit()
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--writers", nargs="+", default=["to_sql", "executemany"])
+    args = parser.parse_args()
+    
+    connection_string = os.getenv("BENCH_CONNECTION_STRING")
+    if not connection_string:
+        sys.exit("Zet BENCH_CONNECTION_STRING naar een lokale (test) SQL Server database.")
+    
+    logging.basicConfig(level=logging.WARNING)
+    df = generate_frame(args.rows)
+    database_manager = DatabaseManager(connection_string)
+    
+    print(f"{args.rows} rijen, batch_size={args.batch_size}")
+    for writer in args.writers:
+        recreate_table(database_manager)
+        start = time.perf_counter()
+        ok = database_manager.fill_table(df, BENCH_TABLE, args.batch_size, column_types=BENCH_COLUMNS, writer=writer)
+        duration = time.perf_counter() - start
+        status = "ok" if ok else "MISLUKT"
+        print(f"{writer:>12}: {duration:8.2f}s  {args.rows / duration:10.0f} rijen/s  ({status})")
+    
+    with database_manager.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS dbo.[{BENCH_TABLE}]")
+        connection.commit()
+        cursor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark van de Excel reader engines van ExcelProcessor.
+
+Genereert een synthetische export in de vorm van een E-Uur download (titelrijen
+boven de kolomnamen, totaalregels onder de data) voor een tabel uit de
+TypeMapper, en vergelijkt per engine de leestijd met de oude route
+(clean_excel + pd.read_excel). De Excel engines moeten hetzelfde DataFrame
+opleveren als de oude route; een afwijking geeft exit code 1.
+
+    python benchmarks/bench_excel_readers.py --rows 50000
+    python benchmarks/bench_excel_readers.py --tabel Plaatsingen --rows 20000
+    python benchmarks/bench_excel_readers.py --bestand "stiek/file/Urenrapportage.xlsx"
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+import tempfile
+import argparse
+import logging
+import shutil
+import time
+import csv
+import sys
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.excel_processing import ExcelProcessor, READER_ENGINES, CalamineWorkbook
+from modules.type_mapping import TypeMapper
+
+
+def generate_values(sql_type, rows, rng):
+    """
+    Genereer een kolom met waarden zoals ze in een E-Uur export staan.
+    """
+    start = datetime(2024, 1, 1)
+    if sql_type in ('int', 'bigint'):
+        return [int(value) for value in rng.integers(1, 999999, rows)]
+    if sql_type == 'decimal':
+        return [round(float(value), 2) for value in rng.uniform(0, 100, rows)]
+    if sql_type == 'bit':
+        return list(rng.choice(["Ja", "Nee"], rows))
+    if sql_type == 'date':
+        return [start + timedelta(days=int(days)) for days in rng.integers(0, 365, rows)]
+    if sql_type == 'datetime':
+        return [start + timedelta(minutes=int(minutes)) for minutes in rng.integers(0, 525600, rows)]
+    if sql_type == 'time':
+        return [f"{int(hour):02d}:{int(minute):02d}" for hour, minute in zip(rng.integers(6, 20, rows), rng.choice([0, 15, 30, 45], rows))]
+    return [f"Tekst {int(value)}" for value in rng.integers(0, 500, rows)]
+
+
+def generate_export(directory, table, rows):
+    """
+    Schrijf een synthetische export als .xlsx en als .csv (';' gescheiden, decimale komma).
+    
+    Returns:
+        Tuple[Path, Path]: Pad naar het Excel en het CSV bestand
+    """
+    column_types = TypeMapper().get_type_mapping(table)
+    if column_types is None:
+        sys.exit(f"Geen type mapping voor tabel '{table}'")
+    
+    rng = np.random.default_rng(42)
+    columns = {column: generate_values(sql_type, rows, rng) for column, sql_type in column_types.items()}
+    header = list(columns)
+    data = list(zip(*columns.values()))
+    
+    xlsx_path = Path(directory) / f"{table}.xlsx"
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([None, f"{table} export"])
+    sheet.append([None, "Periode 01-01-2024 t/m 31-12-2024"])
+    sheet.append([])
+    sheet.append(header)
+    for row in data:
+        sheet.append(row)
+    sheet.append([])
+    sheet.append([None, "Totaal", rows])
+    workbook.save(xlsx_path)
+    
+    csv_path = Path(directory) / f"{table}.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as csv_file:
+        writer = csv.writer(csv_file, delimiter=";")
+        writer.writerow(header)
+        for row in data:
+            writer.writerow([
+                value.strftime('%d-%m-%Y %H:%M') if isinstance(value, datetime)
+                else str(value).replace(".", ",") if isinstance(value, float)
+                else value
+                for value in row
+            ])
+    return xlsx_path, csv_path
+
+
+def time_call(function, repeat):
+    """
+    Voer een functie herhaald uit en geef de snelste tijd en het laatste resultaat terug.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tabel", default="UrenRapportage")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--bestand", help="Bestaande export in plaats van synthetische data")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    excel_processor = ExcelProcessor()
+    dtype = TypeMapper().get_reader_options(args.tabel)['dtype']
+    workdir = Path(tempfile.mkdtemp(prefix="bench_excel_"))
+    
+    try:
+        if args.bestand:
+            xlsx_path, csv_path = Path(args.bestand), None
+        else:
+            xlsx_path, csv_path = generate_export(workdir, args.tabel, args.rows)
+        
+        def legacy():
+            # Oude route: kopie opschonen en opslaan, daarna opnieuw inlezen
+            copy_path = workdir / f"legacy{xlsx_path.suffix}"
+            shutil.copy(xlsx_path, copy_path)
+            excel_processor.clean_excel(copy_path)
+            return pd.read_excel(copy_path)
+        
+        legacy_time, expected = time_call(legacy, args.repeat)
+        print(f"{args.tabel}: {len(expected)} rijen, {len(expected.columns)} kolommen, beste van {args.repeat}")
+        print(f"{'legacy':>20}: {legacy_time:8.2f}s")
+        
+        failed = False
+        for engine in READER_ENGINES:
+            if engine == 'calamine' and CalamineWorkbook is None:
+                print(f"{engine:>20}: overgeslagen (python-calamine niet geïnstalleerd)")
+                continue
+            path = csv_path if engine == 'csv' else xlsx_path
+            if path is None:
+                continue
+            
+            for hints in (None, dtype):
+                label = f"{engine}+dtype" if hints else engine
+                duration, df = time_call(lambda: excel_processor.read_excel_streaming(path, engine=engine, dtype=hints), args.repeat)
+                
+                # Excel engines zonder hints moeten exact de oude uitkomst geven
+                status = ""
+                if engine != 'csv' and not hints:
+                    try:
+                        pd.testing.assert_frame_equal(expected, df)
+                        status = "gelijk"
+                    except AssertionError as e:
+                        status = f"AFWIJKING: {str(e).splitlines()[0]}"
+                        failed = True
+                elif len(df) != len(expected):
+                    status = f"AFWIJKING: {len(df)} rijen"
+                    failed = True
+                print(f"{label:>20}: {duration:8.2f}s  {legacy_time / duration:5.1f}x  {status}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Benchmark van de laadtijd van een E-Uur pagina met het oude en het nieuwe browser profiel.
+
+Start een lokale mock van de E-Uur UI: een grid dat met JavaScript opgebouwd
+wordt, plus afbeeldingen, webfonts en een analytics script die elk met een
+vertraging geserveerd worden, zoals bij een externe server. Per profiel wordt
+de tijd gemeten tot de pagina geladen is en de grid rijen zichtbaar zijn, en
+hoeveel van die vertraagde requests de server bereikt hebben.
+
+Het scraping profiel wordt net als in productie via start_session gestart en
+nogmaals gemeten na een export via download_excel, zodat ook de toestand van
+het Network domein na een export meetelt. Als het grid niet opgebouwd wordt
+(bijv. omdat JavaScript uit staat) of de blokkade na de export niet meer
+werkt, geeft de benchmark exit code 1.
+
+    python benchmarks/bench_page_load.py
+    python benchmarks/bench_page_load.py --afbeeldingen 60 --vertraging 0.1 --repeat 5
+    python benchmarks/bench_page_load.py --zichtbaar
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium import webdriver
+from pathlib import Path
+import statistics
+import threading
+import tempfile
+import argparse
+import logging
+import shutil
+import time
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.selenium import SeleniumManager
+from modules.chromedriver import resolve_chromedriver
+
+
+def build_page(images, rows):
+    """
+    De HTML van de mock pagina: een grid met rijen zoals het plaatsingen overzicht.
+    """
+    image_tags = "".join(f'<img src="/img/foto-{index}.png" width="16" height="16">' for index in range(images))
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<link rel="stylesheet" href="/static/app.css">
+<style>@font-face {{ font-family: Awesome; src: url('/fonts/awesome.woff2'); }}</style>
+<script src="/analytics/www.google-analytics.com/analytics.js" async></script>
+</head>
+<body>
+<div data-id="dashboard">{image_tags}</div>
+<button title="Excel" data-controller="excel"></button>
+<button title="Excel" data-controller="excel" onclick="window.location='/export'">Excel</button>
+<table id="grid"><tbody></tbody></table>
+<script src="/static/app.js"></script>
+<script>renderGrid({rows});</script>
+</body>
+</html>""".encode()
+
+
+APP_JS = b"""
+function renderGrid(rows) {
+    var body = document.querySelector('#grid tbody');
+    for (var i = 0; i < rows; i++) {
+        var row = document.createElement('tr');
+        row.setAttribute('module', 'confirmedassignmentmerger');
+        row.setAttribute('objectid', String(i));
+        row.innerHTML = '<td><span class="value">Plaatsing ' + i + '</span></td>';
+        body.appendChild(row);
+    }
+}
+"""
+
+
+EXPORT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def make_handler(page, delay, counter):
+    """
+    Request handler voor de mock server; alles behalve de pagina zelf, de export
+    en de statische bestanden krijgt een vertraging en wordt geteld in counter.
+    """
+    class MockEuurHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            headers = {}
+            if self.path == "/":
+                body, content_type = page, "text/html"
+            elif self.path == "/export":
+                body, content_type = b"PK\x03\x04" + b"\0" * 4096, EXPORT_TYPE
+                headers["Content-Disposition"] = 'attachment; filename="Export.xlsx"'
+                headers["Cache-Control"] = "no-store"
+            elif self.path == "/static/app.js":
+                body, content_type = APP_JS, "application/javascript"
+            elif self.path == "/static/app.css":
+                body, content_type = b"td { padding: 2px; }", "text/css"
+            else:
+                with counter['lock']:
+                    counter['requests'] += 1
+                time.sleep(delay)
+                if self.path.endswith(".png"):
+                    content_type = "image/png"
+                elif self.path.endswith(".woff2"):
+                    content_type = "font/woff2"
+                else:
+                    content_type = "application/javascript"
+                body = b"\0" * 2048
+            
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            headers.setdefault("Cache-Control", "max-age=3600")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    return MockEuurHandler
+
+
+def legacy_driver(headless):
+    """
+    Chrome met de oude opties van SeleniumManager (--disable-images en
+    --disable-javascript, en de oude headless modus).
+    """
+    options = Options()
+    for argument in ("--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage", "--disable-extensions",
+                     "--disable-plugins", "--disable-images", "--disable-javascript"):
+        options.add_argument(argument)
+    if headless:
+        options.add_argument("--headless")
+    driver_path = resolve_chromedriver()
+    service = Service(driver_path) if driver_path else Service()
+    return webdriver.Chrome(service=service, options=options)
+
+
+def measure(driver, url, rows, repeat):
+    """
+    Meet per herhaling de tijd tot het load event en de grid rijen.
+    
+    Returns:
+        Tuple[list, bool]: De laadtijden en of het grid volledig opgebouwd werd
+    """
+    durations = []
+    complete = True
+    for _ in range(repeat):
+        start = time.perf_counter()
+        driver.get(url)
+        try:
+            WebDriverWait(driver, 30, poll_frequency=0.05).until(
+                lambda d: len(d.find_elements(By.CSS_SELECTOR, "tr[module='confirmedassignmentmerger']")) == rows
+            )
+        except Exception:
+            complete = False
+        durations.append(time.perf_counter() - start)
+    return durations, complete
+
+
+def run_profile(label, driver, url, args, counter, baseline):
+    """
+    Meet één profiel en print de mediaan, de versnelling en het aantal vertraagde
+    requests per pagina dat niet geblokkeerd werd.
+    
+    Returns:
+        Tuple[float, bool, float]: De mediaan, of het grid opgebouwd werd en de requests per pagina
+    """
+    with counter['lock']:
+        counter['requests'] = 0
+    durations, complete = measure(driver, url, args.rijen, args.repeat)
+    per_page = counter['requests'] / args.repeat
+    
+    median = statistics.median(durations)
+    baseline = baseline or median
+    status = "" if complete else "GRID NIET OPGEBOUWD"
+    print(f"{label:>20}: {median:8.3f}s  {baseline / median:5.1f}x  "
+          f"(eerste {durations[0]:.3f}s, daarna {min(durations[1:] or durations):.3f}s)  "
+          f"{per_page:5.1f} requests niet geblokkeerd  {status}")
+    return median, complete, per_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--afbeeldingen", type=int, default=40)
+    parser.add_argument("--rijen", type=int, default=200)
+    parser.add_argument("--vertraging", type=float, default=0.05, help="Vertraging in seconden per afbeelding, font en analytics request")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--zichtbaar", action="store_true", help="Chrome niet headless starten")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    page = build_page(args.afbeeldingen, args.rijen)
+    counter = {'requests': 0, 'lock': threading.Lock()}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(page, args.vertraging, counter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    workdir = Path(tempfile.mkdtemp(prefix="bench_page_load_"))
+    
+    print(f"Mock E-Uur pagina: {args.afbeeldingen} afbeeldingen, {args.rijen} rijen, "
+          f"{args.vertraging * 1000:.0f}ms vertraging, mediaan van {args.repeat}")
+    
+    # Het analytics pad van de mock matcht het google-analytics.com patroon
+    selenium_manager = SeleniumManager({
+        'download_dir': str(workdir / "downloads"),
+        'headless': not args.zichtbaar,
+        'cookie_cache': False
+    })
+    
+    failed = False
+    try:
+        driver = legacy_driver(not args.zichtbaar)
+        try:
+            baseline, complete, _ = run_profile("oud profiel", driver, url, args, counter, None)
+        finally:
+            driver.quit()
+        failed = not complete
+        
+        # Het scraping profiel zoals in productie: start_session en daarna een export
+        if not selenium_manager.start_session():
+            print("Browser sessie kon niet gestart worden")
+            sys.exit(1)
+        _, complete, per_page = run_profile("scraping profiel", selenium_manager.driver, url, args, counter, baseline)
+        failed = failed or not complete or per_page > 0
+        
+        if not selenium_manager.download_excel("Export.xlsx"):
+            print("Export via download_excel mislukt")
+            failed = True
+        _, complete, per_page = run_profile("na export", selenium_manager.driver, url, args, counter, baseline)
+        if per_page:
+            print("Blokkade van afbeeldingen, fonts en analytics werkt niet meer na de export")
+        failed = failed or not complete or per_page > 0
+    finally:
+        selenium_manager.close_session()
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
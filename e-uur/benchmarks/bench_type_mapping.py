@@ -0,0 +1,89 @@
+"""
+Micro-benchmark van de TypeMapper conversies voor bit en decimal kolommen.
+
+Vergelijkt de oude per-cel lambda's met de gevectoriseerde conversie op een
+UrenRapportage-achtig DataFrame en controleert dat de uitkomst gelijk is
+(ontbrekende waarden None/NaN/NA tellen als gelijk).
+
+    python benchmarks/bench_type_mapping.py --rows 200000
+"""
+from pathlib import Path
+import argparse
+import time
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules.type_mapping import TypeMapper
+
+
+def legacy_decimal(column_data):
+    return pd.to_numeric(column_data, errors='coerce').apply(
+        lambda x: round(x, 2) if pd.notna(x) else None
+    )
+
+
+def legacy_bit(column_data):
+    return column_data.apply(
+        lambda x: True if str(x).strip().lower() in ['ja', 'true', '1'] else 
+                 (False if str(x).strip().lower() in ['nee', 'false', '0'] else None)
+    )
+
+
+def generate_frame(rows):
+    rng = np.random.default_rng(42)
+    bit_values = np.array(["Ja", "Nee", " ja ", "NEE", "1", "0", "true", "False", "", None, np.nan, "onbekend"], dtype=object)
+    decimals = rng.uniform(0, 80, rows).round(4).astype(object)
+    decimals[rng.random(rows) < 0.02] = "n.v.t."
+    decimals[rng.random(rows) < 0.02] = None
+    return pd.DataFrame({
+        "Callcenter": rng.choice(bit_values, rows),
+        "Aantal uren": decimals,
+        "Tarief": rng.uniform(10, 60, rows).astype(str),
+    })
+
+
+def as_comparable(series):
+    """
+    Zet een kolom om naar object waarden met None voor ontbrekende waarden.
+    """
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    
+    df = generate_frame(args.rows)
+    type_mapper = TypeMapper()
+    columns = {"Callcenter": "bit", "Aantal uren": "decimal", "Tarief": "decimal"}
+    legacy = {"bit": legacy_bit, "decimal": legacy_decimal}
+    
+    print(f"{args.rows} rijen")
+    all_equal = True
+    for column, dtype in columns.items():
+        old, old_time = timed(legacy[dtype], df[column])
+        new, new_time = timed(type_mapper._convert_single_column, df[column], column, dtype)
+        equal = as_comparable(old) == as_comparable(new)
+        all_equal = all_equal and equal
+        print(
+            f"{column:>12} ({dtype:>7}): oud {old_time:7.3f}s  nieuw {new_time:7.3f}s  "
+            f"x{old_time / max(new_time, 1e-9):6.1f}  {'gelijk' if equal else 'VERSCHIL'}"
+        )
+    
+    if not all_equal:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,8 @@ def main():
     # Initialiseer de class-based modules
     type_mapper = TypeMapper()
 
+    database_manager = None
+
     try:
         for klantnaam, (klant_connection_string, type) in connection_dict.items():
             if klantnaam == "Stiek":
@@ -94,6 +96,10 @@ def main():
         logging.error(f"Script mislukt: {e}")
         raise
     finally:
+        # Verbindingsstatistieken loggen
+        if database_manager:
+            database_manager.close()
+
         # Eindtijd logging en cleanup
         logger_manager.end_log()
         logger_manager.close()
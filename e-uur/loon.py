@@ -1,5 +1,6 @@
 from modules.selenium import EuurLoonPerPlaatsingDownloader
 from modules.database import DatabaseManager
+from modules.staging import StagingStore
 from modules.type_mapping import TypeMapper
 from modules.config import ConfigManager
 from modules.env_tool import env_check
@@ -7,12 +8,17 @@ from modules.log import LoggerManager
 import pandas as pd
 import logging
 import time
+import sys
 import os
 
 
-def main():
+def main(vanaf_staging=False):
     """
     Hoofdfunctie voor het ophalen en verwerken van looncomponenten uit E-Uur.
+    
+    Args:
+        vanaf_staging: Indien True wordt het laatste extract uit staging geladen
+                       in plaats van opnieuw uit E-Uur te scrapen
     """
     
     # Lokaal of productieomgeving bepaling
@@ -32,6 +38,10 @@ def main():
     euurusername = os.getenv('EUURUSERNAME')
     euurpassword = os.getenv('EUURPASSWORD')
     euururl = os.getenv('EUURURL')
+    # Optioneel: deep link naar een plaatsing met {plaatsing_id}, bijv. https://.../plaatsing/{plaatsing_id};
+    # zonder deze instelling wordt de link afgeleid van de eerste plaatsing die via het overzicht geopend wordt
+    euurplaatsingurl = os.getenv('EUURPLAATSINGURL')
+    base_dir = os.getenv("BASE_DIR")
     driver = '{ODBC Driver 18 for SQL Server}'
     greit_connection_string = f'DRIVER={driver};SERVER={server};DATABASE={database};UID={username};PWD={password};Encrypt=no;TrustServerCertificate=no;Connection Timeout=30;'
 
@@ -62,7 +72,10 @@ def main():
 
     # Initialiseer de class-based modules
     type_mapper = TypeMapper()
-    loon_downloader = EuurLoonPerPlaatsingDownloader()
+    loon_downloader = EuurLoonPerPlaatsingDownloader(plaatsing_url=euurplaatsingurl)
+    staging_store = StagingStore(base_dir)
+
+    database_manager = None
 
     try:
         for klantnaam, (klant_connection_string, type) in connection_dict.items():
@@ -72,44 +85,55 @@ def main():
                 # DatabaseManager initialiseren
                 database_manager = DatabaseManager(klant_connection_string)
 
-                # Ophalen plaatsing data (actief én inactief)
-                plaatsing_df = database_manager.fetch_plaatsing_data("Plaatsingen")
-                plaatsingen_lijst = plaatsing_df[['ID', 'Werknemer']].to_dict('records')
-
-                # Ophalen bestaande loon-ID's
-                bestaande_loon_ids = database_manager.fetch_loon_ids("Loon", "ID")
-
-                # Filter plaatsingen waarvoor nog geen loondata is
-                nieuwe_plaatsingen = [p for p in plaatsingen_lijst if p['ID'] not in bestaande_loon_ids]
-
-                if not nieuwe_plaatsingen:
-                    logging.info("Alle plaatsingen hebben al loondata. Geen actie nodig.")
+                converted_df = None
+                
+                if vanaf_staging:
+                    # Laatste geconverteerde extract uit staging laden, zonder E-Uur opnieuw te scrapen
+                    logging.info("Start load vanuit staging")
+                    converted_df = staging_store.read("Loon")
                 else:
-                    # Download looncomponenten voor alleen de nieuwe plaatsingen
-                    logging.info("Start download van looncomponenten uit E-Uur voor nieuwe plaatsingen")
-                    looncomponenten_df = loon_downloader.download_loon_per_plaatsing(
-                        euururl, euurusername, euurpassword, nieuwe_plaatsingen
-                    )
+                    # Ophalen plaatsingen (actief én inactief) waarvoor nog geen loondata is
+                    nieuwe_plaatsingen = []
+                    for chunk in database_manager.iter_plaatsingen_zonder_loon("Plaatsingen", "Loon", "ID"):
+                        nieuwe_plaatsingen.extend(chunk)
                     
-                    if looncomponenten_df is not None and not looncomponenten_df.empty:
-                        # Directe verwerking van DataFrame
-                        logging.info("Start type conversie")
-                        converted_df = type_mapper.apply_conversion(looncomponenten_df, "Loon")
-                        if converted_df is not None:
-                            logging.info("Type conversie succesvol voltooid")
-                            database_manager.clear_and_fill_table(converted_df, "Loon", id_column="ID", batch_size=1000)
-                            logging.info("Data succesvol overgedragen naar database")
-                        else:
-                            logging.error("Type conversie mislukt")
+                    if not nieuwe_plaatsingen:
+                        logging.info("Alle plaatsingen hebben al loondata. Geen actie nodig.")
                     else:
-                        logging.error("Geen looncomponenten opgehaald voor nieuwe plaatsingen.")
+                        # Download looncomponenten voor alleen de nieuwe plaatsingen
+                        logging.info("Start download van looncomponenten uit E-Uur voor nieuwe plaatsingen")
+                        looncomponenten_df = loon_downloader.download_loon_per_plaatsing(
+                            euururl, euurusername, euurpassword, nieuwe_plaatsingen
+                        )
+                        
+                        if looncomponenten_df is not None and not looncomponenten_df.empty:
+                            # Directe verwerking van DataFrame
+                            logging.info("Start type conversie")
+                            converted_df = type_mapper.apply_conversion(looncomponenten_df, "Loon")
+                            if converted_df is not None:
+                                logging.info("Type conversie succesvol voltooid")
+                                
+                                # Gescrapete loondata bewaren, zodat de load zonder opnieuw scrapen herhaald kan worden
+                                staging_store.write(converted_df, "Loon")
+                            else:
+                                logging.error("Type conversie mislukt")
+                        else:
+                            logging.error("Geen looncomponenten opgehaald voor nieuwe plaatsingen.")
+                
+                if converted_df is not None:
+                    database_manager.clear_and_fill_table(converted_df, "Loon", id_column="ID", batch_size=1000)
+                    logging.info("Data succesvol overgedragen naar database")
     except Exception as e:
         logging.error(f"Script mislukt: {e}")
         raise
     finally:
+        # Verbindingsstatistieken loggen
+        if database_manager:
+            database_manager.close()
+
         # Eindtijd logging en cleanup
         logger_manager.end_log()
         logger_manager.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(vanaf_staging="--vanaf-staging" in sys.argv)
\ No newline at end of file
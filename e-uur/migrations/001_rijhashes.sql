@@ -0,0 +1,11 @@
+-- Rijhashes per tabel en sleutel, gebruikt door DatabaseManager.sync_table
+-- om ongewijzigde rijen niet opnieuw te schrijven.
+IF OBJECT_ID('dbo.Rijhashes', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.Rijhashes (
+        Tabel nvarchar(128) NOT NULL,
+        Sleutel nvarchar(450) NOT NULL,
+        Hash char(16) NOT NULL,
+        CONSTRAINT PK_Rijhashes PRIMARY KEY (Tabel, Sleutel)
+    );
+END;
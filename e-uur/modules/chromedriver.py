@@ -0,0 +1,169 @@
+from webdriver_manager.chrome import ChromeDriverManager
+from functools import lru_cache
+from pathlib import Path
+import subprocess
+import threading
+import logging
+import shutil
+import json
+import os
+import re
+
+
+# Chrome binaries waarvan de versie bepaald wordt; CHROME_BIN heeft voorrang
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')
+
+# Cache van het ChromeDriver pad per Chrome versie
+DRIVER_CACHE_FILE = Path(os.getenv('CHROMEDRIVER_CACHE', Path.home() / '.cache' / 'e-uur' / 'chromedriver.json'))
+
+_lock = threading.Lock()
+_resolved = {}
+
+
+@lru_cache(maxsize=1)
+def chrome_version():
+    """
+    Bepaal de versie van de geïnstalleerde Chrome (één keer per proces).
+    
+    Returns:
+        str: De versie, bijv. '126.0.6478.126', of None als Chrome niet gevonden is
+    """
+    binaries = [os.getenv('CHROME_BIN')] if os.getenv('CHROME_BIN') else []
+    for binary in binaries + list(CHROME_BINARIES):
+        path = shutil.which(binary) or (binary if os.path.isfile(binary) else None)
+        if path is None:
+            continue
+        try:
+            output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'(\d+\.\d+\.\d+\.\d+)', output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _load_cache(cache_file):
+    """
+    Lees de cache met ChromeDriver paden per Chrome versie.
+    """
+    try:
+        with open(cache_file, encoding='utf-8') as cache:
+            return json.load(cache)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file, cache):
+    """
+    Schrijf de cache met ChromeDriver paden atomair weg.
+    """
+    tmp_path = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as cache_handle:
+            json.dump(cache, cache_handle, indent=2)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        logging.warning(f"ChromeDriver cache kon niet opgeslagen worden: {e}")
+
+
+def _matching_driver(cache, version):
+    """
+    Zoek in de cache een bestaande driver voor dezelfde Chrome hoofdversie.
+    Een ChromeDriver werkt alleen met Chrome van dezelfde hoofdversie; zonder
+    bekende versie wordt dus geen gecachte driver van een andere versie gekozen.
+    
+    Returns:
+        str: Het pad naar de driver met de hoogste passende versie, of None
+    """
+    if not version:
+        return None
+    major = version.split('.')[0]
+    matches = [
+        (tuple(int(part) for part in key.split('.')), path)
+        for key, path in cache.items()
+        if re.fullmatch(r'\d+(\.\d+)*', key) and key.split('.')[0] == major and os.path.isfile(path)
+    ]
+    return max(matches)[1] if matches else None
+
+
+def resolve_chromedriver(offline=None, cache_file=None):
+    """
+    Bepaal het pad naar de ChromeDriver voor de geïnstalleerde Chrome.
+    
+    Het pad wordt per Chrome versie gecachet, zodat ChromeDriverManager alleen na
+    een Chrome update opnieuw geraadpleegd wordt. Zonder bekende Chrome versie wordt
+    niets op schijf bewaard, omdat een Chrome update dan niet te herkennen is; het
+    pad geldt dan alleen voor dit proces. In offline modus (of als de download mislukt) wordt een
+    gecachte driver van dezelfde Chrome hoofdversie of een chromedriver op het
+    PATH gebruikt.
+    
+    Args:
+        offline: Geen netwerk gebruiken; standaard CHROMEDRIVER_OFFLINE
+        cache_file: Optioneel pad van de cache, standaard DRIVER_CACHE_FILE
+    
+    Returns:
+        str: Het pad naar de ChromeDriver, of None om de driver door Selenium te laten bepalen
+    """
+    if offline is None:
+        offline = os.getenv('CHROMEDRIVER_OFFLINE', '').lower() in ('1', 'true', 'ja')
+    cache_file = Path(cache_file) if cache_file else DRIVER_CACHE_FILE
+    
+    with _lock:
+        version = chrome_version()
+        if version in _resolved:
+            return _resolved[version]
+        
+        cache = _load_cache(cache_file)
+        cached_path = cache.get(version) if version else None
+        if cached_path and os.path.isfile(cached_path):
+            logging.info(f"Gecachte ChromeDriver voor Chrome {version}: {cached_path}")
+            _resolved[version] = cached_path
+            return cached_path
+        
+        driver_path = None
+        if not offline:
+            try:
+                driver_path = ChromeDriverManager().install()
+            except Exception as e:
+                logging.warning(f"ChromeDriver kon niet opgehaald worden ({e}), terugvallen op lokale driver")
+        
+        if driver_path is None:
+            # Offline: een gecachte driver van dezelfde hoofdversie, of chromedriver op het PATH
+            driver_path = _matching_driver(cache, version) or shutil.which('chromedriver')
+            if driver_path is None:
+                logging.warning("Geen passende lokale ChromeDriver gevonden, Selenium bepaalt de driver zelf")
+                return None
+            logging.info(f"Lokale ChromeDriver gebruikt voor Chrome {version or 'onbekend'}: {driver_path}")
+        elif version:
+            cache[version] = driver_path
+            _save_cache(cache_file, cache)
+            logging.info(f"ChromeDriver voor Chrome {version} gecachet: {driver_path}")
+        
+        _resolved[version] = driver_path
+        return driver_path
+
+
+def invalidate_chromedriver(driver_path, cache_file=None):
+    """
+    Vergeet een ChromeDriver die niet (meer) bij Chrome past, bijv. na een Chrome
+    update, zodat resolve_chromedriver opnieuw een driver bepaalt.
+    
+    Args:
+        driver_path: Het pad van de driver waarmee geen sessie gestart kon worden
+        cache_file: Optioneel pad van de cache, standaard DRIVER_CACHE_FILE
+    """
+    cache_file = Path(cache_file) if cache_file else DRIVER_CACHE_FILE
+    
+    with _lock:
+        for version in [version for version, path in _resolved.items() if path == driver_path]:
+            del _resolved[version]
+        
+        cache = _load_cache(cache_file)
+        stale = [version for version, path in cache.items() if path == driver_path]
+        if stale:
+            for version in stale:
+                del cache[version]
+            _save_cache(cache_file, cache)
+            logging.info(f"ChromeDriver {driver_path} uit de cache verwijderd")
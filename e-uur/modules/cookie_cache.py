@@ -0,0 +1,139 @@
+from pathlib import Path
+import threading
+import hashlib
+import logging
+import base64
+import json
+import time
+import os
+
+
+class CookieCache:
+    """
+    Een versleutelde cache van E-Uur sessie cookies.
+    
+    Cookies worden na een geslaagde login met Fernet (cryptography) versleuteld op
+    schijf bewaard en vóór een nieuwe login in de browser geladen, zodat het
+    loginformulier overgeslagen kan worden. De sleutel komt uit EUUR_COOKIE_KEY
+    (een Fernet sleutel) of wordt afgeleid van de inloggegevens. Cookies ouder dan
+    de TTL worden niet meer gebruikt.
+    """
+    
+    def __init__(self, cache_dir, ttl=None):
+        """
+        Initialiseer de CookieCache.
+        
+        Args:
+            cache_dir: Directory voor de versleutelde cookie bestanden
+            ttl: Maximale leeftijd van de cookies in seconden, standaard EUUR_COOKIE_TTL of 3600
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl if ttl is not None else int(os.getenv('EUUR_COOKIE_TTL', 3600))
+        self.logger = logging.getLogger(__name__)
+        self._fernets = {}
+        self._disabled = False
+    
+    def _fernet(self, url, username, password):
+        """
+        Maak de Fernet instantie voor een account, of None als cryptography niet geïnstalleerd is.
+        """
+        if self._disabled:
+            return None
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            self.logger.warning("cryptography is niet geïnstalleerd, cookie cache uitgeschakeld")
+            self._disabled = True
+            return None
+        
+        cache_key = (url, username, hashlib.sha256(password.encode()).hexdigest())
+        if cache_key not in self._fernets:
+            key = os.getenv('EUUR_COOKIE_KEY')
+            if not key:
+                # Sleutel afleiden van de inloggegevens; de cache is daarmee alleen
+                # bruikbaar voor wie het wachtwoord kent
+                derived = hashlib.pbkdf2_hmac('sha256', password.encode(), f"{url}|{username}".encode(), 100000)
+                key = base64.urlsafe_b64encode(derived)
+            self._fernets[cache_key] = Fernet(key)
+        return self._fernets[cache_key]
+    
+    def _path(self, url, username):
+        """
+        Het pad van het cookie bestand voor een account.
+        """
+        name = hashlib.sha256(f"{url}|{username}".encode()).hexdigest()[:16]
+        return self.cache_dir / f"{name}.cookies"
+    
+    def load(self, url, username, password):
+        """
+        Laad de gecachte cookies voor een account.
+        
+        Args:
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+        
+        Returns:
+            list: Geldige cookies, of None als er geen (geldige) cache is
+        """
+        path = self._path(url, username)
+        if not path.exists():
+            return None
+        fernet = self._fernet(url, username, password)
+        if fernet is None:
+            return None
+        
+        from cryptography.fernet import InvalidToken
+        try:
+            cookies = json.loads(fernet.decrypt(path.read_bytes(), ttl=self.ttl))
+        except InvalidToken:
+            self.logger.info("Gecachte cookies verlopen of ongeldig")
+            self.clear(url, username)
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cookie cache kon niet gelezen worden: {e}")
+            return None
+        
+        # Cookies met een verlopen expiry niet meer gebruiken
+        now = time.time()
+        cookies = [cookie for cookie in cookies if cookie.get('expiry', now + 1) > now]
+        return cookies or None
+    
+    def save(self, cookies, url, username, password):
+        """
+        Sla de cookies van een ingelogde sessie versleuteld op.
+        
+        Args:
+            cookies: Cookies uit driver.get_cookies()
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+        
+        Returns:
+            bool: True als succesvol opgeslagen, False anders
+        """
+        fernet = self._fernet(url, username, password)
+        if fernet is None or not cookies:
+            return False
+        path = self._path(url, username)
+        # Unieke tijdelijke naam, zodat parallelle browser sessies elkaar niet overschrijven
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(fernet.encrypt(json.dumps(cookies).encode()))
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+            self.logger.info(f"{len(cookies)} sessie cookies versleuteld opgeslagen")
+            return True
+        except OSError as e:
+            self.logger.warning(f"Cookie cache kon niet opgeslagen worden: {e}")
+            return False
+    
+    def clear(self, url, username):
+        """
+        Verwijder de gecachte cookies voor een account.
+        """
+        try:
+            self._path(url, username).unlink()
+        except FileNotFoundError:
+            pass
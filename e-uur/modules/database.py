@@ -1,17 +1,36 @@
+from modules.database_writer import get_writer
 from sqlalchemy import create_engine
+from contextlib import closing, contextmanager
 import pandas as pd
+import numpy as np
+import threading
 import logging
 import urllib
-import pyodbc
 import time
+import uuid
 
 
 class DatabaseManager:
     """
     Een class voor het beheren van database operaties zoals schrijven en verwijderen van data.
+    
+    Connecties worden uit een pool per connection string gehaald, zodat de
+    (dure) login handshake met de database maar één keer per pool-connectie
+    wordt betaald in plaats van bij elke operatie.
     """
     
-    def __init__(self, connection_string, max_retries=3, retry_delay=5):
+    # Gedeelde engines (en daarmee connection pools) per connection string
+    _engines = {}
+    _engines_lock = threading.Lock()
+    
+    # Tabel met per (tabel, sleutel) de hash van de laatst geschreven rij
+    HASH_TABLE = "Rijhashes"
+    # Vaste sleutel (16 tekens) zodat rijhashes stabiel zijn tussen runs
+    HASH_KEY = "stiek-rijhash-01"
+    
+    def __init__(self, connection_string, max_retries=3, retry_delay=5,
+                 pool_size=5, max_overflow=5, pool_recycle=1800, pool_timeout=30,
+                 writer='to_sql'):
         """
         Initialiseer de DatabaseManager.
         
@@ -19,23 +38,93 @@ class DatabaseManager:
             connection_string: Database connection string
             max_retries: Maximum aantal pogingen voor database connectie
             retry_delay: Delay tussen pogingen in seconden
+            pool_size: Aantal connecties dat open gehouden wordt in de pool
+            max_overflow: Aantal extra connecties boven pool_size bij piekbelasting
+            pool_recycle: Maximale leeftijd van een connectie in seconden
+            pool_timeout: Maximale wachttijd in seconden op een vrije connectie
+            writer: Standaard writer backend voor fill_table ('to_sql' of 'executemany')
         """
         self.connection_string = connection_string
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+        self.pool_timeout = pool_timeout
+        self.writer = writer
         self.logger = logging.getLogger(__name__)
+        
+        # Statistieken over verbindingsopbouw gedurende deze run
+        self.connection_count = 0
+        self.connection_time = 0.0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+    
+    def get_engine(self):
+        """
+        Haal de gedeelde SQLAlchemy engine op voor deze connection string.
+        De engine wordt één keer aangemaakt en daarna hergebruikt. Pool
+        instellingen van de eerste DatabaseManager voor een connection string
+        zijn leidend.
+        
+        Returns:
+            sqlalchemy.engine.Engine: Engine met connection pool
+        """
+        with DatabaseManager._engines_lock:
+            engine = DatabaseManager._engines.get(self.connection_string)
+            if engine is None:
+                db_params = urllib.parse.quote_plus(self.connection_string)
+                engine = create_engine(
+                    f"mssql+pyodbc:///?odbc_connect={db_params}",
+                    fast_executemany=True,
+                    pool_size=self.pool_size,
+                    max_overflow=self.max_overflow,
+                    pool_recycle=self.pool_recycle,
+                    pool_timeout=self.pool_timeout,
+                    pool_pre_ping=True,
+                )
+                DatabaseManager._engines[self.connection_string] = engine
+                self.logger.info(f"Connection pool aangemaakt (pool_size={self.pool_size}, max_overflow={self.max_overflow})")
+        return engine
+    
+    def _pool_limit(self):
+        """
+        Het maximaal aantal gelijktijdige connecties van de gedeelde pool. De
+        engine wordt per connection string hergebruikt, dus de pool instellingen
+        van deze DatabaseManager hoeven niet die van de pool te zijn.
+        
+        Returns:
+            int: pool size + max overflow van de pool, of None als er geen limiet is
+        """
+        pool = self.get_engine().pool
+        try:
+            max_overflow = pool._max_overflow
+            if max_overflow < 0:
+                return None
+            return pool.size() + max_overflow
+        except AttributeError:
+            return self.pool_size + self.max_overflow
     
     def connect_to_database(self):
         """
-        Maak verbinding met de database met retry mechanisme.
+        Haal een connectie uit de pool met retry mechanisme.
+        De connectie gedraagt zich als een pyodbc connectie; close() geeft
+        hem terug aan de pool in plaats van hem echt te sluiten.
         
         Returns:
-            pyodbc.Connection: Database connectie of None bij fout
+            Database connectie of None bij fout
         """
         for attempt in range(self.max_retries):
             try:
-                conn = pyodbc.connect(self.connection_string)
-                self.logger.info("Database verbinding succesvol")
+                start = time.perf_counter()
+                conn = self.get_engine().raw_connection()
+                self.connection_time += time.perf_counter() - start
+                self.connection_count += 1
                 return conn
             except Exception as e:
                 self.logger.warning(f"Fout bij poging {attempt + 1} om verbinding te maken: {e}")
@@ -45,6 +134,79 @@ class DatabaseManager:
         self.logger.error("Kan geen verbinding maken met de database na meerdere pogingen.")
         return None
     
+    @contextmanager
+    def connection(self):
+        """
+        Context manager voor een connectie uit de pool.
+        Bij een fout wordt de openstaande transactie teruggedraaid; bij het
+        verlaten van het blok gaat de connectie terug naar de pool.
+        
+        Yields:
+            Database connectie
+            
+        Raises:
+            ConnectionError: Als er geen verbinding gemaakt kan worden
+        """
+        conn = self.connect_to_database()
+        if conn is None:
+            raise ConnectionError("Geen databaseverbinding beschikbaar")
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            conn.close()
+    
+    def health_check(self):
+        """
+        Controleer of de database bereikbaar is via een connectie uit de pool.
+        
+        Returns:
+            bool: True als de database reageert, False anders
+        """
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                cursor.close()
+            return True
+        except Exception as e:
+            self.logger.error(f"Database health check mislukt: {e}")
+            return False
+    
+    def log_connection_stats(self):
+        """
+        Log hoeveel connecties er zijn opgevraagd en hoeveel tijd dat kostte.
+        """
+        engine = DatabaseManager._engines.get(self.connection_string)
+        pool_status = engine.pool.status() if engine is not None else "geen pool"
+        self.logger.info(
+            f"Verbindingsopbouw: {self.connection_count} connecties opgevraagd in "
+            f"{self.connection_time:.2f}s ({pool_status})"
+        )
+    
+    def close(self):
+        """
+        Log de verbindingsstatistieken van deze run. De pool zelf blijft
+        bestaan zodat andere DatabaseManagers hem kunnen hergebruiken.
+        """
+        self.log_connection_stats()
+    
+    @classmethod
+    def dispose_all(cls):
+        """
+        Sluit alle connection pools en de connecties daarin.
+        """
+        with cls._engines_lock:
+            for engine in cls._engines.values():
+                engine.dispose()
+            cls._engines.clear()
+    
     def clear_table(self, table):
         """
         Maak een tabel compleet leeg.
@@ -56,18 +218,14 @@ class DatabaseManager:
             bool: True als succesvol, False bij fout
         """
         try:
-            connection = self.connect_to_database()
-            if not connection:
-                return False
+            with self.connection() as connection:
+                cursor = connection.cursor()
                 
-            cursor = connection.cursor()
-            
-            cursor.execute(f"DELETE FROM {table}")
-            rows_deleted = cursor.rowcount
-            connection.commit()
-            
-            cursor.close()
-            connection.close()
+                cursor.execute(f"DELETE FROM {table}")
+                rows_deleted = cursor.rowcount
+                connection.commit()
+                
+                cursor.close()
             
             self.logger.info(f"Tabel {table} compleet leeggemaakt, {rows_deleted} rijen verwijderd")
             return True
@@ -93,32 +251,28 @@ class DatabaseManager:
             return True
             
         try:
-            connection = self.connect_to_database()
-            if not connection:
-                return False
-                
-            cursor = connection.cursor()
-            
-            # Verdeel de operatie in chunks om limieten op het aantal parameters te vermijden
-            chunk_size = 500
-            rows_deleted_total = 0
-            
-            unique_ids = list(set(ids))
-
-            for i in range(0, len(unique_ids), chunk_size):
-                chunk_ids = unique_ids[i:i + chunk_size]
+            with self.connection() as connection:
+                cursor = connection.cursor()
                 
-                placeholders = ', '.join(['?'] * len(chunk_ids))
-                sql = f"DELETE FROM {table} WHERE [{id_column}] IN ({placeholders})"
+                # Verdeel de operatie in chunks om limieten op het aantal parameters te vermijden
+                chunk_size = 500
+                rows_deleted_total = 0
                 
-                cursor.execute(sql, chunk_ids)
-                rows_deleted = cursor.rowcount
-                rows_deleted_total += rows_deleted if rows_deleted > -1 else 0
+                unique_ids = list(set(ids))
+
+                for i in range(0, len(unique_ids), chunk_size):
+                    chunk_ids = unique_ids[i:i + chunk_size]
+                    
+                    placeholders = ', '.join(['?'] * len(chunk_ids))
+                    sql = f"DELETE FROM {table} WHERE [{id_column}] IN ({placeholders})"
+                    
+                    cursor.execute(sql, chunk_ids)
+                    rows_deleted = cursor.rowcount
+                    rows_deleted_total += rows_deleted if rows_deleted > -1 else 0
+                    
+                connection.commit()
                 
-            connection.commit()
-            
-            cursor.close()
-            connection.close()
+                cursor.close()
             
             self.logger.info(f"{rows_deleted_total} rijen verwijderd uit tabel {table} op basis van ID's in kolom {id_column}.")
             return True
@@ -141,21 +295,17 @@ class DatabaseManager:
             bool: True als succesvol, False bij fout.
         """
         try:
-            connection = self.connect_to_database()
-            if not connection:
-                return False
+            with self.connection() as connection:
+                cursor = connection.cursor()
                 
-            cursor = connection.cursor()
-            
-            sql = f"DELETE FROM {table} WHERE [{date_column}] BETWEEN ? AND ?"
-            
-            cursor.execute(sql, start_date, end_date)
-            rows_deleted = cursor.rowcount
-            
-            connection.commit()
-            
-            cursor.close()
-            connection.close()
+                sql = f"DELETE FROM {table} WHERE [{date_column}] BETWEEN ? AND ?"
+                
+                cursor.execute(sql, start_date, end_date)
+                rows_deleted = cursor.rowcount
+                
+                connection.commit()
+                
+                cursor.close()
             
             self.logger.info(f"{rows_deleted} rijen verwijderd uit tabel {table} voor periode {start_date} t/m {end_date}.")
             return True
@@ -164,7 +314,7 @@ class DatabaseManager:
             self.logger.error(f"Fout bij verwijderen op datumbereik uit tabel {table}: {e}")
             return False
 
-    def fill_table(self, df, table, batch_size=1000):
+    def fill_table(self, df, table, batch_size=1000, column_types=None, writer=None, **writer_options):
         """
         Vul een tabel met data uit een DataFrame.
         
@@ -172,32 +322,282 @@ class DatabaseManager:
             df: Pandas DataFrame met data
             table: Naam van de doel tabel
             batch_size: Grootte van de batches voor schrijven
+            column_types: Optionele dictionary met kolomnamen en SQL types
+                (TypeMapper mapping) voor getypeerde parameter binding
+            writer: Writer backend voor deze aanroep, standaard self.writer
+            **writer_options: Extra opties voor de writer backend
             
         Returns:
             bool: True als succesvol, False bij fout
         """
         try:
-            db_params = urllib.parse.quote_plus(self.connection_string)
-            engine = create_engine(f"mssql+pyodbc:///?odbc_connect={db_params}", fast_executemany=True)
-
-            total_rows = len(df)
-            rows_added = 0
+            table_writer = get_writer(writer or self.writer, self, **writer_options)
             
-            # Werk in batches
-            for start in range(0, total_rows, batch_size):
-                batch_df = df.iloc[start:start + batch_size]
-                batch_df.to_sql(table, con=engine, index=False, if_exists="append", schema="dbo")
-                rows_added += len(batch_df)
-                self.logger.info(f"{rows_added} rijen toegevoegd aan tabel {table}")
+            start = time.perf_counter()
+            rows_added = table_writer.write(df, table, batch_size, column_types)
+            duration = time.perf_counter() - start
             
-            self.logger.info(f"Tabel {table} succesvol gevuld met {rows_added} rijen")
+            self.logger.info(
+                f"Tabel {table} succesvol gevuld met {rows_added} rijen "
+                f"in {duration:.2f}s ({table_writer.name})"
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"Fout bij vullen van tabel {table}: {e}")
             return False
     
-    def clear_and_fill_table(self, df, table, id_column=None, batch_size=1000):
+    def fill_table_parallel(self, df, table, batch_size=1000, column_types=None,
+                            workers=4, queue_size=None, commit_per_batch=True):
+        """
+        Vul een tabel parallel: het voorbereiden van de volgende batch overlapt
+        met het versturen van de huidige, verdeeld over meerdere connecties.
+        
+        Args:
+            df: Pandas DataFrame met data
+            table: Naam van de doel tabel
+            batch_size: Grootte van de batches voor schrijven
+            column_types: Optionele dictionary met kolomnamen en SQL types
+            workers: Aantal parallelle connecties (maximaal pool_size + max_overflow van de gedeelde pool)
+            queue_size: Maximaal aantal klaargezette batches
+            commit_per_batch: Indien True na elke batch committen
+            
+        Returns:
+            bool: True als succesvol, False bij fout
+        """
+        limit = self._pool_limit()
+        if limit is not None:
+            workers = min(workers, limit)
+        return self.fill_table(
+            df, table, batch_size, column_types, writer='parallel',
+            workers=workers, queue_size=queue_size, commit_per_batch=commit_per_batch
+        )
+    
+    def get_table_columns(self, table):
+        """
+        Haal de kolommen van een tabel op, met per kolom of het een IDENTITY kolom is.
+        
+        Args:
+            table: Naam van de tabel
+            
+        Returns:
+            dict: Kolomnaam -> True als de kolom een IDENTITY kolom is
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT name, is_identity FROM sys.columns WHERE object_id = OBJECT_ID(?) ORDER BY column_id",
+                f"dbo.[{table}]"
+            )
+            columns = {row[0]: bool(row[1]) for row in cursor.fetchall()}
+            cursor.close()
+        return columns
+    
+    def get_column_sizes(self, table):
+        """
+        Haal per kolom het datatype, de lengte of precisie en de schaal op,
+        voor getypeerde parameter binding door de writer backends.
+        
+        Args:
+            table: Naam van de tabel
+            
+        Returns:
+            dict: Kolomnaam -> (data_type, lengte of precisie, schaal); leeg bij fout.
+                Een lengte van -1 staat voor (n)varchar(max).
+        """
+        try:
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    "SELECT COLUMN_NAME, DATA_TYPE, COALESCE(CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, 0), "
+                    "COALESCE(NUMERIC_SCALE, 0) FROM INFORMATION_SCHEMA.COLUMNS "
+                    "WHERE TABLE_SCHEMA = 'dbo' AND TABLE_NAME = ?",
+                    table
+                )
+                sizes = {row[0]: (row[1], int(row[2]), int(row[3])) for row in cursor.fetchall()}
+                cursor.close()
+            return sizes
+        except Exception as e:
+            self.logger.warning(f"Kolomgroottes van tabel {table} konden niet opgehaald worden: {e}")
+            return {}
+    
+    def create_staging_table(self, table, keep_identity=True):
+        """
+        Maak een lege staging tabel met dezelfde kolommen als de doeltabel.
+        De naam krijgt een unieke suffix zodat parallelle runs elkaar niet raken.
+        
+        Args:
+            table: Naam van de doeltabel
+            keep_identity (bool): Indien False, de IDENTITY eigenschap niet
+                overnemen, zodat expliciete waarden voor die kolom geladen kunnen worden
+            
+        Returns:
+            str: Naam van de staging tabel
+        """
+        staging_table = f"{table}_staging_{uuid.uuid4().hex[:8]}"
+        sql = f"SELECT TOP 0 * INTO dbo.[{staging_table}] FROM dbo.[{table}]"
+        if not keep_identity:
+            # Via UNION ALL neemt SELECT INTO de IDENTITY eigenschap niet over
+            sql += f" UNION ALL SELECT TOP 0 * FROM dbo.[{table}]"
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(sql)
+            connection.commit()
+            cursor.close()
+        self.logger.info(f"Staging tabel {staging_table} aangemaakt")
+        return staging_table
+    
+    def drop_table(self, table):
+        """
+        Verwijder een tabel indien deze bestaat (bedoeld voor staging tabellen).
+        
+        Args:
+            table: Naam van de tabel
+            
+        Returns:
+            bool: True als succesvol, False bij fout
+        """
+        try:
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"DROP TABLE IF EXISTS dbo.[{table}]")
+                connection.commit()
+                cursor.close()
+            return True
+        except Exception as e:
+            self.logger.error(f"Fout bij verwijderen van tabel {table}: {e}")
+            return False
+    
+    def _swap_from_staging(self, staging_table, table, columns, id_column=None, table_columns=None, date_range=None):
+        """
+        Vervang de data in de doeltabel door de data uit de staging tabel met
+        DELETE plus INSERT ... SELECT in één transactie. Lezers zien daardoor óf
+        de oude óf de nieuwe data, nooit een lege of half gevulde tabel. De
+        winst zit in het vooraf laden van de staging tabel: de transactie op de
+        doeltabel bevat alleen nog server-side statements.
+        
+        Met id_column worden alleen de rijen met ID's uit de staging tabel
+        vervangen en met date_range alleen de rijen in die periode, zodat de
+        duur met de nieuwe data meegroeit en niet met de tabel.
+        
+        Args:
+            staging_table: Naam van de gevulde staging tabel
+            table: Naam van de doeltabel
+            columns: Kolommen die overgezet worden
+            id_column (str, optional): Alleen rijen met deze ID's vervangen
+            table_columns (dict, optional): Uitvoer van get_table_columns voor de doeltabel
+            date_range (tuple, optional): (datumkolom, begindatum, einddatum) van de te vervangen rijen
+            
+        Returns:
+            Tuple[int, int]: Aantal verwijderde en toegevoegde rijen
+        """
+        if table_columns is None:
+            table_columns = self.get_table_columns(table)
+        identity_column = next((column for column, is_identity in table_columns.items() if is_identity), None)
+        insert_identity = identity_column in columns
+        
+        column_list = ', '.join(f"[{column}]" for column in columns)
+        delete_params = ()
+        if date_range:
+            date_column, start_date, end_date = date_range
+            delete_sql = f"DELETE FROM dbo.[{table}] WHERE [{date_column}] BETWEEN ? AND ?"
+            delete_params = (start_date, end_date)
+        elif id_column:
+            delete_sql = (
+                f"DELETE doel FROM dbo.[{table}] AS doel "
+                f"WHERE EXISTS (SELECT 1 FROM dbo.[{staging_table}] AS bron WHERE bron.[{id_column}] = doel.[{id_column}])"
+            )
+        else:
+            delete_sql = f"DELETE FROM dbo.[{table}]"
+        insert_sql = f"INSERT INTO dbo.[{table}] ({column_list}) SELECT {column_list} FROM dbo.[{staging_table}]"
+        
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            start = time.perf_counter()
+            cursor.execute(delete_sql, *delete_params)
+            rows_deleted = cursor.rowcount
+            if insert_identity:
+                cursor.execute(f"SET IDENTITY_INSERT dbo.[{table}] ON")
+            cursor.execute(insert_sql)
+            rows_inserted = cursor.rowcount
+            if insert_identity:
+                cursor.execute(f"SET IDENTITY_INSERT dbo.[{table}] OFF")
+            connection.commit()
+            duration_ms = (time.perf_counter() - start) * 1000
+            cursor.close()
+        
+        self.logger.info(
+            f"Tabel {table} vervangen vanuit staging in {duration_ms:.0f} ms: "
+            f"{rows_deleted} rijen verwijderd, {rows_inserted} rijen toegevoegd"
+        )
+        return rows_deleted, rows_inserted
+    
+    def _atomic_clear_and_fill(self, df, table, id_column=None, batch_size=1000):
+        """
+        Laad de nieuwe data eerst in een staging tabel en zet deze daarna met
+        DELETE en INSERT in één transactie over naar de doeltabel. Als het laden
+        mislukt blijft de doeltabel onaangeroerd.
+        """
+        staging_table = None
+        try:
+            table_columns = self.get_table_columns(table)
+            # Expliciete waarden voor een IDENTITY kolom kunnen alleen in een staging tabel zonder IDENTITY
+            keep_identity = not any(table_columns.get(column) for column in df.columns)
+            staging_table = self.create_staging_table(table, keep_identity=keep_identity)
+            if not self.fill_table(df, staging_table, batch_size):
+                self.logger.error(f"Laden van staging tabel voor {table} mislukt, doeltabel niet gewijzigd")
+                return False
+            self._swap_from_staging(staging_table, table, list(df.columns), id_column, table_columns)
+            return True
+        except Exception as e:
+            self.logger.error(f"Fout bij atomisch vervangen van data in tabel {table}: {e}")
+            return False
+        finally:
+            if staging_table:
+                self.drop_table(staging_table)
+    
+    def replace_date_range(self, df, table, date_column, start_date, end_date,
+                           column_types=None, batch_size=1000, workers=4):
+        """
+        Vervang de rijen van een periode atomisch door de data uit een DataFrame.
+        De data wordt eerst parallel in een staging tabel geladen; daarna worden
+        de bestaande rijen van de periode verwijderd en de nieuwe rijen ingevoegd
+        in één transactie. Als het laden mislukt blijft de doeltabel onaangeroerd.
+        
+        Args:
+            df: Pandas DataFrame met de nieuwe data
+            table: Naam van de doeltabel
+            date_column (str): Naam van de datumkolom
+            start_date (date): Begindatum van de periode
+            end_date (date): Einddatum van de periode
+            column_types: Optionele dictionary met kolomnamen en SQL types
+            batch_size: Grootte van de batches voor schrijven
+            workers: Aantal parallelle connecties voor het laden van de staging tabel
+            
+        Returns:
+            bool: True als succesvol, False bij fout
+        """
+        staging_table = None
+        try:
+            table_columns = self.get_table_columns(table)
+            keep_identity = not any(table_columns.get(column) for column in df.columns)
+            staging_table = self.create_staging_table(table, keep_identity=keep_identity)
+            if not self.fill_table_parallel(df, staging_table, batch_size, column_types, workers=workers):
+                self.logger.error(f"Laden van staging tabel voor {table} mislukt, doeltabel niet gewijzigd")
+                return False
+            self._swap_from_staging(
+                staging_table, table, list(df.columns), table_columns=table_columns,
+                date_range=(date_column, start_date, end_date)
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Fout bij vervangen van periode {start_date} t/m {end_date} in tabel {table}: {e}")
+            return False
+        finally:
+            if staging_table:
+                self.drop_table(staging_table)
+    
+    def clear_and_fill_table(self, df, table, id_column=None, batch_size=1000, atomic=False):
         """
         Maak een tabel leeg en vul deze met nieuwe data.
         Indien id_column is opgegeven, worden alleen de rijen verwijderd waarvan
@@ -208,15 +608,20 @@ class DatabaseManager:
             table: Naam van de tabel
             id_column (str, optional): Naam van de ID kolom voor conditioneel verwijderen.
             batch_size: Grootte van de batches voor schrijven
+            atomic (bool): Indien True, eerst in een staging tabel laden en daarna
+                in één transactie overzetten, zodat de tabel nooit leeg of half gevuld is.
             
         Returns:
             bool: True als succesvol, False bij fout
         """
+        if id_column and id_column not in df.columns:
+            self.logger.error(f"ID kolom '{id_column}' niet gevonden in DataFrame.")
+            return False
+        
+        if atomic:
+            return self._atomic_clear_and_fill(df, table, id_column, batch_size)
+        
         if id_column:
-            if id_column not in df.columns:
-                self.logger.error(f"ID kolom '{id_column}' niet gevonden in DataFrame.")
-                return False
-            
             ids_to_delete = df[id_column].dropna().unique().tolist()
             
             if not self.delete_rows_by_ids(table, id_column, ids_to_delete):
@@ -227,6 +632,416 @@ class DatabaseManager:
         
         return self.fill_table(df, table, batch_size)
 
+    def _merge_from_staging(self, staging_table, table, key_columns, columns, delete_missing=False):
+        """
+        Voer één set-based MERGE uit van de staging tabel naar de doeltabel.
+        Rijen worden alleen bijgewerkt als minstens één kolom echt verschilt
+        (NULL-veilige vergelijking via EXCEPT).
+        
+        Returns:
+            dict: Aantallen 'inserted', 'updated' en 'deleted'
+        """
+        update_columns = [column for column in columns if column not in key_columns]
+        join_condition = ' AND '.join(f"doel.[{column}] = bron.[{column}]" for column in key_columns)
+        column_list = ', '.join(f"[{column}]" for column in columns)
+        source_list = ', '.join(f"bron.[{column}]" for column in columns)
+        
+        merge_sql = (
+            "SET NOCOUNT ON;\n"
+            "DECLARE @acties TABLE (Actie nvarchar(10));\n"
+            f"MERGE dbo.[{table}] WITH (HOLDLOCK) AS doel\n"
+            f"USING dbo.[{staging_table}] AS bron ON {join_condition}\n"
+        )
+        if update_columns:
+            bron_values = ', '.join(f"bron.[{column}]" for column in update_columns)
+            doel_values = ', '.join(f"doel.[{column}]" for column in update_columns)
+            set_list = ', '.join(f"doel.[{column}] = bron.[{column}]" for column in update_columns)
+            merge_sql += (
+                f"WHEN MATCHED AND EXISTS (SELECT {bron_values} EXCEPT SELECT {doel_values}) "
+                f"THEN UPDATE SET {set_list}\n"
+            )
+        merge_sql += f"WHEN NOT MATCHED BY TARGET THEN INSERT ({column_list}) VALUES ({source_list})\n"
+        if delete_missing:
+            merge_sql += "WHEN NOT MATCHED BY SOURCE THEN DELETE\n"
+        merge_sql += (
+            "OUTPUT $action INTO @acties;\n"
+            "SELECT "
+            "SUM(CASE WHEN Actie = 'INSERT' THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN Actie = 'UPDATE' THEN 1 ELSE 0 END), "
+            "SUM(CASE WHEN Actie = 'DELETE' THEN 1 ELSE 0 END) "
+            "FROM @acties;"
+        )
+        
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(merge_sql)
+            row = cursor.fetchone()
+            connection.commit()
+            cursor.close()
+        
+        return {
+            'inserted': int(row[0] or 0),
+            'updated': int(row[1] or 0),
+            'deleted': int(row[2] or 0),
+        }
+    
+    def upsert_table(self, df, table, key_column, delete_missing=False, batch_size=1000):
+        """
+        Werk een tabel bij op basis van een sleutelkolom met een server-side MERGE.
+        Het DataFrame wordt in een staging tabel geladen, waarna één MERGE nieuwe
+        rijen toevoegt, gewijzigde rijen bijwerkt en ongewijzigde rijen laat staan.
+        
+        Args:
+            df: Pandas DataFrame met nieuwe data
+            table: Naam van de doeltabel
+            key_column: Naam van de sleutelkolom (bijv. 'Id') of een lijst van kolommen
+            delete_missing (bool): Indien True, rijen verwijderen waarvan de sleutel
+                niet in het DataFrame voorkomt. Alleen gebruiken bij een volledige export.
+            batch_size: Grootte van de batches voor het laden van de staging tabel
+            
+        Returns:
+            dict: Aantallen 'inserted', 'updated', 'deleted' en 'unchanged', of None bij fout
+        """
+        key_columns = [key_column] if isinstance(key_column, str) else list(key_column)
+        missing_keys = [column for column in key_columns if column not in df.columns]
+        if missing_keys:
+            self.logger.error(f"Sleutelkolom(men) {missing_keys} niet gevonden in DataFrame.")
+            return None
+        
+        # MERGE staat geen dubbele sleutels in de bron toe
+        duplicates = df.duplicated(subset=key_columns, keep='last')
+        if duplicates.any():
+            self.logger.warning(f"{int(duplicates.sum())} dubbele sleutels in {key_columns} genegeerd voor tabel {table}")
+            df = df[~duplicates]
+        df = df[df[key_columns].notna().all(axis=1)]
+        
+        staging_table = None
+        try:
+            staging_table = self.create_staging_table(table)
+            if not self.fill_table(df, staging_table, batch_size):
+                self.logger.error(f"Laden van staging tabel voor {table} mislukt, doeltabel niet gewijzigd")
+                return None
+            
+            start = time.perf_counter()
+            stats = self._merge_from_staging(staging_table, table, key_columns, list(df.columns), delete_missing)
+            duration_ms = (time.perf_counter() - start) * 1000
+            stats['unchanged'] = len(df) - stats['inserted'] - stats['updated']
+            
+            self.logger.info(
+                f"Upsert {table} voltooid in {duration_ms:.0f} ms: {stats['inserted']} toegevoegd, "
+                f"{stats['updated']} bijgewerkt, {stats['deleted']} verwijderd, {stats['unchanged']} ongewijzigd"
+            )
+            return stats
+        except Exception as e:
+            self.logger.error(f"Fout bij upsert van tabel {table}: {e}")
+            return None
+        finally:
+            if staging_table:
+                self.drop_table(staging_table)
+
+    @staticmethod
+    def _build_row_keys(df, key_columns):
+        """
+        Bouw per rij een tekstsleutel uit één of meer sleutelkolommen.
+        """
+        keys = df[key_columns[0]].astype(str)
+        for column in key_columns[1:]:
+            keys = keys + '|' + df[column].astype(str)
+        return keys
+    
+    def compute_row_hashes(self, df):
+        """
+        Bereken een stabiele hash per rij van een (geconverteerd) DataFrame.
+        Waarden worden eerst naar tekst omgezet zodat de hash niet afhangt van
+        het exacte pandas dtype.
+        
+        Args:
+            df: Het DataFrame, bijv. de uitvoer van TypeMapper.apply_conversion
+            
+        Returns:
+            pd.Series: Hash per rij als hexadecimale tekst van 16 tekens
+        """
+        hashes = pd.util.hash_pandas_object(df.astype(str), index=False, hash_key=self.HASH_KEY)
+        return hashes.map('{:016x}'.format)
+    
+    def fetch_row_hashes(self, table):
+        """
+        Haal de opgeslagen rijhashes op voor een tabel. De hashtabel wordt
+        aangemaakt door migrations/001_rijhashes.sql.
+        
+        Args:
+            table: Naam van de tabel
+            
+        Returns:
+            dict: Sleutel -> hash
+            
+        Raises:
+            RuntimeError: Als de hashtabel niet bestaat
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT OBJECT_ID(?, 'U')", f"dbo.{self.HASH_TABLE}")
+            if cursor.fetchone()[0] is None:
+                cursor.close()
+                raise RuntimeError(f"Tabel dbo.{self.HASH_TABLE} bestaat niet, voer migrations/001_rijhashes.sql uit")
+            cursor.execute(f"SELECT Sleutel, Hash FROM dbo.[{self.HASH_TABLE}] WHERE Tabel = ?", table)
+            stored = {row[0]: row[1] for row in cursor.fetchall()}
+            cursor.close()
+        return stored
+    
+    def count_rows(self, table):
+        """
+        Tel het aantal rijen in een tabel.
+        
+        Args:
+            table: Naam van de tabel
+            
+        Returns:
+            int: Aantal rijen
+        """
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT COUNT_BIG(*) FROM dbo.[{table}]")
+            count = int(cursor.fetchone()[0])
+            cursor.close()
+        return count
+    
+    def store_row_hashes(self, table, keys, hashes, replace_all=False):
+        """
+        Sla rijhashes op voor een tabel. De hashes worden in een tijdelijke
+        tabel geladen en met één set-based MERGE in de hashtabel verwerkt.
+        
+        Args:
+            table: Naam van de tabel
+            keys: Sleutels van de rijen
+            hashes: Hashes van de rijen (zelfde volgorde als keys)
+            replace_all (bool): Indien True, alle bestaande hashes van de tabel vervangen
+        """
+        rows = list(zip(keys, hashes))
+        merge_sql = (
+            f"WITH doel AS (SELECT Tabel, Sleutel, Hash FROM dbo.[{self.HASH_TABLE}] WHERE Tabel = ?)\n"
+            "MERGE doel WITH (HOLDLOCK)\n"
+            "USING #rijhashes AS bron ON doel.Sleutel = bron.Sleutel\n"
+            "WHEN MATCHED AND doel.Hash <> bron.Hash THEN UPDATE SET Hash = bron.Hash\n"
+            "WHEN NOT MATCHED BY TARGET THEN INSERT (Tabel, Sleutel, Hash) VALUES (?, bron.Sleutel, bron.Hash)\n"
+        )
+        if replace_all:
+            merge_sql += "WHEN NOT MATCHED BY SOURCE THEN DELETE\n"
+        merge_sql += ";"
+        
+        with self.connection() as connection:
+            cursor = connection.cursor()
+            cursor.fast_executemany = True
+            cursor.execute(
+                "CREATE TABLE #rijhashes (Sleutel nvarchar(450) NOT NULL PRIMARY KEY, Hash char(16) NOT NULL)"
+            )
+            try:
+                if rows:
+                    cursor.executemany("INSERT INTO #rijhashes (Sleutel, Hash) VALUES (?, ?)", rows)
+                cursor.execute(merge_sql, table, table)
+                connection.commit()
+            finally:
+                cursor.execute("DROP TABLE IF EXISTS #rijhashes")
+                cursor.close()
+    
+    def _delete_missing_keys(self, df, table, key_columns, batch_size=1000):
+        """
+        Verwijder rijen uit de doeltabel waarvan de sleutel niet (meer) in het
+        DataFrame voorkomt, via een set-based anti-join met een staging tabel.
+        
+        Returns:
+            int: Aantal verwijderde rijen
+        """
+        staging_table = f"{table}_sleutels_{uuid.uuid4().hex[:8]}"
+        key_list = ', '.join(f"[{column}]" for column in key_columns)
+        join_condition = ' AND '.join(f"bron.[{column}] = doel.[{column}]" for column in key_columns)
+        try:
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"SELECT TOP 0 {key_list} INTO dbo.[{staging_table}] FROM dbo.[{table}]")
+                connection.commit()
+                cursor.close()
+            
+            if not self.fill_table(df[key_columns].drop_duplicates(), staging_table, batch_size):
+                raise RuntimeError(f"Laden van sleutels voor {table} mislukt")
+            
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    f"DELETE doel FROM dbo.[{table}] AS doel "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM dbo.[{staging_table}] AS bron WHERE {join_condition})"
+                )
+                rows_deleted = cursor.rowcount
+                connection.commit()
+                cursor.close()
+            return max(rows_deleted, 0)
+        finally:
+            self.drop_table(staging_table)
+    
+    def sync_table(self, df, table, key_columns, delete_missing=False, batch_size=1000):
+        """
+        Synchroniseer een tabel met een DataFrame op basis van rijhashes.
+        Alleen nieuwe en gewijzigde rijen worden naar de database gestuurd;
+        ongewijzigde rijen worden niet herschreven. De wijzigingsstatistieken
+        worden gelogd (en komen zo in het Logboek).
+        
+        De opgeslagen hashes gaan ervan uit dat de tabel alleen via sync_table
+        wordt geschreven. Bij delete_missing wordt dat gecontroleerd: als het
+        aantal rijen in de tabel niet overeenkomt met het aantal opgeslagen
+        hashes (een andere schrijver heeft rijen toegevoegd of verwijderd),
+        worden de hashes genegeerd en gaan alle rijen door de MERGE.
+        Wijzigingen van andere schrijvers aan bestaande rijen worden niet opgemerkt.
+        
+        Args:
+            df: Het geconverteerde DataFrame (uitvoer van TypeMapper.apply_conversion)
+            table: Naam van de doeltabel
+            key_columns: Sleutelkolom of lijst van sleutelkolommen
+            delete_missing (bool): Indien True, rijen verwijderen waarvan de sleutel
+                niet in het DataFrame voorkomt. Alleen gebruiken bij een volledige export.
+            batch_size: Grootte van de batches voor schrijven
+            
+        Returns:
+            dict: Aantallen 'new', 'changed', 'unchanged' en 'deleted', of None bij fout
+        """
+        key_columns = [key_columns] if isinstance(key_columns, str) else list(key_columns)
+        missing_keys = [column for column in key_columns if column not in df.columns]
+        if missing_keys:
+            self.logger.error(f"Sleutelkolom(men) {missing_keys} niet gevonden in DataFrame.")
+            return None
+        
+        duplicates = df.duplicated(subset=key_columns, keep='last')
+        if duplicates.any() and delete_missing:
+            # Bij een volledige export met dubbele sleutels is een sleutel geen
+            # rij-identiteit; herlaad dan de hele tabel en begin schoon met hashes.
+            self.logger.warning(
+                f"{int(duplicates.sum())} dubbele sleutels in {key_columns} voor tabel {table}: "
+                f"rijhashes niet bruikbaar, tabel wordt volledig herladen. Dit gebeurt bij elke run "
+                f"zolang de export dubbele sleutels bevat."
+            )
+            if not self.clear_and_fill_table(df, table, batch_size=batch_size, atomic=True):
+                return None
+            self.store_row_hashes(table, [], [], replace_all=True)
+            return {'new': len(df), 'changed': 0, 'unchanged': 0, 'deleted': 0}
+        if duplicates.any():
+            self.logger.warning(f"{int(duplicates.sum())} dubbele sleutels in {key_columns} genegeerd voor tabel {table}")
+            df = df[~duplicates]
+        df = df[df[key_columns].notna().all(axis=1)]
+        
+        try:
+            keys = self._build_row_keys(df, key_columns)
+            hashes = self.compute_row_hashes(df)
+            stored = self.fetch_row_hashes(table)
+            if delete_missing and stored and len(stored) != self.count_rows(table):
+                self.logger.warning(
+                    f"Rijhashes van {table} komen niet overeen met de tabel, alle rijen worden vergeleken via MERGE"
+                )
+                stored = {}
+            
+            previous = keys.map(stored)
+            is_new = previous.isna()
+            is_changed = ~is_new & (previous != hashes)
+            to_write = is_new | is_changed
+            
+            stats = {
+                'new': int(is_new.sum()),
+                'changed': int(is_changed.sum()),
+                'unchanged': int((~to_write).sum()),
+                'deleted': 0,
+            }
+            
+            if to_write.any():
+                if self.upsert_table(df[to_write.values], table, key_columns, batch_size=batch_size) is None:
+                    return None
+            
+            if delete_missing:
+                stats['deleted'] = self._delete_missing_keys(df, table, key_columns, batch_size)
+                self.store_row_hashes(table, keys, hashes, replace_all=True)
+            else:
+                self.store_row_hashes(table, keys[to_write.values], hashes[to_write.values])
+            
+            self.logger.info(
+                f"Wijzigingen {table}: {stats['new']} nieuw, {stats['changed']} gewijzigd, "
+                f"{stats['unchanged']} ongewijzigd, {stats['deleted']} verwijderd"
+            )
+            return stats
+        except Exception as e:
+            self.logger.error(f"Fout bij synchroniseren van tabel {table}: {e}")
+            return None
+
+    @staticmethod
+    def _chunk_to_frame(rows, columns):
+        """
+        Zet een fetchmany chunk om naar een DataFrame. De rijen worden in één
+        kopie in een kolomsgewijze NumPy buffer gezet; de kolommen van die buffer
+        gaan zonder verdere kopie het DataFrame in en krijgen daarna per kolom
+        hun eigen dtype.
+        """
+        block = np.empty((len(rows), len(columns)), dtype=object)
+        block[:] = rows
+        frame = pd.DataFrame(
+            {column: block[:, index] for index, column in enumerate(columns)},
+            copy=False
+        )
+        return frame.infer_objects()
+    
+    def _iter_frames(self, query, params=None, chunksize=10000, include_empty=False):
+        """
+        Voer een query uit en lever het resultaat aan als DataFrame chunks
+        (zie _chunk_to_frame).
+        
+        De generator houdt een verbinding uit de pool vast tot hij helemaal
+        doorlopen of gesloten is; gebruik contextlib.closing als de aanroeper
+        eerder kan stoppen. Met include_empty wordt bij een leeg resultaat één
+        leeg DataFrame met de kolommen geleverd.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                columns = [column[0] for column in cursor.description]
+                empty = True
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    empty = False
+                    yield self._chunk_to_frame(rows, columns)
+                if empty and include_empty:
+                    yield pd.DataFrame(columns=columns)
+            finally:
+                cursor.close()
+    
+    def fetch_frame(self, query, params=None, chunksize=10000, iterator=False):
+        """
+        Haal het resultaat van een query op als DataFrame, gestreamd in chunks.
+        Beide vormen zetten elke chunk op dezelfde manier om (zie _chunk_to_frame).
+        
+        Args:
+            query (str): De SQL query
+            params (list, optional): Parameters voor de query
+            chunksize (int): Aantal rijen per fetchmany chunk
+            iterator (bool): Indien True een generator van DataFrame chunks
+                teruggeven in plaats van één samengevoegd DataFrame. De generator
+                houdt een verbinding uit de pool vast tot hij doorlopen of gesloten
+                is; gebruik bij voortijdig stoppen contextlib.closing.
+                
+        Returns:
+            pd.DataFrame of generator van pd.DataFrame
+            
+        Raises:
+            Exception: Bij fouten tijdens verbinden of uitvoeren van de query
+        """
+        if iterator:
+            return self._iter_frames(query, params, chunksize)
+        
+        chunks = list(self._iter_frames(query, params, chunksize, include_empty=True))
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
     def fetch_plaatsing_data(self, table_name="Plaatsingen"):
         """
         Haal alle plaatsingen op uit de opgegeven tabel.
@@ -236,41 +1051,17 @@ class DatabaseManager:
             pd.DataFrame: DataFrame met kolommen ['ID', 'Werknemer', 'Actief']
         """
         try:
-            conn = self.connect_to_database()
-            if not conn:
-                self.logger.error("Geen databaseverbinding voor ophalen plaatsingen.")
-                return pd.DataFrame()
-            cursor = conn.cursor()
-            query = f"SELECT ID, Werknemer, Actief FROM {table_name}"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            if not rows:
-                self.logger.warning(f"Geen plaatsingen gevonden in tabel {table_name}.")
-                cursor.close()
-                conn.close()
-                return pd.DataFrame(columns=["ID", "Werknemer", "Actief"])
-            plaatsing_dict = {}
-            for row in rows:
-                ID = row[0]
-                werknemer = row[1]
-                actief = row[2]
-                plaatsing_dict[ID] = {
-                    'Werknemer': werknemer,
-                    'Actief': actief
-                }
-            cursor.close()
-            conn.close()
+            df = self.fetch_frame(f"SELECT ID, Werknemer, Actief FROM {table_name}")
         except Exception as e:
             self.logger.error(f"Fout bij het ophalen van data uit de tabel {table_name}: {e}")
             return pd.DataFrame()
-        try:
-            self.logger.info("Data omzetten naar DataFrame gestart")
-            df = pd.DataFrame.from_dict(plaatsing_dict, orient='index').reset_index()
-            df.columns = ['ID', 'Werknemer', 'Actief']
-            return df
-        except Exception as e:
-            self.logger.error(f"Data omzetten naar DataFrame mislukt: {e}")
-            return pd.DataFrame()
+        if df.empty:
+            self.logger.warning(f"Geen plaatsingen gevonden in tabel {table_name}.")
+            return pd.DataFrame(columns=["ID", "Werknemer", "Actief"])
+        # Eén rij per ID, de laatste wint (zoals voorheen via de dictionary)
+        df = df.drop_duplicates(subset='ID', keep='last').reset_index(drop=True)
+        df.columns = ['ID', 'Werknemer', 'Actief']
+        return df
 
     def fetch_contract_phase_data(self, table_name="Plaatsingen", only_active=False):
         """
@@ -281,44 +1072,25 @@ class DatabaseManager:
         Returns:
             pd.DataFrame: DataFrame met kolommen ['ID', 'Werknemer', 'Contracttype', 'Actief']
         """
-        max_retries = self.max_retries
-        retry_delay = self.retry_delay
-        contract_dict = None
-        try:
-            conn = self.connect_to_database()
-            if not conn:
-                self.logger.error("Geen databaseverbinding voor ophalen contractfases.")
-                return pd.DataFrame()
-            cursor = conn.cursor()
-            for attempt in range(max_retries):
-                try:
-                    query = f"SELECT ID, Werknemer, Contracttype, Actief FROM {table_name}"
-                    if only_active:
-                        query += " WHERE Actief = 1"
-                    cursor.execute(query)
-                    rows = cursor.fetchall()
-                    contract_dict = {row[0]: (row[1], row[2], row[3]) for row in rows}
-                    if contract_dict:
-                        break
-                except Exception as e:
-                    self.logger.warning(f"Fout bij poging {attempt+1} contractfases ophalen: {e}")
-                    time.sleep(retry_delay)
-            cursor.close()
-            conn.close()
-        except Exception as e:
-            self.logger.error(f"Fout bij het ophalen van data uit de tabel {table_name}: {e}")
-            return pd.DataFrame()
-        if not contract_dict:
-            self.logger.error(f"Ophalen contract dictionary mislukt na meerdere pogingen")
-            return pd.DataFrame()
-        try:
-            contract_df = pd.DataFrame.from_dict(contract_dict, orient='index', columns=['Werknemer', 'Contracttype', 'Actief']).reset_index()
-            contract_df.rename(columns={'index': 'ID'}, inplace=True)
-            self.logger.info("Contractfases succesvol opgehaald en omgezet naar DataFrame")
-            return contract_df
-        except Exception as e:
-            self.logger.error(f"Data omzetten naar DataFrame mislukt: {e}")
+        query = f"SELECT ID, Werknemer, Contracttype, Actief FROM {table_name}"
+        if only_active:
+            query += " WHERE Actief = 1"
+        contract_df = pd.DataFrame()
+        for attempt in range(self.max_retries):
+            try:
+                contract_df = self.fetch_frame(query)
+                if not contract_df.empty:
+                    break
+            except Exception as e:
+                self.logger.warning(f"Fout bij poging {attempt+1} contractfases ophalen: {e}")
+                time.sleep(self.retry_delay)
+        if contract_df.empty:
+            self.logger.error(f"Ophalen contractfases mislukt na meerdere pogingen")
             return pd.DataFrame()
+        contract_df = contract_df.drop_duplicates(subset='ID', keep='last').reset_index(drop=True)
+        contract_df.columns = ['ID', 'Werknemer', 'Contracttype', 'Actief']
+        self.logger.info("Contractfases succesvol opgehaald en omgezet naar DataFrame")
+        return contract_df
 
     def fetch_loon_ids(self, table_name="Loon", id_column="ID"):
         """
@@ -330,18 +1102,44 @@ class DatabaseManager:
             list: Lijst met unieke ID's
         """
         try:
-            conn = self.connect_to_database()
-            if not conn:
-                self.logger.error("Geen databaseverbinding voor ophalen loon-ID's.")
+            df = self.fetch_frame(f"SELECT DISTINCT [{id_column}] FROM {table_name}")
+            if df.empty:
                 return []
-            cursor = conn.cursor()
-            query = f"SELECT DISTINCT [{id_column}] FROM {table_name}"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            cursor.close()
-            conn.close()
-            ids = [row[0] for row in rows if row[0] is not None]
-            return ids
+            return df.iloc[:, 0].dropna().tolist()
         except Exception as e:
             self.logger.error(f"Fout bij het ophalen van loon-ID's uit {table_name}: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def iter_plaatsingen_zonder_loon(self, plaatsing_table="Plaatsingen", loon_table="Loon",
+                                     id_column="ID", chunksize=500):
+        """
+        Haal plaatsingen op waarvoor nog geen loondata bestaat, met één
+        anti-join query op de server, en lever ze in chunks aan.
+        Args:
+            plaatsing_table (str): Naam van de plaatsingen tabel (default: 'Plaatsingen')
+            loon_table (str): Naam van de loon tabel (default: 'Loon')
+            id_column (str): Naam van de ID kolom in de loon tabel (default: 'ID')
+            chunksize (int): Aantal plaatsingen per chunk
+        Yields:
+            list: Lijst van dicts met 'ID' en 'Werknemer'
+        Raises:
+            Exception: Bij fouten tijdens het ophalen, zodat een fout niet
+                verward wordt met "geen plaatsingen zonder loondata"
+        """
+        query = (
+            f"SELECT p.ID, MAX(p.Werknemer) AS Werknemer FROM {plaatsing_table} AS p "
+            f"WHERE p.ID IS NOT NULL "
+            f"AND NOT EXISTS (SELECT 1 FROM {loon_table} AS l WHERE l.[{id_column}] = p.ID) "
+            f"GROUP BY p.ID"
+        )
+        try:
+            total = 0
+            # closing: de pool verbinding ook vrijgeven als de aanroeper eerder stopt
+            with closing(self.fetch_frame(query, chunksize=chunksize, iterator=True)) as chunks:
+                for chunk in chunks:
+                    total += len(chunk)
+                    yield chunk.to_dict('records')
+            self.logger.info(f"{total} plaatsingen zonder loondata gevonden in {plaatsing_table}")
+        except Exception as e:
+            self.logger.error(f"Fout bij het ophalen van plaatsingen zonder loondata: {e}")
+            raise
@@ -0,0 +1,394 @@
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal, ROUND_HALF_UP
+import pandas as pd
+import threading
+import logging
+import pyodbc
+import queue
+import time
+
+
+# SQL types uit de TypeMapper mappings -> pyodbc input sizes (type, grootte, decimalen).
+# Voor decimal en nvarchar zijn dit terugvalwaarden; build_input_sizes gebruikt
+# de precisie, schaal en lengte van de doelkolom als die bekend zijn.
+SQL_INPUT_SIZES = {
+    'bigint': (pyodbc.SQL_BIGINT, 0, 0),
+    'int': (pyodbc.SQL_INTEGER, 0, 0),
+    'decimal': (pyodbc.SQL_DECIMAL, 38, 10),
+    'bit': (pyodbc.SQL_BIT, 0, 0),
+    'nvarchar': (pyodbc.SQL_WVARCHAR, 0, 0),
+    'date': (pyodbc.SQL_TYPE_DATE, 0, 0),
+    'datetime': (pyodbc.SQL_TYPE_TIMESTAMP, 23, 3),
+    'time': (pyodbc.SQL_TYPE_TIME, 8, 0),
+}
+
+
+def infer_sql_type(series):
+    """
+    Leid het SQL type af van een (door de TypeMapper geconverteerde) kolom.
+    
+    Args:
+        series: De kolom
+    
+    Returns:
+        str: SQL type zoals gebruikt in de TypeMapper mappings
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return 'bit'
+    if pd.api.types.is_integer_dtype(series):
+        return 'bigint'
+    if pd.api.types.is_float_dtype(series):
+        return 'decimal'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    
+    # Object kolommen: kijk naar de eerste gevulde waarde
+    non_null = series.dropna()
+    sample = non_null.iloc[0] if len(non_null) else None
+    if isinstance(sample, bool):
+        return 'bit'
+    if isinstance(sample, datetime):
+        return 'datetime'
+    if isinstance(sample, date):
+        return 'date'
+    if isinstance(sample, dt_time):
+        return 'time'
+    return 'nvarchar'
+
+
+def _column_input_size(sql_type, column_size=None):
+    """
+    De pyodbc input size voor één kolom, met de grootte van de doelkolom indien bekend.
+    
+    Args:
+        sql_type: SQL type zoals gebruikt in de TypeMapper mappings
+        column_size: Optioneel (data_type, lengte of precisie, schaal) van de doelkolom
+    
+    Returns:
+        tuple: (pyodbc type, grootte, decimalen)
+    """
+    if column_size is None:
+        return SQL_INPUT_SIZES[sql_type]
+    data_type, size, scale = column_size
+    if sql_type == 'decimal':
+        if data_type in ('float', 'real'):
+            return (pyodbc.SQL_DOUBLE, 0, 0)
+        if data_type in ('decimal', 'numeric', 'money', 'smallmoney'):
+            return (pyodbc.SQL_DECIMAL, size, scale)
+    if sql_type == 'nvarchar' and data_type in ('nvarchar', 'nchar', 'varchar', 'char'):
+        # 0 bindt als nvarchar(max); langer dan 4000 tekens kan alleen als max
+        return (pyodbc.SQL_WVARCHAR, size if 0 < size <= 4000 else 0, 0)
+    return SQL_INPUT_SIZES[sql_type]
+
+
+def build_input_sizes(df, column_types=None, column_sizes=None):
+    """
+    Bouw de pyodbc input sizes voor de kolommen van een DataFrame.
+    
+    Args:
+        df: Het DataFrame
+        column_types: Optionele dictionary met kolomnamen en SQL types (TypeMapper mapping)
+        column_sizes: Optionele uitvoer van DatabaseManager.get_column_sizes voor de doeltabel
+    
+    Returns:
+        list: Input sizes in kolomvolgorde
+    """
+    column_types = column_types or {}
+    column_sizes = column_sizes or {}
+    return [
+        _column_input_size(column_types.get(column) or infer_sql_type(df[column]), column_sizes.get(column))
+        for column in df.columns
+    ]
+
+
+def _to_decimal(value, quantum):
+    """
+    Zet een getal om naar Decimal via de kortste tekstweergave, zodat er geen
+    binaire float ruis meegestuurd wordt, afgerond op de schaal van de kolom.
+    """
+    if isinstance(value, Decimal):
+        return value.quantize(quantum, rounding=ROUND_HALF_UP)
+    return Decimal(repr(value)).quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def dataframe_to_rows(df, input_sizes=None):
+    """
+    Zet een DataFrame om naar een lijst van tuples met Python waarden,
+    waarbij ontbrekende waarden (NaN, NaT, NA) None worden. Kolommen die als
+    SQL_DECIMAL gebonden worden, worden omgezet naar Decimal.
+    
+    Args:
+        df: Het DataFrame
+        input_sizes: Optioneel de uitvoer van build_input_sizes voor dit DataFrame
+    """
+    frame = df.astype(object).where(df.notna(), None)
+    for position, (sql_type, _, scale) in enumerate(input_sizes or []):
+        if sql_type == pyodbc.SQL_DECIMAL:
+            quantum = Decimal(1).scaleb(-scale)
+            frame.iloc[:, position] = frame.iloc[:, position].map(
+                lambda value: None if value is None else _to_decimal(value, quantum)
+            )
+    return list(frame.itertuples(index=False, name=None))
+
+
+class ToSqlWriter:
+    """
+    Writer die de data via DataFrame.to_sql en de SQLAlchemy engine wegschrijft.
+    """
+    
+    name = 'to_sql'
+    
+    def __init__(self, database_manager):
+        self.database_manager = database_manager
+        self.logger = logging.getLogger(__name__)
+    
+    def write(self, df, table, batch_size=1000, column_types=None):
+        """
+        Schrijf een DataFrame in batches naar een tabel.
+        
+        Args:
+            df: Pandas DataFrame met data
+            table: Naam van de doel tabel
+            batch_size: Grootte van de batches voor schrijven
+            column_types: Niet gebruikt, types worden door pandas afgeleid
+        
+        Returns:
+            int: Aantal geschreven rijen
+        """
+        engine = self.database_manager.get_engine()
+        rows_added = 0
+        for start in range(0, len(df), batch_size):
+            batch_df = df.iloc[start:start + batch_size]
+            batch_df.to_sql(table, con=engine, index=False, if_exists="append", schema="dbo")
+            rows_added += len(batch_df)
+            self.logger.info(f"{rows_added} rijen toegevoegd aan tabel {table}")
+        return rows_added
+
+
+class ExecutemanyWriter:
+    """
+    Writer die direct via pyodbc met fast_executemany schrijft. De parameter
+    types worden vooraf vastgelegd met setinputsizes (uit de TypeMapper mapping
+    of afgeleid van de dtypes), zodat er per batch geen type-inferentie nodig is.
+    """
+    
+    name = 'executemany'
+    
+    def __init__(self, database_manager):
+        self.database_manager = database_manager
+        self.logger = logging.getLogger(__name__)
+    
+    def write(self, df, table, batch_size=1000, column_types=None):
+        """
+        Schrijf een DataFrame in batches naar een tabel binnen één transactie.
+        
+        Args:
+            df: Pandas DataFrame met data
+            table: Naam van de doel tabel
+            batch_size: Grootte van de batches voor schrijven
+            column_types: Optionele dictionary met kolomnamen en SQL types
+        
+        Returns:
+            int: Aantal geschreven rijen
+        """
+        if df.empty:
+            return 0
+        
+        column_list = ', '.join(f"[{column}]" for column in df.columns)
+        placeholders = ', '.join(['?'] * len(df.columns))
+        sql = f"INSERT INTO dbo.[{table}] ({column_list}) VALUES ({placeholders})"
+        input_sizes = build_input_sizes(df, column_types, self.database_manager.get_column_sizes(table))
+        
+        rows_added = 0
+        with self.database_manager.connection() as connection:
+            cursor = connection.cursor()
+            cursor.fast_executemany = True
+            cursor.setinputsizes(input_sizes)
+            for start in range(0, len(df), batch_size):
+                rows = dataframe_to_rows(df.iloc[start:start + batch_size], input_sizes)
+                cursor.executemany(sql, rows)
+                rows_added += len(rows)
+                self.logger.info(f"{rows_added} rijen toegevoegd aan tabel {table}")
+            connection.commit()
+            cursor.close()
+        return rows_added
+
+
+class ParallelBatchWriter:
+    """
+    Writer die het voorbereiden van batches overlapt met het versturen ervan.
+    Eén producer zet batches om naar rijen en zet ze in een begrensde queue
+    (backpressure); N workers met elk een eigen connectie uit de pool sturen
+    ze naar de database. Bedoeld voor grote loads zoals UrenRapportage backfills.
+    
+    Let op: de load is niet atomisch over workers heen. Bij een fout stoppen
+    alle workers, maar batches die al gecommit zijn blijven staan. Laad daarom
+    in een staging tabel, zoals DatabaseManager.replace_date_range doet.
+    """
+    
+    name = 'parallel'
+    
+    def __init__(self, database_manager, workers=4, queue_size=None, commit_per_batch=True):
+        """
+        Args:
+            database_manager: De DatabaseManager die de connecties levert
+            workers: Aantal parallelle worker connecties
+            queue_size: Maximaal aantal klaargezette batches (standaard 2 per worker)
+            commit_per_batch: Indien True na elke batch committen, anders één
+                commit per worker aan het einde
+        """
+        self.database_manager = database_manager
+        self.workers = workers
+        self.queue_size = queue_size or workers * 2
+        self.commit_per_batch = commit_per_batch
+        self.logger = logging.getLogger(__name__)
+    
+    def write(self, df, table, batch_size=1000, column_types=None):
+        """
+        Schrijf een DataFrame parallel in batches naar een tabel.
+        
+        Args:
+            df: Pandas DataFrame met data
+            table: Naam van de doel tabel
+            batch_size: Grootte van de batches voor schrijven
+            column_types: Optionele dictionary met kolomnamen en SQL types
+            
+        Returns:
+            int: Aantal geschreven rijen
+            
+        Raises:
+            RuntimeError: Als één of meer batches mislukt zijn (eerste batch in volgorde)
+        """
+        if df.empty:
+            return 0
+        
+        column_list = ', '.join(f"[{column}]" for column in df.columns)
+        placeholders = ', '.join(['?'] * len(df.columns))
+        sql = f"INSERT INTO dbo.[{table}] ({column_list}) VALUES ({placeholders})"
+        input_sizes = build_input_sizes(df, column_types, self.database_manager.get_column_sizes(table))
+        total_batches = (len(df) + batch_size - 1) // batch_size
+        
+        batch_queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        lock = threading.Lock()
+        errors = {}
+        progress = {'rows': 0, 'batches': 0}
+        
+        def worker(worker_id):
+            connection = None
+            cursor = None
+            try:
+                connection = self.database_manager.connect_to_database()
+                if connection is None:
+                    raise ConnectionError("Geen databaseverbinding beschikbaar")
+                cursor = connection.cursor()
+                cursor.fast_executemany = True
+                cursor.setinputsizes(input_sizes)
+            except Exception as e:
+                with lock:
+                    errors[-1 - worker_id] = e
+                stop.set()
+            
+            # Blijf de queue leegmaken tot het stopsignaal, ook na een fout,
+            # zodat de producer nooit blijft hangen op een volle queue.
+            while True:
+                item = batch_queue.get()
+                if item is None:
+                    break
+                index, rows = item
+                if stop.is_set() or cursor is None:
+                    continue
+                try:
+                    cursor.executemany(sql, rows)
+                    if self.commit_per_batch:
+                        connection.commit()
+                    with lock:
+                        progress['rows'] += len(rows)
+                        progress['batches'] += 1
+                        self.logger.info(
+                            f"Batch {index + 1}/{total_batches} geschreven door worker {worker_id}, "
+                            f"{progress['rows']} rijen toegevoegd aan tabel {table}"
+                        )
+                except Exception as e:
+                    with lock:
+                        errors[index] = e
+                    stop.set()
+            
+            if connection is not None:
+                try:
+                    if stop.is_set():
+                        connection.rollback()
+                    elif not self.commit_per_batch:
+                        connection.commit()
+                finally:
+                    if cursor is not None:
+                        cursor.close()
+                    connection.close()
+        
+        threads = [
+            threading.Thread(target=worker, args=(worker_id,), name=f"batch-writer-{worker_id}", daemon=True)
+            for worker_id in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        # Producer: batches voorbereiden terwijl de workers versturen
+        start = time.perf_counter()
+        try:
+            for index, offset in enumerate(range(0, len(df), batch_size)):
+                if stop.is_set():
+                    break
+                rows = dataframe_to_rows(df.iloc[offset:offset + batch_size], input_sizes)
+                batch_queue.put((index, rows))
+        finally:
+            for _ in threads:
+                batch_queue.put(None)
+            for thread in threads:
+                thread.join()
+        
+        if errors:
+            for index in sorted(errors):
+                if index < 0:
+                    self.logger.error(f"Worker {-1 - index} kon geen verbinding maken: {errors[index]}")
+                else:
+                    self.logger.error(f"Batch {index + 1}/{total_batches} naar tabel {table} mislukt: {errors[index]}")
+            first = min(errors)
+            raise RuntimeError(
+                f"{len(errors)} fout(en) bij parallel schrijven naar {table}, "
+                f"{progress['rows']} rijen geschreven; eerste fout: {errors[first]}"
+            )
+        
+        duration = time.perf_counter() - start
+        self.logger.info(
+            f"{progress['rows']} rijen in {progress['batches']} batches parallel geschreven naar {table} "
+            f"met {self.workers} workers in {duration:.2f}s"
+        )
+        return progress['rows']
+
+
+# Beschikbare writer backends op naam
+WRITERS = {
+    ToSqlWriter.name: ToSqlWriter,
+    ExecutemanyWriter.name: ExecutemanyWriter,
+    ParallelBatchWriter.name: ParallelBatchWriter,
+}
+
+
+def get_writer(name, database_manager, **options):
+    """
+    Maak een writer backend aan op naam.
+    
+    Args:
+        name: Naam van de writer ('to_sql', 'executemany' of 'parallel')
+        database_manager: De DatabaseManager die de connecties levert
+        **options: Extra opties voor de writer (bijv. workers voor 'parallel')
+    
+    Returns:
+        Writer instantie
+    
+    Raises:
+        ValueError: Bij een onbekende writer naam
+    """
+    if name not in WRITERS:
+        raise ValueError(f"Onbekende writer '{name}'. Beschikbaar: {list(WRITERS)}")
+    return WRITERS[name](database_manager, **options)
@@ -0,0 +1,271 @@
+from pathlib import Path
+import ctypes.util
+import logging
+import ctypes
+import select
+import struct
+import time
+import sys
+import os
+import re
+
+
+# inotify event masks (zie <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+
+# Bestanden die nog gedownload worden
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp', '.part')
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """
+    Laad libc voor inotify, of None als inotify niet beschikbaar is (bijv. buiten Linux).
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class DownloadWatcher:
+    """
+    Een event-gedreven tracker voor een download directory.
+    
+    Op Linux wordt inotify gebruikt (IN_CLOSE_WRITE en IN_MOVED_TO), zodat een
+    voltooide download binnen milliseconden opgemerkt wordt; elders valt de
+    watcher terug op pollen. Gedeeltelijke downloads (.crdownload, .tmp) worden
+    genegeerd. Per patroon wordt een kleine index van bekende bestanden
+    bijgehouden, zodat de nieuwste match zonder volledige herscan gevonden wordt.
+    
+    Gebruik: arm de watcher vóór de klik die de download start, en wacht daarna
+    met wait_for op het nieuwe bestand.
+    """
+    
+    def __init__(self, directory, poll_interval=0.25):
+        """
+        Initialiseer de DownloadWatcher.
+        
+        Args:
+            directory: De download directory
+            poll_interval: Interval in seconden voor de polling fallback
+        """
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._fd = None
+        self._baseline = {}
+        self._index = {}
+        self._index_stamps = {}
+    
+    def __enter__(self):
+        return self.arm()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    @staticmethod
+    def is_partial(name):
+        """
+        Of een bestandsnaam een nog lopende download is.
+        """
+        return name.endswith(PARTIAL_SUFFIXES) or name.startswith('.com.google.Chrome')
+    
+    def _snapshot(self):
+        """
+        Momentopname van de voltooide bestanden in de directory (naam -> (mtime, grootte)).
+        """
+        snapshot = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and not self.is_partial(entry.name):
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+    
+    def arm(self):
+        """
+        Leg de huidige inhoud van de directory vast en start inotify (indien
+        beschikbaar). Roep dit aan vóór de actie die de download start.
+        
+        Returns:
+            DownloadWatcher: De watcher zelf
+        """
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._baseline = self._snapshot()
+        
+        if _libc is not None:
+            fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                wd = _libc.inotify_add_watch(fd, os.fsencode(self.directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd >= 0:
+                    self._fd = fd
+                else:
+                    os.close(fd)
+            if self._fd is None:
+                self.logger.warning(f"inotify niet beschikbaar ({os.strerror(ctypes.get_errno())}), terugvallen op pollen")
+        return self
+    
+    def close(self):
+        """
+        Stop de inotify watch.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+    
+    def _read_events(self, timeout):
+        """
+        Wacht maximaal timeout seconden op inotify events.
+        
+        Returns:
+            list: Bestandsnamen uit de events, of None bij een overflow van de event queue
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        
+        names = []
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+    
+    def _new_matches(self, regex, names=None):
+        """
+        Voltooide bestanden die na arm() zijn verschenen of gewijzigd en op het patroon passen.
+        
+        Args:
+            regex: Gecompileerd patroon voor de bestandsnaam
+            names: Optionele kandidaten (uit inotify events); als None, wordt de directory gescand
+        
+        Returns:
+            list: Paden van de nieuwe bestanden
+        """
+        if names is None:
+            candidates = self._snapshot()
+        else:
+            candidates = {}
+            for name in names:
+                if self.is_partial(name) or not regex.match(name):
+                    continue
+                try:
+                    stat = (self.directory / name).stat()
+                except FileNotFoundError:
+                    continue
+                candidates[name] = (stat.st_mtime_ns, stat.st_size)
+        
+        return [
+            self.directory / name
+            for name, signature in candidates.items()
+            if regex.match(name) and self._baseline.get(name) != signature
+        ]
+    
+    def wait_for(self, pattern, timeout=120):
+        """
+        Wacht op een voltooide download die op het patroon past.
+        
+        Args:
+            pattern: Regex patroon voor de bestandsnaam
+            timeout: Timeout in seconden
+        
+        Returns:
+            Path: Het nieuwste nieuwe bestand, of None bij timeout
+        """
+        regex = re.compile(pattern)
+        start = time.monotonic()
+        deadline = start + timeout
+        names = None
+        
+        while True:
+            matches = self._new_matches(regex, names)
+            if matches:
+                newest = max(matches, key=lambda path: path.stat().st_mtime_ns)
+                self._remember(pattern, newest)
+                self.logger.info(f"Download {newest.name} voltooid na {time.monotonic() - start:.2f}s")
+                return newest
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.error(f"Download timeout na {timeout}s voor patroon '{pattern}' in {self.directory}")
+                return None
+            
+            if self._fd is not None:
+                # Bij een timeout van select of een overflow volgt een volledige scan als vangnet
+                names = self._read_events(min(remaining, 1.0))
+                if not names:
+                    names = None
+            else:
+                time.sleep(min(self.poll_interval, remaining))
+                names = None
+    
+    def _remember(self, pattern, path):
+        """
+        Neem een bestand op in de index van een patroon.
+        """
+        try:
+            self._index.setdefault(pattern, {})[path.name] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+    
+    def newest(self, pattern):
+        """
+        Vind het nieuwste voltooide bestand in de directory dat op het patroon past.
+        
+        De passende bestanden worden per patroon geïndexeerd. Zolang de mtime van
+        de directory niet veranderd is, wordt de index zonder scan hergebruikt;
+        na een wijziging (nieuw, hernoemd of verwijderd bestand) wordt de index
+        met een volledige scan opnieuw opgebouwd.
+        
+        Args:
+            pattern: Regex patroon voor de bestandsnaam
+        
+        Returns:
+            Tuple[Path, re.Match]: Het bestand en de match, of (None, None)
+        """
+        regex = re.compile(pattern)
+        index = self._index.setdefault(pattern, {})
+        
+        # De mtime van de directory verandert bij elk nieuw, hernoemd of verwijderd bestand
+        try:
+            directory_mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None, None
+        if self._index_stamps.get(pattern) != directory_mtime:
+            index.clear()
+            for name, (mtime, _) in self._snapshot().items():
+                if regex.match(name):
+                    index[name] = mtime
+            self._index_stamps[pattern] = directory_mtime
+        
+        for mtime, name in sorted(((mtime, name) for name, mtime in index.items()), reverse=True):
+            path = self.directory / name
+            if path.exists():
+                return path, regex.match(name)
+        return None, None
@@ -0,0 +1,258 @@
+from urllib.parse import quote_plus, unquote_plus, urljoin
+from pathlib import Path
+import requests
+import logging
+import json
+import io
+import os
+
+
+# Content types en headers waaraan een export response herkend wordt
+EXPORT_MIME_TYPES = ('spreadsheetml', 'ms-excel', 'text/csv', 'octet-stream')
+
+# Request headers die niet in een template bewaard worden; de sessie levert ze zelf
+SKIPPED_HEADERS = ('cookie', 'content-length', 'host', 'connection', 'accept-encoding')
+
+
+def _escape(text):
+    """
+    Escape accolades, zodat tekst uit een opgenomen request veilig in een template staat.
+    """
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def is_export_response(content_type, content_disposition=''):
+    """
+    Of een response een export (Excel/CSV bijlage) is en geen HTML pagina, zoals het loginformulier.
+    
+    Args:
+        content_type: De Content-Type (of CDP mimeType) van de response
+        content_disposition: De Content-Disposition header van de response
+    
+    Returns:
+        bool: True als de response een export is
+    """
+    return any(export_type in (content_type or '') for export_type in EXPORT_MIME_TYPES) or \
+        'attachment' in (content_disposition or '')
+
+
+class EuurHttpClient:
+    """
+    Een HTTP client die E-Uur exports direct opvraagt, zonder browser.
+    
+    De export requests worden één keer tijdens een browser download opgenomen
+    (zie SeleniumManager.last_export_request) en als template bewaard, met de
+    request headers. Daarna worden ze met de cookies van een ingelogde sessie
+    opnieuw afgespeeld, met bijvoorbeeld datums als parameters. De client
+    controleert alleen of er een export terugkomt; de inhoud wordt door de
+    aanroeper gevalideerd (zie SeleniumManager.http_export). Chrome blijft de
+    terugval als een template ontbreekt of de sessie verlopen is.
+    """
+    
+    def __init__(self, base_url, templates_path, timeout=60):
+        """
+        Initialiseer de EuurHttpClient.
+        
+        Args:
+            base_url: De E-Uur URL
+            templates_path: JSON bestand met de opgenomen export requests
+            timeout: Timeout per request in seconden
+        """
+        self.base_url = base_url
+        self.templates_path = Path(templates_path)
+        self.timeout = timeout
+        self.logger = logging.getLogger(__name__)
+        self.cookies = []
+        self.headers = {}
+        self.templates = self._load_templates()
+    
+    @classmethod
+    def from_driver(cls, driver, base_url, templates_path, timeout=60):
+        """
+        Maak een client met de cookies en user agent van een ingelogde browser sessie.
+        """
+        client = cls(base_url, templates_path, timeout)
+        client.cookies = driver.get_cookies()
+        client.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        return client
+    
+    @classmethod
+    def from_cookie_cache(cls, cookie_cache, base_url, username, password, templates_path, timeout=60):
+        """
+        Maak een client met de gecachte cookies van een eerdere login, of None als die er niet zijn.
+        """
+        if cookie_cache is None:
+            return None
+        cookies = cookie_cache.load(base_url, username, password)
+        if not cookies:
+            return None
+        client = cls(base_url, templates_path, timeout)
+        client.cookies = cookies
+        return client
+    
+    def _load_templates(self):
+        """
+        Lees de opgenomen export requests.
+        """
+        if not self.templates_path.exists():
+            return {}
+        try:
+            with open(self.templates_path, encoding='utf-8') as templates_file:
+                return json.load(templates_file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Export templates konden niet gelezen worden: {e}")
+            return {}
+    
+    def has_template(self, name):
+        """
+        Of er een opgenomen request is voor een export.
+        """
+        return name in self.templates
+    
+    def record_template(self, name, request, **params):
+        """
+        Bewaar een opgenomen export request als template. Velden in de query
+        string en form body met precies de waarde van een parameter (bijv. een
+        datum) worden vervangen door placeholders, zodat het request met andere
+        waarden afgespeeld kan worden. Als een parameter niet als veld in het
+        request voorkomt, wordt het request niet bewaard: afspelen zou dan niet
+        de gevraagde gegevens opleveren.
+        
+        Args:
+            name: Naam van de export, bijv. 'urenrapportage'
+            request: Dictionary met 'method', 'url' en optioneel 'postData' en 'headers'
+            **params: Parameter waarden in het request, bijv. start_datum='01-01-2024'
+        
+        Returns:
+            bool: True als de template opgeslagen is, False anders
+        """
+        if not request or not request.get('url'):
+            return False
+        
+        headers = {
+            key: value for key, value in (request.get('headers') or {}).items()
+            if not key.startswith(':') and key.lower() not in SKIPPED_HEADERS
+        }
+        url, separator, query = request['url'].partition('?')
+        query, fragment_separator, fragment = query.partition('#')
+        found = []
+        template = {
+            'method': request.get('method', 'GET'),
+            'url': _escape(url) + separator + self._template_fields(query, params, found) +
+                   fragment_separator + _escape(fragment),
+            'data': self._template_fields(request.get('postData') or '', params, found),
+            'headers': headers
+        }
+        missing = [key for key in params if key not in found]
+        if missing:
+            self.logger.info(f"Parameter(s) {', '.join(missing)} niet gevonden in het export request voor {name}, template niet opgeslagen")
+            return False
+        if len(found) != len(set(found)):
+            self.logger.info(f"Parameter waarde komt in meerdere velden van het export request voor {name} voor, template niet opgeslagen")
+            return False
+        
+        if self.templates.get(name) == template:
+            return True
+        self.templates[name] = template
+        tmp_path = self.templates_path.with_name(self.templates_path.name + f".{os.getpid()}.tmp")
+        try:
+            self.templates_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as templates_file:
+                json.dump(self.templates, templates_file, indent=2)
+            os.replace(tmp_path, self.templates_path)
+            self.logger.info(f"Export request voor {name} opgenomen")
+            return True
+        except OSError as e:
+            self.logger.warning(f"Export template voor {name} kon niet opgeslagen worden: {e}")
+            return False
+    
+    @staticmethod
+    def _template_fields(text, params, found):
+        """
+        Vervang in een query string of form body de velden waarvan de waarde
+        precies een parameter waarde is (onbewerkt of URL gecodeerd) door een
+        placeholder. Andere velden blijven ongewijzigd, ook als de parameter
+        waarde er als deel van de naam of waarde in voorkomt.
+        
+        Args:
+            text: De query string of form body, bijv. 'van=01-01-2024&tot=31-01-2024'
+            params: Parameter namen en waarden
+            found: Lijst waaraan de namen van de vervangen parameters toegevoegd
+                worden; een naam die twee keer voorkomt betekent een dubbelzinnige waarde
+        
+        Returns:
+            str: De tekst met placeholders, overige accolades geëscaped
+        """
+        if not text:
+            return ''
+        fields = []
+        for field in text.split('&'):
+            name, separator, value = field.partition('=')
+            matches = [key for key, param in params.items() if separator and param in (value, unquote_plus(value))]
+            # Bij gelijke waarden (bijv. start en eind op dezelfde dag) krijgt elk veld de volgende parameter
+            key = next((key for key in matches if key not in found), matches[0] if matches else None)
+            if key is None:
+                fields.append(_escape(field))
+            else:
+                fields.append(f"{_escape(name)}={{{key}}}")
+                found.append(key)
+        return '&'.join(fields)
+    
+    def _session(self):
+        """
+        Een nieuwe requests sessie met de cookies en headers van de client.
+        Elke thread krijgt een eigen sessie.
+        """
+        session = requests.Session()
+        session.headers.update(self.headers)
+        for cookie in self.cookies:
+            session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+            )
+        return session
+    
+    def export(self, name, **params):
+        """
+        Vraag een export op door het opgenomen request af te spelen. De response
+        wordt in delen in het geheugen gelezen.
+        
+        Args:
+            name: Naam van de export
+            **params: Waarden voor de placeholders in de template; ze worden URL gecodeerd ingevuld
+        
+        Returns:
+            io.BytesIO: De export, of None als er geen template is of de sessie niet (meer) geldig is
+        """
+        template = self.templates.get(name)
+        if template is None:
+            return None
+        
+        params = {key: quote_plus(str(value)) for key, value in params.items()}
+        url = urljoin(self.base_url, template['url'].format(**params))
+        data = template['data'].format(**params) or None
+        headers = dict(template.get('headers') or {})
+        if not data:
+            headers = {key: value for key, value in headers.items() if key.lower() != 'content-type'}
+        
+        try:
+            with self._session() as session:
+                with session.request(template['method'], url, data=data, headers=headers,
+                                     timeout=self.timeout, stream=True) as response:
+                    if response.status_code != 200:
+                        self.logger.warning(f"Export {name} via HTTP mislukt: status {response.status_code}")
+                        return None
+                    if not is_export_response(response.headers.get('Content-Type'), response.headers.get('Content-Disposition')):
+                        self.logger.info(f"Export {name} via HTTP gaf geen export terug (sessie verlopen?)")
+                        return None
+                    
+                    buffer = io.BytesIO()
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        buffer.write(chunk)
+        except requests.RequestException as e:
+            self.logger.warning(f"Export {name} via HTTP mislukt: {e}")
+            return None
+        
+        buffer.seek(0)
+        self.logger.info(f"Export {name} ({buffer.getbuffer().nbytes} bytes) via HTTP opgehaald")
+        return buffer
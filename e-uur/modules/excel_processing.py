@@ -1,9 +1,24 @@
+from modules.download_watcher import DownloadWatcher
+from pandas.io.parsers import TextParser
+from datetime import date, datetime
 from openpyxl import load_workbook
 import pandas as pd
+import hashlib
 import logging
+import json
+import csv
+import io
 import os
 from pathlib import Path
-import re
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+
+# Beschikbare reader engines; 'auto' kiest calamine (indien geïnstalleerd) of openpyxl, en csv voor .csv bestanden
+READER_ENGINES = ('openpyxl', 'calamine', 'csv')
 
 
 class ExcelProcessor:
@@ -14,7 +29,7 @@ class ExcelProcessor:
     van Excel bestanden die looncomponent data bevatten.
     """
     
-    def __init__(self, base_dir=None, relative_path=None):
+    def __init__(self, base_dir=None, relative_path=None, engine='auto', cache_dir=None):
         """
         Initialiseer de ExcelProcessor.
         
@@ -22,11 +37,22 @@ class ExcelProcessor:
             base_dir: Het basis directory pad. Als None, wordt het huidige werkdirectory gebruikt.
             relative_path: Het relatieve pad naar het Excel bestand vanaf base_dir. 
                           Als None, moet het volledige pad worden opgegeven bij get_df_from_excel.
+            engine: Standaard reader engine ('openpyxl', 'calamine', 'csv' of 'auto')
+            cache_dir: Directory voor de laadstatus van exports (hashes van de laatst geladen downloads).
+                       Als None, wordt 'cache/exports' onder base_dir gebruikt.
         """
         self.base_dir = Path(base_dir) if base_dir else Path.cwd()
         self.logger = logging.getLogger(__name__)
         self.relative_path = relative_path
         self.default_excel_path = self.base_dir / relative_path if relative_path else None
+        self.engine = engine
+        self.cache_dir = Path(cache_dir) if cache_dir else self.base_dir / "cache" / "exports"
+        self._watchers = {}
+        self._row_readers = {
+            'openpyxl': self._iter_rows_openpyxl,
+            'calamine': self._iter_rows_calamine,
+            'csv': self._iter_rows_csv,
+        }
     
     def clean_excel(self, file_path):
         """
@@ -134,6 +160,216 @@ class ExcelProcessor:
             self.logger.error(f"Fout bij het verwerken van het Excel bestand: {e}")
             return None
 
+    def read_excel_streaming(self, filepath, engine=None, dtype=None):
+        """
+        Lees een export in één doorgang naar een DataFrame, zonder het bestand
+        op te schonen of opnieuw op te slaan.
+        
+        Het werkblad wordt rij voor rij gestreamd: rijen boven de kolomnamen worden
+        overgeslagen en het lezen stopt bij de eerste lege cel in kolom A, net als
+        bij clean_excel. Een bestand dat al opgeschoond is (kolomnamen in rij 1)
+        wordt volledig gelezen, zoals pd.read_excel dat doet.
+        
+        Args:
+            filepath: Het pad naar het Excel (of CSV) bestand, of de export als
+                      bytes/BytesIO (bijv. SeleniumManager.last_download)
+            engine: Reader engine ('openpyxl', 'calamine', 'csv' of 'auto'),
+                    standaard de engine van de processor
+            dtype: Optionele dictionary met kolomnamen en dtypes, bijv. uit
+                   TypeMapper.get_reader_options
+        
+        Returns:
+            pandas.DataFrame: Het DataFrame
+        
+        Raises:
+            ValueError: Als kolomnamen niet gevonden kunnen worden of bij een onbekende engine
+        """
+        filepath = self._source(filepath)
+        engine = self._resolve_engine(filepath, engine)
+        rows = self._row_readers[engine](filepath)
+        try:
+            # Vind de eerste rij met kolomnamen
+            header = None
+            header_row = 0
+            for header_row, row in enumerate(rows, start=1):
+                if row and row[0] is not None:
+                    header = row
+                    break
+            if header is None:
+                raise ValueError("Kolomnamen niet gevonden in het Excel-bestand.")
+            
+            # Lees de data tot de eerste lege rij (of tot het einde bij een opgeschoond bestand)
+            already_cleaned = header_row == 1
+            data = []
+            for row in rows:
+                if not already_cleaned and (not row or row[0] is None):
+                    break
+                data.append(row)
+        finally:
+            rows.close()
+        
+        self.logger.info(f"{len(data)} rijen gelezen met engine '{engine}'")
+        parser_options = {}
+        if engine == 'csv' and self._sniff_csv(filepath).delimiter == ';':
+            # Exports met ';' als scheidingsteken gebruiken een decimale komma
+            parser_options['decimal'] = ','
+        return self._frame_from_rows(header, data, dtype, **parser_options)
+    
+    @staticmethod
+    def _source(filepath):
+        """
+        Normaliseer een bron naar een Path, of naar een BytesIO voor een export
+        die in het geheugen ontvangen is.
+        """
+        if isinstance(filepath, (bytes, bytearray)):
+            return io.BytesIO(filepath)
+        if isinstance(filepath, io.BytesIO):
+            return filepath
+        return Path(filepath)
+    
+    @staticmethod
+    def _is_csv(source):
+        """
+        Of een bron een CSV export is: op extensie voor een bestand, en voor een buffer
+        als die niet met de signatuur van een xlsx (zip) of xls (OLE) bestand begint.
+        """
+        if isinstance(source, io.BytesIO):
+            return source.getvalue()[:4] not in (b'PK\x03\x04', b'\xd0\xcf\x11\xe0')
+        return source.suffix.lower() == '.csv'
+    
+    @staticmethod
+    def _open_text(source):
+        """
+        Open een CSV bron als tekst.
+        """
+        if isinstance(source, io.BytesIO):
+            return io.TextIOWrapper(io.BytesIO(source.getvalue()), encoding='utf-8-sig', newline='')
+        return open(source, newline='', encoding='utf-8-sig')
+    
+    def _resolve_engine(self, filepath, engine=None):
+        """
+        Bepaal de reader engine voor een bestand.
+        
+        Bij 'auto' wordt een CSV bestand met de CSV reader gelezen en een Excel
+        bestand met calamine als die geïnstalleerd is, anders met openpyxl.
+        
+        Args:
+            filepath: Het pad naar het bestand
+            engine: De gevraagde engine, of None voor de engine van de processor
+        
+        Returns:
+            str: De te gebruiken engine
+        
+        Raises:
+            ValueError: Bij een onbekende engine
+        """
+        engine = engine or self.engine
+        if engine == 'auto':
+            if self._is_csv(filepath):
+                return 'csv'
+            return 'calamine' if CalamineWorkbook is not None else 'openpyxl'
+        if engine not in READER_ENGINES:
+            raise ValueError(f"Onbekende reader engine '{engine}'. Beschikbaar: {list(READER_ENGINES)} of 'auto'")
+        if engine == 'calamine' and CalamineWorkbook is None:
+            self.logger.warning("python-calamine is niet geïnstalleerd, terugvallen op openpyxl")
+            return 'openpyxl'
+        return engine
+    
+    def _iter_rows_openpyxl(self, filepath):
+        """
+        Stream de rijen van het actieve werkblad met openpyxl in read-only modus.
+        """
+        if isinstance(filepath, io.BytesIO):
+            filepath.seek(0)
+        workbook = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            sheet.reset_dimensions()
+            yield from sheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
+    def _iter_rows_calamine(self, filepath):
+        """
+        Stream de rijen van het eerste werkblad met calamine. Lege cellen
+        (een lege string in calamine) worden None, zoals bij openpyxl.
+        """
+        if isinstance(filepath, io.BytesIO):
+            filepath.seek(0)
+            workbook = CalamineWorkbook.from_filelike(filepath)
+        else:
+            workbook = CalamineWorkbook.from_path(str(filepath))
+        sheet = workbook.get_sheet_by_index(0)
+        for row in sheet.iter_rows():
+            yield tuple(None if value == "" else value for value in row)
+    
+    @classmethod
+    def _sniff_csv(cls, filepath):
+        """
+        Leid het CSV dialect (scheidingsteken) af uit het begin van het bestand.
+        """
+        with cls._open_text(filepath) as csv_file:
+            try:
+                return csv.Sniffer().sniff(csv_file.read(8192), delimiters=';,\t')
+            except csv.Error:
+                return csv.excel
+    
+    def _iter_rows_csv(self, filepath):
+        """
+        Stream de rijen van een CSV export; lege velden worden None.
+        """
+        dialect = self._sniff_csv(filepath)
+        with self._open_text(filepath) as csv_file:
+            for row in csv.reader(csv_file, dialect):
+                yield tuple(value if value != "" else None for value in row)
+    
+    def _frame_from_rows(self, header, data, dtype=None, **parser_options):
+        """
+        Bouw een DataFrame uit de kolomnamen en datarijen van een werkblad, met
+        dezelfde celconversie en type-inferentie als pd.read_excel.
+        
+        Args:
+            header: De rij met kolomnamen
+            data: Lijst met datarijen
+            dtype: Optionele dictionary met kolomnamen en dtypes; kolommen die niet
+                   in het bestand staan worden genegeerd
+            **parser_options: Extra opties voor de pandas TextParser (bijv. decimal)
+        
+        Returns:
+            pandas.DataFrame: Het DataFrame
+        """
+        header = [self._convert_cell(value) for value in header]
+        while header and header[-1] == "":
+            header.pop()
+        width = len(header)
+        
+        rows = [header]
+        for row in data:
+            row = [self._convert_cell(value) for value in row[:width]]
+            rows.append(row + [""] * (width - len(row)))
+        
+        # Lege rijen onderaan negeren
+        while len(rows) > 1 and all(value == "" for value in rows[-1]):
+            rows.pop()
+        
+        if dtype:
+            dtype = {column: column_dtype for column, column_dtype in dtype.items() if column in header}
+        return TextParser(rows, header=0, dtype=dtype or None, **parser_options).read()
+    
+    @staticmethod
+    def _convert_cell(value):
+        """
+        Zet een celwaarde om zoals pd.read_excel dat doet: lege cellen worden
+        een lege string, gehele getallen een int en datums een datetime.
+        """
+        if value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, date) and not isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        return value
+
     def delete_excel_file(self, file_path):
         """
         Verwijder een Excel bestand.
@@ -144,6 +380,9 @@ class ExcelProcessor:
         Returns:
             bool: True als succesvol verwijderd, False anders
         """
+        if isinstance(file_path, (bytes, bytearray, io.BytesIO)):
+            # Een export uit het geheugen staat niet op schijf
+            return True
         file_path = Path(file_path)
         
         try:
@@ -160,7 +399,11 @@ class ExcelProcessor:
 
     def find_file_by_pattern(self, directory, pattern):
         """
-        Vind een bestand in een directory op basis van een regex patroon en extraheer groepen.
+        Vind het nieuwste bestand in een directory op basis van een regex patroon en extraheer groepen.
+        
+        Gedeeltelijke downloads (.crdownload) worden genegeerd. Per directory en
+        patroon wordt een index van bekende bestanden bijgehouden, zodat herhaalde
+        zoekacties de directory alleen opnieuw scannen als die gewijzigd is.
         
         Args:
             directory (str or Path): De directory om in te zoeken.
@@ -176,54 +419,140 @@ class ExcelProcessor:
             self.logger.error(f"De directory '{directory}' bestaat niet.")
             return None, None
         
-        # Gebruik een gecompileerd regex object voor efficiëntie
-        regex = re.compile(pattern)
+        watcher = self._watchers.get(directory)
+        if watcher is None:
+            watcher = self._watchers[directory] = DownloadWatcher(directory)
         
-        for item in directory.iterdir():
-            if item.is_file():
-                match = regex.match(item.name)
-                if match:
-                    self.logger.info(f"Bestand gevonden op basis van patroon: {item}")
-                    # Retourneer het pad en de gevonden groepen
-                    return item, match.groups()
+        item, match = watcher.newest(pattern)
+        if item is not None:
+            self.logger.info(f"Bestand gevonden op basis van patroon: {item}")
+            # Retourneer het pad en de gevonden groepen
+            return item, match.groups()
         
         self.logger.warning(f"Geen bestand gevonden in '{directory}' dat voldoet aan het patroon '{pattern}'.")
         return None, None
 
-    def get_df_from_excel(self, custom_filepath=None):
+    def file_hash(self, file_path):
+        """
+        Bereken de SHA-256 hash van de inhoud van een bestand.
+        
+        Args:
+            file_path: Het pad naar het bestand, of de export als bytes/BytesIO
+            
+        Returns:
+            str: De hexadecimale hash
+        """
+        if isinstance(file_path, io.BytesIO):
+            return hashlib.sha256(file_path.getvalue()).hexdigest()
+        if isinstance(file_path, (bytes, bytearray)):
+            return hashlib.sha256(file_path).hexdigest()
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+    
+    def _load_state(self):
+        """
+        Lees de laatst geladen hashes per cache sleutel.
+        """
+        state_path = self.cache_dir / "last_loaded.json"
+        if not state_path.exists():
+            return {}
+        try:
+            with open(state_path, encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Cache status kon niet gelezen worden, cache wordt genegeerd: {e}")
+            return {}
+    
+    def is_unchanged(self, cache_key, file_path):
+        """
+        Controleer of een download identiek is aan de laatst succesvol geladen
+        download voor dezelfde cache sleutel.
+        
+        Args:
+            cache_key: Sleutel van de export, bijv. 'Plaatsingen_actief'
+            file_path: Het pad naar de download, of de export als bytes/BytesIO
+            
+        Returns:
+            Tuple[bool, str]: Of de download ongewijzigd is, en de hash van de
+                              download (None als het bestand niet gelezen kon worden)
+        """
+        try:
+            digest = self.file_hash(file_path)
+        except OSError as e:
+            self.logger.warning(f"Hash van {file_path} kon niet bepaald worden: {e}")
+            return False, None
+        
+        last_loaded = self._load_state().get(cache_key, {})
+        unchanged = last_loaded.get('hash') == digest
+        if unchanged:
+            self.logger.info(f"Download voor {cache_key} is ongewijzigd sinds {last_loaded.get('geladen')} (hash {digest[:12]})")
+        return unchanged, digest
+    
+    def mark_loaded(self, cache_key, digest, rows=None):
+        """
+        Leg vast dat een download succesvol in de database geladen is, zodat een
+        volgende identieke download overgeslagen kan worden.
+        
+        Args:
+            cache_key: Sleutel van de export, bijv. 'Plaatsingen_actief'
+            digest: De hash van de geladen download
+            rows: Optioneel aantal geladen rijen
+            
+        Returns:
+            bool: True als succesvol vastgelegd, False anders
+        """
+        if digest is None:
+            return False
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            state = self._load_state()
+            state[cache_key] = {
+                'hash': digest,
+                'geladen': datetime.now().isoformat(timespec='seconds'),
+                'rijen': rows,
+            }
+            state_path = self.cache_dir / "last_loaded.json"
+            tmp_path = state_path.with_name(state_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(state, state_file, indent=2)
+            os.replace(tmp_path, state_path)
+            return True
+        except OSError as e:
+            self.logger.warning(f"Laadstatus voor {cache_key} kon niet opgeslagen worden: {e}")
+            return False
+
+    def get_df_from_excel(self, custom_filepath=None, engine=None, dtype=None):
         """
         Hoofdmethode voor het ophalen en verwerken van Excel data.
         
         Args:
-            custom_filepath: Optioneel aangepast bestandspad. 
+            custom_filepath: Optioneel aangepast bestandspad, of de export als bytes/BytesIO.
                            Als None, wordt het standaard pad gebruikt (indien geconfigureerd).
+            engine: Optionele reader engine, standaard de engine van de processor
+            dtype: Optionele dtype hints per kolom (zie TypeMapper.get_reader_options)
             
         Returns:
-            Tuple[pandas.DataFrame, Path]: Het DataFrame en bestandspad, 
+            Tuple[pandas.DataFrame, Path]: Het DataFrame en bestandspad (of buffer), 
                                          of None bij fout
         """
         if custom_filepath is None and self.default_excel_path is None:
             self.logger.error("Geen bestandspad opgegeven en geen standaard pad geconfigureerd")
             return None
             
-        filepath = Path(custom_filepath) if custom_filepath else self.default_excel_path
+        filepath = self._source(custom_filepath) if custom_filepath is not None else self.default_excel_path
         
-        if not filepath.exists():
+        if isinstance(filepath, Path) and not filepath.exists():
             self.logger.error(f"Excel bestand niet gevonden: {filepath}")
             return None
 
-        # Excel bestand opschonen
+        # Excel bestand in één doorgang inlezen, zonder opschonen en opslaan
         try:
-            status = self.clean_excel(filepath)
-            if status == "already_cleaned":
-                self.logger.info("Het bestand was al opgeschoond, doorgaan met de rest van het script.")
-        except Exception as e:
-            self.logger.error(f"Excel bestand opschonen mislukt: {e}")
-            return None
-
-        # Excel verwerking
-        try:
-            df = self.process_excel_file(filepath)
+            self.logger.info("Start excel verwerking")
+            df = self.read_excel_streaming(filepath, engine=engine, dtype=dtype)
+            self.logger.info("Excel bestand succesvol verwerkt")
         except Exception as e:
             self.logger.error(f"Excel verwerking mislukt: {e}")
             return None
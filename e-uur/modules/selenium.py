@@ -1,17 +1,48 @@
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import SessionNotCreatedException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium import webdriver
+from modules.download_watcher import DownloadWatcher
+from modules.euur_client import EuurHttpClient, is_export_response
+from modules.cookie_cache import CookieCache
+from modules.chromedriver import invalidate_chromedriver, resolve_chromedriver
+from modules.excel_processing import ExcelProcessor
+from modules.type_mapping import TypeMapper
 from pathlib import Path
 from dateutil.relativedelta import relativedelta
 from datetime import datetime, timedelta
+import threading
+import tempfile
 import logging
+import shutil
+import base64
+import queue
+import json
+import io
 import time
+import os
+import re
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Requests die voor het scrapen niet nodig zijn en via CDP geblokkeerd worden
+BLOCKED_URL_PATTERNS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.bmp', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*hotjar.com*', '*facebook.net*', '*clarity.ms*'
+)
+
+# Aantal keer achter elkaar dat een afgeleide deep link niet laadt voordat die losgelaten wordt
+MAX_DEEP_LINK_FOUTEN = 3
+
 class SeleniumManager:
     """
     Een efficiënte manager voor Selenium web automation taken.
@@ -31,6 +62,39 @@ class SeleniumManager:
         self.timeout = config.get('timeout', 10)
         self.headless = config.get('headless', True)
         
+        # Scraping profiel: geblokkeerde requests en een blijvende disk cache voor statische E-Uur bestanden
+        self.blocked_urls = list(config.get('blocked_urls', BLOCKED_URL_PATTERNS))
+        self.browser_cache_dir = Path(config.get('browser_cache_dir', self.download_dir / '.sessie' / 'chrome-cache'))
+        self._cache_lock = None
+        self._cache_slot = None
+        
+        # Chrome dat op de achtergrond gestart wordt, zie prewarm
+        self._prewarm_thread = None
+        self._prewarm_result = {}
+        
+        # Gemeten duur per wachtstap, zie wait_until
+        self.step_timings = []
+        
+        # Exports via CDP uit het netwerkverkeer halen; Chrome's eigen download gaat dan
+        # naar een eigen directory per sessie (zie _enable_capture) en dient alleen als terugval
+        self.capture_downloads = config.get('capture_downloads', True)
+        self.capture_dir = None
+        self.capture_buffer_size = config.get('capture_buffer_size', 100 * 1024 * 1024)
+        self.last_download = None
+        self.last_export_request = None
+        
+        # Opgenomen export requests die zonder browser via HTTP afgespeeld worden;
+        # alleen als dat expliciet aangezet is (config of EUUR_HTTP_EXPORTS)
+        self.http_exports = config.get(
+            'http_exports', os.getenv('EUUR_HTTP_EXPORTS', '').lower() in ('1', 'true', 'ja')
+        )
+        self.export_templates = Path(config.get('export_templates', self.download_dir / '.sessie' / 'export_templates.json'))
+        
+        # Versleutelde cache van sessie cookies, zodat een nieuwe browser het loginformulier kan overslaan
+        self.cookie_cache = None
+        if config.get('cookie_cache', True):
+            self.cookie_cache = CookieCache(config.get('cookie_cache_dir', self.download_dir / '.sessie'))
+        
         # Zorg ervoor dat download directory bestaat
         self.download_dir.mkdir(parents=True, exist_ok=True)
     
@@ -49,11 +113,21 @@ class SeleniumManager:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-plugins")
-        options.add_argument("--disable-images")  # Sneller laden
-        options.add_argument("--disable-javascript")  # Alleen indien niet nodig
         
         if self.headless:
-            options.add_argument("--headless")
+            options.add_argument("--headless=new")
+        
+        # Blijvende disk cache, zodat statische E-Uur bestanden (JS, CSS) niet elke sessie opnieuw geladen worden
+        cache_slot = self._claim_cache_dir()
+        if cache_slot is not None:
+            options.add_argument(f"--disk-cache-dir={cache_slot}")
+            options.add_argument("--disk-cache-size=104857600")
+        
+        # Performance log met alleen de Network events van CDP, voor het onderscheppen van exports.
+        # Het Network domein blijft aan voor de geblokkeerde requests; de log wordt rond elke export geleegd.
+        if self.capture_downloads:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
         
         # Download voorkeuren
         prefs = {
@@ -61,7 +135,8 @@ class SeleniumManager:
             "download.prompt_for_download": False,
             "download.directory_upgrade": True,
             "safebrowsing.enabled": True,
-            "profile.default_content_setting_values.notifications": 2  # Disable notifications
+            "profile.default_content_setting_values.notifications": 2,  # Disable notifications
+            "profile.managed_default_content_settings.images": 2  # Geen afbeeldingen laden
         }
         options.add_experimental_option("prefs", prefs)
         
@@ -75,13 +150,78 @@ class SeleniumManager:
             Geconfigureerde Chrome driver
         """
         options = self._setup_chrome_options()
-        service = Service(ChromeDriverManager().install())
+        driver_path = resolve_chromedriver()
+        service = Service(driver_path) if driver_path else Service()
         
-        driver = webdriver.Chrome(service=service, options=options)
+        try:
+            driver = webdriver.Chrome(service=service, options=options)
+        except SessionNotCreatedException as e:
+            if not driver_path:
+                raise
+            # De gecachte driver past niet (meer) bij Chrome: één keer opnieuw bepalen
+            logging.warning(f"ChromeDriver {driver_path} past niet bij Chrome ({e}), driver wordt opnieuw bepaald")
+            invalidate_chromedriver(driver_path)
+            new_driver_path = resolve_chromedriver()
+            if new_driver_path == driver_path:
+                raise
+            service = Service(new_driver_path) if new_driver_path else Service()
+            driver = webdriver.Chrome(service=service, options=options)
         driver.set_window_size(1920, 1080)
+        self._block_requests(driver)
         
         return driver
     
+    def _claim_cache_dir(self):
+        """
+        Reserveer een disk cache directory voor deze browser. Parallelle browsers
+        (zoals de loon workers) krijgen elk een eigen slot; het slot wordt met een
+        file lock vastgehouden tot de sessie gesloten wordt.
+        
+        Returns:
+            Path: De cache directory, of None als er geen slot beschikbaar is
+        """
+        if self._cache_slot is not None or fcntl is None:
+            return self._cache_slot
+        for slot in range(16):
+            slot_dir = self.browser_cache_dir / f"slot-{slot}"
+            try:
+                slot_dir.mkdir(parents=True, exist_ok=True)
+                lock = open(slot_dir / ".lock", "w")
+            except OSError:
+                return None
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                continue
+            self._cache_lock = lock
+            self._cache_slot = slot_dir
+            return slot_dir
+        return None
+    
+    def _release_cache_dir(self):
+        """
+        Geef het disk cache slot vrij.
+        """
+        if self._cache_lock is not None:
+            self._cache_lock.close()
+        self._cache_lock = None
+        self._cache_slot = None
+    
+    def _block_requests(self, driver):
+        """
+        Blokkeer afbeeldingen, fonts en analytics via CDP, zodat alleen de requests
+        die het scrapen nodig heeft geladen worden. De blokkade hoort bij het Network
+        domein; dat domein blijft daarom de hele sessie aan (zie _start_capture).
+        """
+        if not self.blocked_urls:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        except Exception as e:
+            logging.warning(f"Requests konden niet geblokkeerd worden via CDP: {e}")
+    
     def _wait_for_element(self, by, value, timeout = None):
         """
         Wacht tot een element beschikbaar is.
@@ -156,25 +296,51 @@ class SeleniumManager:
             logging.error(f"Fout bij invoeren tekst in {description}: {e}")
             return False
     
-    def _wait_for_download(self, filename, timeout = 120):
+    @staticmethod
+    def _download_pattern(filename):
+        """
+        Regex patroon voor een download, inclusief de ' (1)' varianten die Chrome
+        gebruikt als er al een bestand met dezelfde naam bestaat.
+        """
+        stem, suffix = os.path.splitext(filename)
+        return rf"^{re.escape(stem)}( \(\d+\))?{re.escape(suffix)}$"
+    
+    def _wait_for_download(self, filename, timeout = 120, watcher = None):
         """
         Wacht tot een bestand is gedownload.
         
+        De download wordt event-gedreven gevolgd met een DownloadWatcher. Als Chrome
+        het bestand onder een andere naam opslaat (bijv. 'Plaatsing (1).xlsx'),
+        wordt het hernoemd naar de verwachte naam.
+        
         Args:
             filename: Naam van het bestand
             timeout: Timeout in seconden
+            watcher: Optionele DownloadWatcher die vóór de klik op de download is gestart
             
         Returns:
             True als bestand gedownload is, False bij timeout
         """
         file_path = self.download_dir / filename
-        start_time = time.time()
         
-        while not file_path.exists():
-            if time.time() - start_time > timeout:
-                logging.error(f"Download timeout voor {filename}")
-                return False
-            time.sleep(1)
+        if watcher is None:
+            if file_path.exists():
+                logging.info(f"Bestand {filename} succesvol gedownload")
+                return True
+            watcher = DownloadWatcher(self.download_dir).arm()
+        
+        try:
+            downloaded_path = watcher.wait_for(self._download_pattern(filename), timeout)
+        finally:
+            watcher.close()
+        
+        if downloaded_path is None:
+            logging.error(f"Download timeout voor {filename}")
+            return False
+        
+        if downloaded_path != file_path:
+            os.replace(downloaded_path, file_path)
+            logging.info(f"Download {downloaded_path.name} hernoemd naar {filename}")
         
         logging.info(f"Bestand {filename} succesvol gedownload")
         return True
@@ -205,16 +371,153 @@ class SeleniumManager:
             logging.error(f"Fout bij hernoemen bestand: {e}")
             return False
     
+    def wait_until(self, predicate, timeout = None, description = "wachten"):
+        """
+        Wacht tot een predicate een waarde teruggeeft en registreer de duur van de stap
+        in step_timings. Een timeout is niet fataal; de aanroeper bepaalt of de flow doorgaat.
+        
+        Args:
+            predicate: Functie die de driver krijgt en een truthy waarde teruggeeft als de stap klaar is
+            timeout: Tijdsbudget voor deze stap in seconden (standaard self.timeout)
+            description: Omschrijving van de stap voor logging en step_timings
+            
+        Returns:
+            De waarde van de predicate, of None bij timeout
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(predicate)
+        except TimeoutException:
+            result = None
+        
+        duration = time.monotonic() - start
+        self.step_timings.append({'stap': description, 'seconden': round(duration, 3), 'gelukt': result is not None})
+        if result is None:
+            logging.warning(f"Timeout na {timeout}s bij stap: {description}")
+        else:
+            logging.info(f"Stap '{description}' klaar na {duration:.2f}s")
+        return result
+    
+    def grid_snapshot(self, row_selector = "tr[module]"):
+        """
+        Leg de huidige rijen van een grid vast, om daarna met wait_for_grid_reload op
+        nieuwe resultaten te wachten. Roep dit aan vóór de actie die het grid herlaadt.
+        
+        Args:
+            row_selector: CSS selector voor de rijen van het grid
+            
+        Returns:
+            Tuple: De eerste rij (of None) en het aantal rijen
+        """
+        rows = self.driver.find_elements(By.CSS_SELECTOR, row_selector)
+        return (rows[0] if rows else None, len(rows))
+    
+    def wait_for_grid_reload(self, snapshot, row_selector = "tr[module]", timeout = 30, description = "grid herladen"):
+        """
+        Wacht tot een grid herladen is: de eerder vastgelegde eerste rij is uit de DOM
+        verdwenen of het aantal rijen is veranderd.
+        
+        Args:
+            snapshot: Resultaat van grid_snapshot vóór de actie
+            row_selector: CSS selector voor de rijen van het grid
+            timeout: Tijdsbudget in seconden
+            description: Omschrijving van de stap
+            
+        Returns:
+            True als het grid herladen is, False bij timeout
+        """
+        first_row, count = snapshot
+        
+        def reloaded(driver):
+            if first_row is not None and EC.staleness_of(first_row)(driver):
+                return True
+            return len(driver.find_elements(By.CSS_SELECTOR, row_selector)) != count
+        
+        return self.wait_until(reloaded, timeout, description) is not None
+    
+    def wait_for_network_idle(self, idle_time = 0.5, timeout = 30, description = "netwerk idle"):
+        """
+        Wacht tot de pagina geen nieuwe requests meer afrondt gedurende idle_time seconden.
+        Gebruikt de Resource Timing API van de browser.
+        
+        Args:
+            idle_time: Aantal seconden zonder nieuwe requests
+            timeout: Tijdsbudget in seconden
+            description: Omschrijving van de stap
+            
+        Returns:
+            True als het netwerk idle is, False bij timeout
+        """
+        # De resource buffer is begrensd; bij een volle buffer wordt die geleegd (telt als activiteit)
+        script = """
+            if (performance.getEntriesByType('resource').length > 200) { performance.clearResourceTimings(); }
+            return [performance.getEntriesByType('resource').length, document.readyState];
+        """
+        state = {'count': None, 'since': time.monotonic()}
+        
+        def idle(driver):
+            count, ready_state = driver.execute_script(script)
+            now = time.monotonic()
+            if count != state['count'] or ready_state != 'complete':
+                state['count'] = count
+                state['since'] = now
+                return False
+            return now - state['since'] >= idle_time
+        
+        return self.wait_until(idle, timeout, description) is not None
+    
+    def prewarm(self):
+        """
+        Start Chrome alvast op de achtergrond, zodat het opstarten van de driver
+        niet op het kritieke pad ligt (bijv. terwijl de configuratie uit de database
+        opgehaald wordt). start_session gebruikt daarna deze driver.
+        """
+        if self.driver is not None or self._prewarm_thread is not None:
+            return
+        
+        result = {}
+        
+        def build():
+            try:
+                result['driver'] = self._create_driver()
+            except Exception as e:
+                result['error'] = e
+        
+        self._prewarm_result = result
+        self._prewarm_thread = threading.Thread(target=build, name="chrome-prewarm", daemon=True)
+        self._prewarm_thread.start()
+        logging.info("Chrome wordt op de achtergrond gestart")
+    
+    def _take_prewarmed_driver(self):
+        """
+        Neem de op de achtergrond gestarte driver over (wacht indien nodig tot die klaar is).
+        
+        Returns:
+            De driver, of None als er geen (werkende) voorgestarte driver is
+        """
+        if self._prewarm_thread is None:
+            return None
+        self._prewarm_thread.join()
+        self._prewarm_thread = None
+        result, self._prewarm_result = self._prewarm_result, {}
+        if 'error' in result:
+            logging.warning(f"Voorgestarte Chrome mislukt, nieuwe sessie wordt gestart: {result['error']}")
+            return None
+        return result.get('driver')
+    
     def start_session(self):
         """
-        Start een nieuwe browser sessie.
+        Start een nieuwe browser sessie, met de voorgestarte driver als die er is.
         
         Returns:
             True als succesvol gestart, False bij fout
         """
         try:
-            self.driver = self._create_driver()
+            self.driver = self._take_prewarmed_driver() or self._create_driver()
             self.wait = WebDriverWait(self.driver, self.timeout)
+            if self.capture_downloads:
+                self._enable_capture()
             logging.info("Browser sessie succesvol gestart")
             return True
         except Exception as e:
@@ -297,10 +600,131 @@ class SeleniumManager:
             logging.error(f"Fout bij navigeren naar start menu: {e}")
             return False
     
+    def _enable_capture(self):
+        """
+        Laat Chrome downloads in een eigen capture directory van deze sessie opslaan;
+        parallelle scripts delen dezelfde download_dir, maar niet elkaars downloads. Netwerk events van
+        vóór een export worden genegeerd (zie _start_capture). Als CDP niet
+        beschikbaar is, worden exports gewoon naar schijf gedownload.
+        """
+        try:
+            if self.capture_dir is None:
+                self.capture_dir = Path(tempfile.mkdtemp(prefix='.capture-', dir=self.download_dir))
+            self.driver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+                'behavior': 'allow',
+                'downloadPath': str(self.capture_dir.resolve())
+            })
+            self._performance_events()
+        except Exception as e:
+            logging.warning(f"CDP netwerk capture niet beschikbaar ({e}), exports worden naar schijf gedownload")
+            self.capture_downloads = False
+    
+    def _start_capture(self):
+        """
+        Bereid het Network domein voor op één export: de events van daarvoor worden
+        weggegooid en Chrome krijgt buffers waarin de response bodies bewaard worden,
+        zodat ze met Network.getResponseBody opgehaald kunnen worden. Network.enable
+        wordt opnieuw gestuurd en daarom ook de geblokkeerde requests.
+        """
+        self._performance_events()
+        self.driver.execute_cdp_cmd('Network.enable', {
+            'maxTotalBufferSize': self.capture_buffer_size * 2,
+            'maxResourceBufferSize': self.capture_buffer_size
+        })
+        if self.blocked_urls:
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+    
+    def _stop_capture(self):
+        """
+        Leeg de performance log na een export. Het Network domein blijft aan, omdat
+        Network.disable ook de geblokkeerde requests opheft.
+        """
+        try:
+            self._performance_events()
+        except Exception as e:
+            logging.warning(f"Performance log kon niet geleegd worden: {e}")
+    
+    def _performance_events(self):
+        """
+        Lees en leeg de performance log; geeft de CDP events (method en params) terug.
+        """
+        events = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                events.append(json.loads(entry['message'])['message'])
+            except (KeyError, ValueError):
+                continue
+        return events
+    
+    @staticmethod
+    def _is_export_response(response):
+        """
+        Of een CDP response een export (Excel/CSV bijlage) is.
+        """
+        headers = {key.lower(): value for key, value in response.get('headers', {}).items()}
+        return is_export_response(response.get('mimeType', ''), headers.get('content-disposition', ''))
+    
+    def _capture_export_response(self, timeout = 60):
+        """
+        Wacht op de export response in het netwerkverkeer en haal de body op via CDP.
+        Chrome bewaart de body dankzij de buffers uit _start_capture; is die toch
+        niet beschikbaar, dan volgt de download naar schijf als terugval.
+        
+        Args:
+            timeout: Timeout in seconden
+            
+        Returns:
+            bytes: De inhoud van de export, of None als die niet onderschept kon worden
+        """
+        deadline = time.monotonic() + timeout
+        request_id = None
+        requests_sent = {}
+        while time.monotonic() < deadline:
+            for event in self._performance_events():
+                method = event.get('method')
+                params = event.get('params', {})
+                if method == 'Network.requestWillBeSent':
+                    requests_sent[params.get('requestId')] = params.get('request')
+                elif method == 'Network.responseReceived' and request_id is None:
+                    if self._is_export_response(params.get('response', {})):
+                        request_id = params.get('requestId')
+                        # Het request bewaren, zodat het later zonder browser afgespeeld kan worden
+                        self.last_export_request = requests_sent.get(request_id)
+                elif method == 'Network.loadingFailed' and params.get('requestId') == request_id:
+                    logging.warning(f"Export request mislukt: {params.get('errorText')}")
+                    return None
+                elif method == 'Network.loadingFinished' and params.get('requestId') == request_id:
+                    try:
+                        body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                    except Exception as e:
+                        logging.warning(f"Response body van export niet beschikbaar: {e}")
+                        return None
+                    if body.get('base64Encoded'):
+                        return base64.b64decode(body['body'])
+                    return body['body'].encode('utf-8')
+            time.sleep(0.1)
+        return None
+    
+    def _clear_capture_dir(self):
+        """
+        Verwijder kopieën van eerder onderschepte exports uit de capture directory
+        van deze sessie.
+        """
+        for path in self.capture_dir.glob('*'):
+            if path.is_file():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+    
     def download_excel(self, filename = "download.xlsx"):
         """
         Download het Excel bestand.
         
+        Met CDP capture wordt de export uit het netwerkverkeer gehaald en als
+        BytesIO in last_download gezet, zonder te wachten op het bestand op schijf.
+        Lukt dat niet, dan wordt het bestand zoals voorheen naar download_dir/filename gedownload.
+        
         Args:
             filename: Naam van het te downloaden bestand
             
@@ -312,20 +736,289 @@ class SeleniumManager:
             excel_button = self._wait_for_clickable(
                 By.XPATH, '(//button[@title="Excel" and @data-controller="excel"])[2]'
             )
+            
+            self.last_download = None
+            self.last_export_request = None
+            capturing = False
+            if self.capture_downloads:
+                self._clear_capture_dir()
+                try:
+                    self._start_capture()
+                    capturing = True
+                except Exception as e:
+                    logging.warning(f"Netwerk capture kon niet gestart worden ({e}), export wordt naar schijf gedownload")
+            
+            # Start de watcher vóór de klik, zodat de download niet gemist wordt
+            watcher = DownloadWatcher(self.capture_dir if self.capture_downloads else self.download_dir).arm()
             if not self._safe_click(excel_button, "Excel download knop"):
+                watcher.close()
+                if capturing:
+                    self._stop_capture()
                 return False
             
+            if capturing:
+                try:
+                    body = self._capture_export_response()
+                finally:
+                    self._stop_capture()
+                if body is not None:
+                    watcher.close()
+                    self.last_download = io.BytesIO(body)
+                    logging.info(f"Export {filename} ({len(body)} bytes) in het geheugen ontvangen")
+                    return True
+                logging.info("Export niet onderschept, terugvallen op download naar schijf")
+            
             # Wacht op download
-            return self._wait_for_download(filename)
+            return self._wait_for_download(filename, watcher=watcher)
             
         except Exception as e:
             logging.error(f"Fout bij downloaden Excel bestand: {e}")
             return False
     
+    def _validate_export(self, name, buffer, table, check=None):
+        """
+        Controleer of een via HTTP opgehaalde export de verwachte gegevens bevat:
+        alle kolommen van de tabel uit de TypeMapper en, met check, de gevraagde
+        selectie (bijv. de periode of actief/inactief). Zo wordt een export van een
+        verouderde of verkeerde grid status niet ongemerkt geladen.
+        
+        Args:
+            name: Naam van de export
+            buffer: De export als BytesIO
+            table: Tabel in de TypeMapper waarmee de export geconverteerd wordt
+            check: Optionele functie die het geconverteerde DataFrame controleert
+            
+        Returns:
+            True als de export klopt, False anders
+        """
+        type_mapper = TypeMapper()
+        try:
+            result = ExcelProcessor().get_df_from_excel(buffer, **type_mapper.get_reader_options(table))
+        finally:
+            buffer.seek(0)
+        if result is None:
+            logging.warning(f"Export {name} via HTTP kon niet gelezen worden")
+            return False
+        
+        df = result[0]
+        missing = type_mapper.get_conversion_plan(table).missing_columns(df)
+        if missing:
+            logging.warning(f"Export {name} via HTTP mist kolommen {missing}")
+            return False
+        if check is not None:
+            converted_df = type_mapper.apply_conversion(df, table)
+            if converted_df is None or not check(converted_df):
+                logging.warning(f"Export {name} via HTTP bevat niet de gevraagde selectie")
+                return False
+        return True
+    
+    def http_export(self, name, url, username, password, table, check=None, **params):
+        """
+        Vraag een export direct via HTTP op met een opgenomen request, zonder navigatie
+        in de browser. Gebruikt de cookies van de browser sessie, of anders de cookie cache.
+        Alleen actief als http_exports aan staat; de export wordt gevalideerd
+        voordat die gebruikt wordt. Bij succes staat de export als BytesIO in last_download.
+        
+        Args:
+            name: Naam van de export, bijv. 'plaatsingen_actief'
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+            table: Tabel in de TypeMapper waarvan de kolommen in de export moeten staan
+            check: Optionele functie die het geconverteerde DataFrame controleert
+            **params: Waarden voor de parameters in het opgenomen request
+            
+        Returns:
+            True als de export via HTTP opgehaald is, False als de browser nodig is
+        """
+        if not self.http_exports:
+            return False
+        try:
+            if self.driver is not None:
+                client = EuurHttpClient.from_driver(self.driver, url, self.export_templates)
+            else:
+                client = EuurHttpClient.from_cookie_cache(self.cookie_cache, url, username, password, self.export_templates)
+            if client is None or not client.has_template(name):
+                return False
+            buffer = client.export(name, **params)
+            if buffer is not None and not self._validate_export(name, buffer, table, check):
+                buffer = None
+        except Exception as e:
+            logging.warning(f"Export {name} via HTTP mislukt, terugvallen op browser: {e}")
+            return False
+        
+        if buffer is None:
+            logging.info(f"Export {name} niet via HTTP beschikbaar, terugvallen op browser")
+            return False
+        self.last_download = buffer
+        return True
+    
+    def record_http_export(self, name, url, **params):
+        """
+        Bewaar het export request van de laatste browser download, zodat de export
+        voortaan via http_export opgehaald kan worden.
+        
+        Args:
+            name: Naam van de export
+            url: De E-Uur URL
+            **params: Parameter waarden in het request die als placeholder bewaard worden
+        """
+        if not self.http_exports or not self.last_export_request:
+            return
+        EuurHttpClient(url, self.export_templates).record_template(name, self.last_export_request, **params)
+    
+    def extract_table(self, row_selector):
+        """
+        Lees alle rijen van een tabel in één execute_script aanroep, in plaats van
+        een WebDriver round trip per rij en cel.
+        
+        Per cel wordt de tekst van het '.value' element gebruikt (zoals in de E-Uur
+        grids); cellen zonder '.value' element (bijv. in kop-, filter- of
+        groepsrijen) geven None.
+        
+        Args:
+            row_selector: CSS selector voor de rijen, bijv. "tr[tablename='AssignmentcomponentTable']"
+            
+        Returns:
+            list: Per rij een lijst met celteksten (of None), of None bij fout
+        """
+        script = """
+            return Array.from(document.querySelectorAll(arguments[0])).map(function (row) {
+                return Array.from(row.querySelectorAll('td')).map(function (cell) {
+                    var value = cell.querySelector('.value');
+                    return value ? value.innerText.trim() : null;
+                });
+            });
+        """
+        try:
+            return self.driver.execute_script(script, row_selector)
+        except Exception as e:
+            logging.error(f"Fout bij uitlezen tabel '{row_selector}': {e}")
+            return None
+    
+    def extract_table_df(self, row_selector, columns):
+        """
+        Lees een tabel in één aanroep uit naar een DataFrame.
+        
+        Alleen rijen met meer dan één cel en een '.value' element in elke gekozen
+        cel worden opgenomen, zodat kop-, filter- en groepsrijen overgeslagen worden.
+        
+        Args:
+            row_selector: CSS selector voor de rijen
+            columns: Dictionary met kolomnaam -> cel index, bijv. {'Looncomponent': 0, 'Loon': 6}
+            
+        Returns:
+            pandas.DataFrame: De gekozen kolommen van de datarijen
+        """
+        rows = self.extract_table(row_selector) or []
+        indices = list(columns.values())
+        min_cells = max(max(indices) + 1, 2)
+        data = [
+            [row[index] for index in indices]
+            for row in rows
+            if len(row) >= min_cells and all(row[index] is not None for index in indices)
+        ]
+        return pd.DataFrame(data, columns=list(columns))
+    
+    def login_to_euur(self, url, username, password):
+        """
+        Start een browser sessie, navigeer naar E-Uur en log in.
+        
+        Args:
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+            
+        Returns:
+            True als succesvol ingelogd, False bij fout
+        """
+        if not self.start_session():
+            return False
+        if self.login_with_cookies(url, username, password):
+            return True
+        if not self.navigate_to(url):
+            return False
+        if not self.login(username, password):
+            return False
+        self.save_session_cookies(url, username, password)
+        return True
+    
+    def login_with_cookies(self, url, username, password):
+        """
+        Log in met gecachte sessie cookies in plaats van het loginformulier.
+        
+        Cookies kunnen alleen voor het huidige domein gezet worden, dus eerst wordt
+        naar E-Uur genavigeerd. Worden de cookies geweigerd, dan wordt de cache
+        geleegd en staat de browser op het loginformulier.
+        
+        Args:
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+            
+        Returns:
+            True als de sessie met cookies ingelogd is, False anders
+        """
+        if self.cookie_cache is None:
+            return False
+        cookies = self.cookie_cache.load(url, username, password)
+        if not cookies:
+            return False
+        
+        try:
+            self.driver.get(url)
+            self.driver.delete_all_cookies()
+            for cookie in cookies:
+                self.driver.add_cookie(cookie)
+            self.driver.get(url)
+            
+            # Wacht op het dashboard of het loginformulier
+            self.wait.until(
+                lambda driver: driver.find_elements(By.CSS_SELECTOR, "div[data-id='dashboard']")
+                or driver.find_elements(By.NAME, "username")
+            )
+            if self.driver.find_elements(By.CSS_SELECTOR, "div[data-id='dashboard']"):
+                logging.info("Ingelogd met gecachte sessie cookies")
+                return True
+        except Exception as e:
+            logging.warning(f"Inloggen met gecachte cookies mislukt: {e}")
+        
+        logging.info("Gecachte sessie cookies geweigerd, terugvallen op loginformulier")
+        self.cookie_cache.clear(url, username)
+        return False
+    
+    def save_session_cookies(self, url, username, password):
+        """
+        Bewaar de cookies van de ingelogde sessie in de cookie cache.
+        
+        Args:
+            url: De E-Uur URL
+            username: Gebruikersnaam
+            password: Wachtwoord
+        """
+        if self.cookie_cache is None or self.driver is None:
+            return
+        try:
+            self.cookie_cache.save(self.driver.get_cookies(), url, username, password)
+        except Exception as e:
+            logging.warning(f"Sessie cookies konden niet bewaard worden: {e}")
+    
+    def _remove_capture_dir(self):
+        """
+        Verwijder de capture directory van deze sessie.
+        """
+        if self.capture_dir is not None:
+            shutil.rmtree(self.capture_dir, ignore_errors=True)
+            self.capture_dir = None
+    
     def close_session(self):
         """
         Sluit de browser sessie.
         """
+        # Een voorgestarte driver die niet gebruikt is ook afsluiten
+        if self._prewarm_thread is not None and self.driver is None:
+            self.driver = self._take_prewarmed_driver()
+        
         if self.driver:
             try:
                 self.driver.quit()
@@ -335,6 +1028,139 @@ class SeleniumManager:
             finally:
                 self.driver = None
                 self.wait = None
+        self._release_cache_dir()
+        self._remove_capture_dir()
+        
+        if self.step_timings:
+            totaal = sum(timing['seconden'] for timing in self.step_timings)
+            logging.info(f"{len(self.step_timings)} wachtstappen, totaal {totaal:.1f}s gewacht")
+
+
+class EuurSessionManager:
+    """
+    Eén ingelogde browser sessie die door meerdere E-Uur downloaders na elkaar
+    gebruikt wordt. Chrome wordt één keer gestart en er wordt één keer ingelogd;
+    opnieuw inloggen gebeurt alleen als de sessie verlopen is.
+    """
+    
+    def __init__(self, euururl, euurusername, euurpassword, download_dir, headless = True, timeout = 10, max_idle = None,
+                 cookie_cache = True):
+        """
+        Initialiseer de EuurSessionManager.
+        
+        Args:
+            euururl: E-Uur URL
+            euurusername: Gebruikersnaam
+            euurpassword: Wachtwoord
+            download_dir: Download directory voor alle exports in deze sessie
+            headless: Of de browser in headless mode moet draaien
+            timeout: Standaard timeout in seconden
+            max_idle: Seconden na de laatste controle waarin de sessie zonder
+                      herladen als geldig geldt, standaard EUUR_SESSIE_MAX_IDLE of 300
+            cookie_cache: Of gecachte sessie cookies gebruikt en bewaard worden; uit
+                          voor parallelle sessies die elk een eigen login nodig hebben
+        """
+        self.euururl = euururl
+        self.euurusername = euurusername
+        self.euurpassword = euurpassword
+        self.download_dir = Path(download_dir)
+        self.logins = 0
+        self.max_idle = max_idle if max_idle is not None else int(os.getenv('EUUR_SESSIE_MAX_IDLE', 300))
+        self._last_active = None
+        
+        config = {
+            'download_dir': str(self.download_dir),
+            'headless': headless,
+            'timeout': timeout,
+            'cookie_cache': cookie_cache
+        }
+        
+        self.selenium_manager = SeleniumManager(config)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _login(self):
+        """
+        Start de browser (indien nodig) en log in.
+        """
+        if self.selenium_manager.driver is None:
+            if not self.selenium_manager.login_to_euur(self.euururl, self.euurusername, self.euurpassword):
+                return False
+        elif self.selenium_manager.login(self.euurusername, self.euurpassword):
+            self.selenium_manager.save_session_cookies(self.euururl, self.euurusername, self.euurpassword)
+        else:
+            return False
+        self.logins += 1
+        self._last_active = time.monotonic()
+        return True
+    
+    def _session_active(self):
+        """
+        Of de huidige pagina een ingelogde E-Uur sessie toont, zonder te navigeren:
+        de laatste controle is recenter dan max_idle, er staat geen loginformulier
+        en de Start knop van de applicatie is aanwezig.
+        """
+        if self._last_active is None or time.monotonic() - self._last_active > self.max_idle:
+            return False
+        try:
+            driver = self.selenium_manager.driver
+            return not driver.find_elements(By.NAME, "username") and \
+                bool(driver.find_elements(By.CSS_SELECTOR, "button.start-menu.akyla-widget-button"))
+        except Exception:
+            return False
+    
+    def ensure_logged_in(self):
+        """
+        Zorg voor een ingelogde E-Uur sessie. Als de huidige pagina een ingelogde
+        sessie toont en de laatste controle recent is, wordt niet genavigeerd.
+        Anders wordt de E-Uur URL opnieuw geladen en alleen als het loginformulier
+        verschijnt opnieuw ingelogd. Reageert de browser niet meer, dan wordt die herstart.
+        
+        Returns:
+            True als de sessie ingelogd is, False bij fout
+        """
+        if self.selenium_manager.driver is None:
+            logging.info("Start gedeelde E-Uur browser sessie")
+            return self._login()
+        
+        if self._session_active():
+            logging.info("Gedeelde E-Uur sessie hergebruikt zonder herladen")
+            self._last_active = time.monotonic()
+            return True
+        
+        try:
+            if not self.selenium_manager.navigate_to(self.euururl):
+                raise RuntimeError("navigatie naar E-Uur mislukt")
+            
+            # Wacht op het dashboard of het loginformulier
+            WebDriverWait(self.selenium_manager.driver, self.selenium_manager.timeout).until(
+                lambda driver: driver.find_elements(By.CSS_SELECTOR, "div[data-id='dashboard']")
+                or driver.find_elements(By.NAME, "username")
+            )
+            if self.selenium_manager.driver.find_elements(By.NAME, "username"):
+                logging.info("E-Uur sessie verlopen, opnieuw inloggen")
+                return self._login()
+            
+            logging.info("Gedeelde E-Uur sessie hergebruikt")
+            self._last_active = time.monotonic()
+            return True
+            
+        except Exception as e:
+            logging.warning(f"Gedeelde E-Uur sessie reageert niet meer ({e}), browser wordt herstart")
+            self.selenium_manager.close_session()
+            return self._login()
+    
+    def close(self):
+        """
+        Sluit de gedeelde browser sessie.
+        """
+        if self.selenium_manager.driver is not None:
+            logging.info(f"Gedeelde E-Uur sessie gesloten na {self.logins} login(s)")
+        self.selenium_manager.close_session()
 
 
 class EuurLooncomponentenDownloader:
@@ -342,7 +1168,7 @@ class EuurLooncomponentenDownloader:
     Specifieke class voor het downloaden van looncomponenten uit E-Uur.
     """
     
-    def __init__(self, base_dir, download_dir, headless = True):
+    def __init__(self, base_dir, download_dir, headless = True, sessie = None):
         """
         Initialiseer de E-Uur looncomponenten downloader.
         
@@ -350,6 +1176,8 @@ class EuurLooncomponentenDownloader:
             base_dir: Basis directory voor downloads
             download_dir: Specifieke download directory (optioneel)
             headless: Of de browser in headless mode moet draaien
+            sessie: Optionele EuurSessionManager; dan wordt de gedeelde, ingelogde
+                    browser sessie (en de download directory daarvan) gebruikt
         """
         self.base_dir = Path(base_dir)
         self.download_dir = Path(download_dir)
@@ -359,13 +1187,30 @@ class EuurLooncomponentenDownloader:
         logging.info(f"Download directory: {self.download_dir}")
         logging.info(f"Download directory bestaat: {self.download_dir.exists()}")
         
-        config = {
-            'download_dir': str(self.download_dir),
-            'headless': headless,
-            'timeout': 10
-        }
+        self.sessie = sessie
         
-        self.selenium_manager = SeleniumManager(config)
+        if sessie is not None:
+            self.download_dir = sessie.download_dir
+            self.selenium_manager = sessie.selenium_manager
+        else:
+            config = {
+                'download_dir': str(self.download_dir),
+                'headless': headless,
+                'timeout': 10
+            }
+            
+            self.selenium_manager = SeleniumManager(config)
+    
+    def _login(self, euururl, euurusername, euurpassword):
+        """
+        Log in op E-Uur in een eigen browser sessie, of zorg dat de gedeelde sessie ingelogd is.
+        
+        Returns:
+            True als succesvol ingelogd, False bij fout
+        """
+        if self.sessie is not None:
+            return self.sessie.ensure_logged_in()
+        return self.selenium_manager.login_to_euur(euururl, euurusername, euurpassword)
     
     def navigate_to_looncomponenten(self):
         """
@@ -425,21 +1270,14 @@ class EuurLooncomponentenDownloader:
         logging.info(f"Download directory: {self.download_dir}")
         
         try:
-            # Start browser sessie
-            logging.info("Start browser sessie...")
-            if not self.selenium_manager.start_session():
-                logging.error("Start browser sessie mislukt")
-                return False
-            
-            # Navigeer naar E-Uur
-            logging.info("Navigeer naar E-Uur...")
-            if not self.selenium_manager.navigate_to(euururl):
-                logging.error("Navigatie naar E-Uur mislukt")
-                return False
+            # Export direct via HTTP opvragen; de browser is de terugval
+            if self.selenium_manager.http_export("looncomponenten", euururl, euurusername, euurpassword, "Looncomponenten"):
+                logging.info("Looncomponenten via HTTP opgehaald")
+                return True
             
-            # Log in
+            # Start browser sessie en log in op E-Uur (of hergebruik de gedeelde sessie)
             logging.info("Log in op E-Uur...")
-            if not self.selenium_manager.login(euurusername, euurpassword):
+            if not self._login(euururl, euurusername, euurpassword):
                 logging.error("Login mislukt")
                 return False
             
@@ -454,6 +1292,7 @@ class EuurLooncomponentenDownloader:
             if not self.selenium_manager.download_excel("Looncomponent.xlsx"):
                 logging.error("Download Excel bestand mislukt")
                 return False
+            self.selenium_manager.record_http_export("looncomponenten", euururl)
             
             # Controleer of bestand daadwerkelijk is gedownload
             expected_file = self.download_dir / "Looncomponent.xlsx"
@@ -469,8 +1308,10 @@ class EuurLooncomponentenDownloader:
             logging.error(f"Onverwachte fout tijdens download proces: {e}")
             return False
         finally:
-            logging.info("Sluit browser sessie...")
-            self.selenium_manager.close_session()
+            # Een gedeelde sessie blijft open voor de volgende export
+            if self.sessie is None:
+                logging.info("Sluit browser sessie...")
+                self.selenium_manager.close_session()
 
 
 class EuurOntbrekendeUrenDownloader:
@@ -478,7 +1319,7 @@ class EuurOntbrekendeUrenDownloader:
     Specifieke class voor het downloaden van ontbrekende uren uit E-Uur.
     """
     
-    def __init__(self, base_dir, download_dir, headless = True):
+    def __init__(self, base_dir, download_dir, headless = True, sessie = None):
         """
         Initialiseer de E-Uur ontbrekende uren downloader.
         
@@ -486,17 +1327,36 @@ class EuurOntbrekendeUrenDownloader:
             base_dir: Basis directory voor downloads
             download_dir: Specifieke download directory (optioneel)
             headless: Of de browser in headless mode moet draaien
+            sessie: Optionele EuurSessionManager; dan wordt de gedeelde, ingelogde
+                    browser sessie (en de download directory daarvan) gebruikt
         """
         self.base_dir = Path(base_dir)
         self.download_dir = Path(download_dir)
         
-        config = {
-            'download_dir': str(self.download_dir),
-            'headless': headless,
-            'timeout': 10
-        }
+        self.sessie = sessie
         
-        self.selenium_manager = SeleniumManager(config)
+        if sessie is not None:
+            self.download_dir = sessie.download_dir
+            self.selenium_manager = sessie.selenium_manager
+        else:
+            config = {
+                'download_dir': str(self.download_dir),
+                'headless': headless,
+                'timeout': 10
+            }
+            
+            self.selenium_manager = SeleniumManager(config)
+    
+    def _login(self, euururl, euurusername, euurpassword):
+        """
+        Log in op E-Uur in een eigen browser sessie, of zorg dat de gedeelde sessie ingelogd is.
+        
+        Returns:
+            True als succesvol ingelogd, False bij fout
+        """
+        if self.sessie is not None:
+            return self.sessie.ensure_logged_in()
+        return self.selenium_manager.login_to_euur(euururl, euurusername, euurpassword)
     
     def navigate_to_ontbrekende_uren(self):
         """
@@ -546,16 +1406,13 @@ class EuurOntbrekendeUrenDownloader:
         logging.info("Start ontbrekende uren download proces")
         
         try:
-            # Start browser sessie
-            if not self.selenium_manager.start_session():
-                return False
-            
-            # Navigeer naar E-Uur
-            if not self.selenium_manager.navigate_to(euururl):
-                return False
+            # Export direct via HTTP opvragen; de browser is de terugval
+            if self.selenium_manager.http_export("ontbrekende_uren", euururl, euurusername, euurpassword, "OntbrekendeUren"):
+                logging.info("Ontbrekende uren via HTTP opgehaald")
+                return True
             
-            # Log in
-            if not self.selenium_manager.login(euurusername, euurpassword):
+            # Start browser sessie en log in op E-Uur (of hergebruik de gedeelde sessie)
+            if not self._login(euururl, euurusername, euurpassword):
                 return False
             
             # Navigeer naar ontbrekende uren
@@ -565,6 +1422,7 @@ class EuurOntbrekendeUrenDownloader:
             # Download Excel bestand
             if not self.selenium_manager.download_excel("Ontbrekende urenbriefjes.xlsx"):
                 return False
+            self.selenium_manager.record_http_export("ontbrekende_uren", euururl)
             
             logging.info("Ontbrekende uren download proces succesvol voltooid")
             return True
@@ -573,7 +1431,9 @@ class EuurOntbrekendeUrenDownloader:
             logging.error(f"Onverwachte fout tijdens download proces: {e}")
             return False
         finally:
-            self.selenium_manager.close_session()
+            # Een gedeelde sessie blijft open voor de volgende export
+            if self.sessie is None:
+                self.selenium_manager.close_session()
 
 
 class EuurPlaatsingDownloader:
@@ -582,7 +1442,7 @@ class EuurPlaatsingDownloader:
     Ondersteunt zowel actieve als inactieve plaatsingen.
     """
     
-    def __init__(self, base_dir, download_dir, headless = True):
+    def __init__(self, base_dir, download_dir, headless = True, sessie = None):
         """
         Initialiseer de E-Uur plaatsing downloader.
         
@@ -590,17 +1450,36 @@ class EuurPlaatsingDownloader:
             base_dir: Basis directory voor downloads
             download_dir: Specifieke download directory (optioneel)
             headless: Of de browser in headless mode moet draaien
+            sessie: Optionele EuurSessionManager; dan wordt de gedeelde, ingelogde
+                    browser sessie (en de download directory daarvan) gebruikt
         """
         self.base_dir = Path(base_dir)
         self.download_dir = Path(download_dir)
         
-        config = {
-            'download_dir': str(self.download_dir),
-            'headless': headless,
-            'timeout': 10
-        }
+        self.sessie = sessie
         
-        self.selenium_manager = SeleniumManager(config)
+        if sessie is not None:
+            self.download_dir = sessie.download_dir
+            self.selenium_manager = sessie.selenium_manager
+        else:
+            config = {
+                'download_dir': str(self.download_dir),
+                'headless': headless,
+                'timeout': 10
+            }
+            
+            self.selenium_manager = SeleniumManager(config)
+    
+    def _login(self, euururl, euurusername, euurpassword):
+        """
+        Log in op E-Uur in een eigen browser sessie, of zorg dat de gedeelde sessie ingelogd is.
+        
+        Returns:
+            True als succesvol ingelogd, False bij fout
+        """
+        if self.sessie is not None:
+            return self.sessie.ensure_logged_in()
+        return self.selenium_manager.login_to_euur(euururl, euurusername, euurpassword)
     
     def navigate_to_plaatsing(self, plaatsing_type):
         """
@@ -664,16 +1543,18 @@ class EuurPlaatsingDownloader:
         logging.info(f"Start {plaatsing_type} plaatsingen download proces")
         
         try:
-            # Start browser sessie
-            if not self.selenium_manager.start_session():
-                return False
-            
-            # Navigeer naar E-Uur
-            if not self.selenium_manager.navigate_to(euururl):
-                return False
+            # Export direct via HTTP opvragen; de browser is de terugval
+            # Een export van het verkeerde overzicht (actief of inactief) wordt afgekeurd
+            actief = plaatsing_type == "actief"
+            if self.selenium_manager.http_export(
+                f"plaatsingen_{plaatsing_type}", euururl, euurusername, euurpassword, "Plaatsingen",
+                check=lambda df: df['Actief'].dropna().eq(actief).all()
+            ):
+                logging.info(f"{plaatsing_type.capitalize()} plaatsingen via HTTP opgehaald")
+                return True
             
-            # Log in
-            if not self.selenium_manager.login(euurusername, euurpassword):
+            # Start browser sessie en log in op E-Uur (of hergebruik de gedeelde sessie)
+            if not self._login(euururl, euurusername, euurpassword):
                 return False
             
             # Navigeer naar plaatsingen
@@ -683,6 +1564,7 @@ class EuurPlaatsingDownloader:
             # Download Excel bestand
             if not self.selenium_manager.download_excel("Plaatsing.xlsx"):
                 return False
+            self.selenium_manager.record_http_export(f"plaatsingen_{plaatsing_type}", euururl)
             
             logging.info(f"{plaatsing_type.capitalize()} plaatsingen download proces succesvol voltooid")
             return True
@@ -691,7 +1573,9 @@ class EuurPlaatsingDownloader:
             logging.error(f"Onverwachte fout tijdens {plaatsing_type} plaatsingen download proces: {e}")
             return False
         finally:
-            self.selenium_manager.close_session()
+            # Een gedeelde sessie blijft open voor de volgende export
+            if self.sessie is None:
+                self.selenium_manager.close_session()
 
 
 class EuurUrenRapportageDownloader:
@@ -700,7 +1584,7 @@ class EuurUrenRapportageDownloader:
     Ondersteunt zowel standaard als een-maand rapportages.
     """
     
-    def __init__(self, base_dir, download_dir, headless = True):
+    def __init__(self, base_dir, download_dir, headless = True, sessie = None):
         """
         Initialiseer de E-Uur urenrapportage downloader.
         
@@ -708,17 +1592,39 @@ class EuurUrenRapportageDownloader:
             base_dir: Basis directory voor downloads
             download_dir: Specifieke download directory (optioneel)
             headless: Of de browser in headless mode moet draaien
+            sessie: Optionele EuurSessionManager; dan wordt de gedeelde, ingelogde
+                    browser sessie (en de download directory daarvan) gebruikt
         """
         self.base_dir = Path(base_dir)
         self.download_dir = Path(download_dir)
         
-        config = {
-            'download_dir': str(self.download_dir),
-            'headless': headless,
-            'timeout': 10
-        }
+        self.sessie = sessie
         
-        self.selenium_manager = SeleniumManager(config)
+        # Periode (start, eind) van de laatst gedownloade urenrapportage
+        self.periode = None
+        
+        if sessie is not None:
+            self.download_dir = sessie.download_dir
+            self.selenium_manager = sessie.selenium_manager
+        else:
+            config = {
+                'download_dir': str(self.download_dir),
+                'headless': headless,
+                'timeout': 10
+            }
+            
+            self.selenium_manager = SeleniumManager(config)
+    
+    def _login(self, euururl, euurusername, euurpassword):
+        """
+        Log in op E-Uur in een eigen browser sessie, of zorg dat de gedeelde sessie ingelogd is.
+        
+        Returns:
+            True als succesvol ingelogd, False bij fout
+        """
+        if self.sessie is not None:
+            return self.sessie.ensure_logged_in()
+        return self.selenium_manager.login_to_euur(euururl, euurusername, euurpassword)
     
     def navigate_to_urenrapportage(self):
         """
@@ -803,8 +1709,11 @@ class EuurUrenRapportageDownloader:
             if not self.selenium_manager._safe_click(filter_button, "filter knop"):
                 return False
             
-            # Wacht een kort moment totdat de filter-sectie is geopend.
-            time.sleep(1)
+            # Wacht tot de filter-sectie geopend is (de tweede set datumvelden)
+            self.selenium_manager.wait_until(
+                lambda driver: len(driver.find_elements(By.NAME, "date[start]")) > 1,
+                timeout=5, description="filter sectie geopend"
+            )
 
             # Vul datums in met JavaScript en trigger een 'change' event.
             # We targeten het tweede element ([1]), gebaseerd op de werkende logica van het oude script.
@@ -824,11 +1733,13 @@ class EuurUrenRapportageDownloader:
             search_button = self.selenium_manager._wait_for_clickable(
                 By.XPATH, '(//button[@title="Zoeken" and contains(@class, "akyla-widget-button")])[2]'
             )
+            snapshot = self.selenium_manager.grid_snapshot()
             if not self.selenium_manager._safe_click(search_button, "zoek knop"):
                 return False
             
-            # Wacht even voor de resultaten
-            time.sleep(10)
+            # Wacht tot het grid met de nieuwe resultaten geladen is en er geen requests meer lopen
+            self.selenium_manager.wait_for_grid_reload(snapshot, timeout=60, description="urenrapportage resultaten")
+            self.selenium_manager.wait_for_network_idle(description="urenrapportage resultaten geladen")
             
             logging.info("Datum filters succesvol toegepast")
             return True
@@ -855,27 +1766,35 @@ class EuurUrenRapportageDownloader:
         logging.info(f"Start {rapportage_type} urenrapportage download proces")
         
         try:
-            # Start browser sessie
-            if not self.selenium_manager.start_session():
+            # Bepaal datums
+            start_datum_obj, eind_datum_obj = self._setup_date_filters(rapportage_type, start_datum, eind_datum)
+            if start_datum_obj is None or eind_datum_obj is None:
                 return False
             
-            # Navigeer naar E-Uur
-            if not self.selenium_manager.navigate_to(euururl):
-                return False
+            # Export direct via HTTP opvragen met de datums als parameters; de browser is de terugval
+            datum_params = {
+                'start_datum': start_datum_obj.strftime('%d-%m-%Y'),
+                'eind_datum': eind_datum_obj.strftime('%d-%m-%Y')
+            }
+            # Een export van een andere periode wordt afgekeurd
+            periode_start, periode_eind = start_datum_obj.date(), eind_datum_obj.date()
+            if self.selenium_manager.http_export(
+                "urenrapportage", euururl, euurusername, euurpassword, "UrenRapportage",
+                check=lambda df: df['Datum'].dropna().between(periode_start, periode_eind).all(),
+                **datum_params
+            ):
+                self.periode = (start_datum_obj, eind_datum_obj)
+                logging.info("Urenrapportage via HTTP opgehaald")
+                return True
             
-            # Log in
-            if not self.selenium_manager.login(euurusername, euurpassword):
+            # Start browser sessie en log in op E-Uur (of hergebruik de gedeelde sessie)
+            if not self._login(euururl, euurusername, euurpassword):
                 return False
             
             # Navigeer naar urenrapportage
             if not self.navigate_to_urenrapportage():
                 return False
             
-            # Bepaal datums
-            start_datum_obj, eind_datum_obj = self._setup_date_filters(rapportage_type, start_datum, eind_datum)
-            if start_datum_obj is None or eind_datum_obj is None:
-                return False
-            
             # Pas datum filters toe
             if not self._apply_date_filters(start_datum_obj, eind_datum_obj):
                 return False
@@ -884,11 +1803,15 @@ class EuurUrenRapportageDownloader:
             default_filename = "Urenrapportage.xlsx"
             if not self.selenium_manager.download_excel(default_filename):
                 return False
+            self.selenium_manager.record_http_export("urenrapportage", euururl, **datum_params)
             
-            # Hernoem bestand met datums
-            new_filename = f"Urenrapportage_{start_datum_obj.strftime('%Y-%m-%d')}_{eind_datum_obj.strftime('%Y-%m-%d')}.xlsx"
-            if not self.selenium_manager._rename_downloaded_file(default_filename, new_filename):
-                return False
+            self.periode = (start_datum_obj, eind_datum_obj)
+            
+            # Hernoem bestand met datums (niet nodig voor een export uit het geheugen)
+            if self.selenium_manager.last_download is None:
+                new_filename = f"Urenrapportage_{start_datum_obj.strftime('%Y-%m-%d')}_{eind_datum_obj.strftime('%Y-%m-%d')}.xlsx"
+                if not self.selenium_manager._rename_downloaded_file(default_filename, new_filename):
+                    return False
             
             logging.info(f"{rapportage_type.capitalize()} urenrapportage download proces succesvol voltooid")
             return True
@@ -897,24 +1820,42 @@ class EuurUrenRapportageDownloader:
             logging.error(f"Onverwachte fout tijdens {rapportage_type} urenrapportage download proces: {e}")
             return False
         finally:
-            self.selenium_manager.close_session()
+            # Een gedeelde sessie blijft open voor de volgende export
+            if self.sessie is None:
+                self.selenium_manager.close_session()
 
 
 class EuurLoonPerPlaatsingDownloader:
     """
     Class voor het ophalen van looncomponenten per plaatsing (actief én inactief) uit E-Uur.
+    
+    De plaatsingen worden verdeeld over een pool van workers, elk met een eigen
+    ingelogde browser sessie die voor alle plaatsingen van die worker hergebruikt wordt.
+    Elke worker logt zelf via het formulier in (zonder gecachte cookies), zodat
+    de browsers geen server sessie delen.
     """
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, workers=None, max_retries=2, download_dir='downloads', plaatsing_url=None):
+        """
+        Initialiseer de downloader.
+        
+        Args:
+            headless: Of de browsers in headless mode moeten draaien
+            workers: Aantal parallelle browser workers, standaard EUUR_LOON_WORKERS of 3
+            max_retries: Aantal herkansingen per plaatsing na een fout
+            download_dir: Download directory voor de browser sessies
+            plaatsing_url: URL template voor de detailweergave van een plaatsing met
+                           {plaatsing_id}, standaard EUURPLAATSINGURL. Als niet gezet,
+                           wordt de template afgeleid van de URL van de eerste plaatsing
+                           die via het overzicht geopend wordt.
+        """
         self.headless = headless
-
-    def _login_and_navigate(self, selenium_manager, euururl, euurusername, euurpassword):
-        if not selenium_manager.start_session():
-            return False
-        if not selenium_manager.navigate_to(euururl):
-            return False
-        if not selenium_manager.login(euurusername, euurpassword):
-            return False
-        return True
+        self.plaatsing_url = plaatsing_url or os.getenv('EUURPLAATSINGURL')
+        self._plaatsing_url_lock = threading.Lock()
+        self._plaatsing_url_afgeleid = False
+        self._plaatsing_url_fouten = 0
+        self.workers = workers if workers is not None else int(os.getenv('EUUR_LOON_WORKERS', 3))
+        self.max_retries = max_retries
+        self.download_dir = download_dir
 
     def _navigate_to_plaatsingen(self, selenium_manager):
         # Navigeer naar start menu
@@ -934,84 +1875,264 @@ class EuurLoonPerPlaatsingDownloader:
             return False
         return True
 
-    def _zoek_en_klik_op_plaatsing(self, selenium_manager, plaatsing_id):
-        max_attempts = 10
-        attempts = 0
-        while attempts < max_attempts:
-            try:
-                rij = WebDriverWait(selenium_manager.driver, 10).until(
-                    EC.presence_of_element_located((By.XPATH, f"//tr[@module='confirmedassignmentmerger' and @objectid='{plaatsing_id}']"))
-                )
-                rij.click()
+    def _detailweergave_geladen(self, selenium_manager, plaatsing_id):
+        """
+        Of de detailweergave van een plaatsing geladen is. Een plaatsing zonder
+        looncomponenten heeft een lege tabel; daarom wordt niet op de rijen gewacht,
+        maar tot de pagina tot rust gekomen is. De weergave telt als geladen als er
+        rijen zijn, of als de browser nog op de deep link van de plaatsing staat,
+        ingelogd (geen loginformulier, wel de E-Uur menubalk).
+        """
+        driver = selenium_manager.driver
+        if not selenium_manager.wait_for_network_idle(
+            timeout=selenium_manager.timeout, description="detailweergave plaatsing"
+        ):
+            return False
+        if driver.find_elements(By.XPATH, "//tr[@tablename='AssignmentcomponentTable']"):
+            return True
+        return (
+            str(plaatsing_id) in driver.current_url
+            and not driver.find_elements(By.NAME, "username")
+            and bool(driver.find_elements(By.CSS_SELECTOR, "button.start-menu"))
+        )
+
+    def _open_plaatsing_direct(self, selenium_manager, plaatsing_id):
+        """
+        Open de detailweergave van een plaatsing direct via de deep link.
+        
+        Een afgeleide link wordt pas losgelaten als de detailweergave meerdere keren
+        achter elkaar niet laadt (MAX_DEEP_LINK_FOUTEN); één plaatsing zonder
+        looncomponenten telt niet als fout.
+        
+        Returns:
+            True als de detailweergave van de plaatsing geladen is, False anders
+        """
+        plaatsing_url = self.plaatsing_url
+        if not plaatsing_url:
+            return False
+        try:
+            selenium_manager.driver.get(plaatsing_url.format(plaatsing_id=plaatsing_id))
+            geladen = self._detailweergave_geladen(selenium_manager, plaatsing_id)
+        except Exception as e:
+            logging.warning(f"Plaatsing {plaatsing_id} niet direct te openen: {e}")
+            geladen = False
+        
+        with self._plaatsing_url_lock:
+            if geladen:
+                self._plaatsing_url_fouten = 0
                 return True
-            except Exception:
-                try:
-                    next_button = selenium_manager.driver.find_element(By.CSS_SELECTOR, "i.pager.fa-angle-right")
-                    next_button.click()
-                    time.sleep(1)
-                except Exception:
-                    break
-                attempts += 1
+            self._plaatsing_url_fouten += 1
+            if self._plaatsing_url_afgeleid and self._plaatsing_url_fouten >= MAX_DEEP_LINK_FOUTEN \
+                    and self.plaatsing_url == plaatsing_url:
+                # Een afgeleide link die steeds niet werkt niet opnieuw proberen
+                logging.warning(f"Afgeleide deep link werkt niet na {self._plaatsing_url_fouten} pogingen, terug naar het overzicht")
+                self.plaatsing_url = None
+        logging.warning(f"Detailweergave van plaatsing {plaatsing_id} niet geladen, terugvallen op zoeken in overzicht")
         return False
 
-    def _lees_looncomponenten_tabel(self, selenium_manager, plaatsing_id, werknemer):
+    def _leer_plaatsing_url(self, selenium_manager, plaatsing_id):
+        """
+        Leid de deep link template af van de URL van een via het overzicht geopende
+        plaatsing, zodat volgende plaatsingen direct geopend kunnen worden.
+        """
+        if self.plaatsing_url or self._plaatsing_url_afgeleid:
+            return
+        try:
+            current_url = selenium_manager.driver.current_url
+        except Exception:
+            return
+        plaatsing_id = str(plaatsing_id)
+        # Alleen als het ID precies één keer in de URL staat is de template eenduidig
+        if current_url.count(plaatsing_id) != 1:
+            return
+        template = current_url.replace('{', '{{').replace('}', '}}').replace(plaatsing_id, '{plaatsing_id}')
+        with self._plaatsing_url_lock:
+            if not self.plaatsing_url and not self._plaatsing_url_afgeleid:
+                self.plaatsing_url = template
+                self._plaatsing_url_afgeleid = True
+                logging.info(f"Deep link voor plaatsingen afgeleid: {template}")
+
+    def _zoek_en_klik_op_plaatsing(self, selenium_manager, plaatsing_id):
+        driver = selenium_manager.driver
+        rij_xpath = "//tr[@module='confirmedassignmentmerger']"
+        plaatsing_xpath = f"{rij_xpath}[@objectid='{plaatsing_id}']"
+        max_pages = 10
+        
+        # Eén keer wachten tot het overzicht geladen is; daarna per pagina direct controleren
         try:
-            WebDriverWait(selenium_manager.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//tr[@tablename='AssignmentcomponentTable']"))
+            WebDriverWait(driver, selenium_manager.timeout).until(
+                EC.presence_of_element_located((By.XPATH, rij_xpath))
             )
         except Exception:
+            return False
+        
+        for _ in range(max_pages):
+            rijen = driver.find_elements(By.XPATH, plaatsing_xpath)
+            if rijen:
+                rijen[0].click()
+                return True
+            
+            next_buttons = driver.find_elements(By.CSS_SELECTOR, "i.pager.fa-angle-right")
+            if not next_buttons:
+                break
+            try:
+                # Wacht tot de rijen van de huidige pagina vervangen zijn in plaats van een vaste pauze
+                snapshot = selenium_manager.grid_snapshot("tr[module='confirmedassignmentmerger']")
+                next_buttons[0].click()
+                if not selenium_manager.wait_for_grid_reload(
+                    snapshot, "tr[module='confirmedassignmentmerger']",
+                    timeout=selenium_manager.timeout, description="volgende pagina plaatsingen"
+                ):
+                    break
+                if not selenium_manager.wait_until(
+                    lambda driver: driver.find_elements(By.XPATH, rij_xpath), description="rijen plaatsingen geladen"
+                ):
+                    break
+            except Exception:
+                break
+        return False
+
+    def _lees_looncomponenten_tabel(self, selenium_manager, plaatsing_id, werknemer, wachten=True):
+        if wachten:
+            try:
+                WebDriverWait(selenium_manager.driver, 10).until(
+                    EC.presence_of_element_located((By.XPATH, "//tr[@tablename='AssignmentcomponentTable']"))
+                )
+            except Exception:
+                return pd.DataFrame()
+        # Hele tabel in één JavaScript aanroep uitlezen
+        df = selenium_manager.extract_table_df(
+            "tr[tablename='AssignmentcomponentTable']", {'Looncomponent': 0, 'Loon': 6}
+        )
+        if df.empty:
             return pd.DataFrame()
-        looncomponenten_data = []
+        df.insert(0, 'ID', plaatsing_id)
+        df['Werknemer'] = werknemer
+        return df
+
+    def _verwerk_plaatsing(self, sessie, plaatsing):
+        """
+        Haal de looncomponenten van één plaatsing op in een ingelogde sessie.
+        
+        Returns:
+            DataFrame met de looncomponenten (leeg als de plaatsing niet gevonden is)
+        
+        Raises:
+            RuntimeError: Als inloggen of navigeren mislukt, zodat de plaatsing opnieuw geprobeerd wordt
+        """
+        plaatsing_id = plaatsing['ID']
+        werknemer = plaatsing.get('Werknemer', '')
+        
+        # Herlaadt E-Uur alleen als de sessie verlopen kan zijn, en logt dan zo nodig opnieuw in
+        if not sessie.ensure_logged_in():
+            raise RuntimeError("inloggen mislukt")
+        if self._open_plaatsing_direct(sessie.selenium_manager, plaatsing_id):
+            # De detailweergave is al geladen; een lege tabel is een plaatsing zonder looncomponenten
+            return self._lees_looncomponenten_tabel(sessie.selenium_manager, plaatsing_id, werknemer, wachten=False)
+        if not self._navigate_to_plaatsingen(sessie.selenium_manager):
+            raise RuntimeError("navigatie naar plaatsingen mislukt")
+        if not self._zoek_en_klik_op_plaatsing(sessie.selenium_manager, plaatsing_id):
+            logging.warning(f"Plaatsing {plaatsing_id} niet gevonden")
+            return pd.DataFrame()
+        df = self._lees_looncomponenten_tabel(sessie.selenium_manager, plaatsing_id, werknemer)
+        if not df.empty:
+            self._leer_plaatsing_url(sessie.selenium_manager, plaatsing_id)
+        return df
+
+    def _worker(self, worker_id, taken, resultaten, voortgang, euururl, euurusername, euurpassword):
+        """
+        Verwerk plaatsingen uit de wachtrij in één eigen browser sessie, tot alle
+        plaatsingen afgerond zijn. Een mislukte plaatsing gaat terug in de wachtrij
+        (tot max_retries) en de browser van de worker wordt herstart. Workers
+        stoppen pas als er geen openstaande plaatsingen meer zijn, zodat een
+        teruggezette plaatsing altijd door een worker opgepakt wordt.
+        """
+        # Geen gedeelde cookies: elke worker krijgt een eigen server sessie
+        sessie = EuurSessionManager(
+            euururl, euurusername, euurpassword, self.download_dir, headless=self.headless, cookie_cache=False
+        )
         try:
-            table_rows = selenium_manager.driver.find_elements(By.XPATH, "//tr[@tablename='AssignmentcomponentTable']")
-            for rij in table_rows:
+            while True:
                 try:
-                    cells = rij.find_elements(By.TAG_NAME, "td")
-                    if len(cells) > 1:
-                        looncomponent = cells[0].find_element(By.CLASS_NAME, "value").text
-                        loon = cells[6].find_element(By.CLASS_NAME, "value").text
-                        looncomponenten_data.append({
-                            'ID': plaatsing_id,
-                            'Looncomponent': looncomponent,
-                            'Loon': loon,
-                            'Werknemer': werknemer
-                        })
-                except Exception:
+                    index, plaatsing, poging = taken.get(timeout=0.5)
+                except queue.Empty:
+                    with voortgang['lock']:
+                        if voortgang['verwerkt'] >= voortgang['totaal']:
+                            return
                     continue
-        except Exception:
-            pass
-        return pd.DataFrame(looncomponenten_data)
+                
+                plaatsing_id = plaatsing['ID']
+                try:
+                    df = self._verwerk_plaatsing(sessie, plaatsing)
+                except Exception as e:
+                    sessie.close()
+                    if poging < self.max_retries:
+                        logging.warning(f"Worker {worker_id}: plaatsing {plaatsing_id} mislukt ({e}), poging {poging + 2} volgt")
+                        taken.put((index, plaatsing, poging + 1))
+                        continue
+                    logging.error(f"Worker {worker_id}: plaatsing {plaatsing_id} definitief mislukt na {poging + 1} pogingen: {e}")
+                    df = None
+                
+                with voortgang['lock']:
+                    if df is None:
+                        voortgang['mislukt'] += 1
+                    else:
+                        resultaten[index] = df
+                    voortgang['verwerkt'] += 1
+                    logging.info(
+                        f"Voortgang: {voortgang['verwerkt']}/{voortgang['totaal']} plaatsingen verwerkt "
+                        f"({voortgang['mislukt']} mislukt, {time.time() - voortgang['start']:.0f}s)"
+                    )
+        finally:
+            sessie.close()
 
     def download_loon_per_plaatsing(self, euururl, euurusername, euurpassword, plaatsingen_lijst):
         """
-        Haal looncomponenten op voor alle plaatsingen in de lijst.
+        Haal looncomponenten op voor alle plaatsingen in de lijst, verdeeld over
+        een pool van browser workers.
+        
         Args:
             euururl: E-Uur URL
             euurusername: Gebruikersnaam
             euurpassword: Wachtwoord
             plaatsingen_lijst: lijst van dicts met minimaal 'ID' en 'Werknemer'
+        
         Returns:
-            DataFrame met alle looncomponenten
+            DataFrame met alle looncomponenten, in de volgorde van plaatsingen_lijst
         """
-        alle_data = []
-        for plaatsing in plaatsingen_lijst:
-            plaatsing_id = plaatsing['ID']
-            werknemer = plaatsing.get('Werknemer', '')
-            selenium_manager = SeleniumManager({'headless': self.headless, 'timeout': 10})
-            try:
-                if not self._login_and_navigate(selenium_manager, euururl, euurusername, euurpassword):
-                    continue
-                if not self._navigate_to_plaatsingen(selenium_manager):
-                    continue
-                if not self._zoek_en_klik_op_plaatsing(selenium_manager, plaatsing_id):
-                    logging.warning(f"Plaatsing {plaatsing_id} niet gevonden")
-                    continue
-                df = self._lees_looncomponenten_tabel(selenium_manager, plaatsing_id, werknemer)
-                if not df.empty:
-                    alle_data.append(df)
-                    logging.info(f"Data van plaatsing {plaatsing_id} succesvol toegevoegd aan de dataframe.")
-            finally:
-                selenium_manager.close_session()
+        taken = queue.Queue()
+        for index, plaatsing in enumerate(plaatsingen_lijst):
+            taken.put((index, plaatsing, 0))
+        
+        resultaten = {}
+        voortgang = {
+            'lock': threading.Lock(),
+            'totaal': len(plaatsingen_lijst),
+            'verwerkt': 0,
+            'mislukt': 0,
+            'start': time.time()
+        }
+        
+        aantal_workers = max(1, min(self.workers, len(plaatsingen_lijst)))
+        logging.info(f"Start ophalen van {len(plaatsingen_lijst)} plaatsingen met {aantal_workers} browser worker(s)")
+        
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(worker_id, taken, resultaten, voortgang, euururl, euurusername, euurpassword),
+                name=f"loon-worker-{worker_id}",
+                daemon=True
+            )
+            for worker_id in range(1, aantal_workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        alle_data = [resultaten[index] for index in sorted(resultaten) if not resultaten[index].empty]
+        logging.info(f"{len(alle_data)} van {len(plaatsingen_lijst)} plaatsingen met looncomponenten opgehaald "
+                     f"({voortgang['mislukt']} mislukt)")
         if alle_data:
             return pd.concat(alle_data, ignore_index=True)
         return pd.DataFrame()
\ No newline at end of file
@@ -0,0 +1,268 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import importlib.util
+import pandas as pd
+import logging
+import json
+import os
+import re
+
+
+# Extracts worden als Parquet (pyarrow) opgeslagen; zonder pyarrow als gecomprimeerde pickle
+STAGING_FORMAT = 'parquet' if importlib.util.find_spec('pyarrow') else 'pickle'
+
+# Periode sleutel voor extracts zonder periode (volledige exports)
+DEFAULT_PERIOD = "actueel"
+
+# Bestandsextensies van extracts
+EXTRACT_SUFFIXES = ('.parquet', '.pkl.gz')
+
+# Per tabel: de hash van de download waaruit elk extract geconverteerd is
+DIGEST_INDEX = "hashes.json"
+
+
+class StagingStore:
+    """
+    Een class voor het tijdelijk bewaren van geconverteerde extracts op schijf.
+    
+    Elk extract wordt na de type conversie per tabel en periode als gecomprimeerd
+    kolombestand weggeschreven. De load stap kan daardoor (opnieuw) vanuit staging
+    draaien zonder E-Uur opnieuw te scrapen. Per extract wordt de hash van de
+    download bewaard, zodat een identieke download niet opnieuw geconverteerd
+    hoeft te worden (zie read_by_digest). Oude extracts worden opgeruimd op basis
+    van een bewaartermijn en een maximum aantal extracts per tabel.
+    """
+    
+    def __init__(self, base_dir=None, staging_dir=None, retention_days=None, max_per_table=None, compression='zstd'):
+        """
+        Initialiseer de StagingStore.
+        
+        Args:
+            base_dir: Het basis directory pad. Als None, wordt het huidige werkdirectory gebruikt.
+            staging_dir: Directory voor de extracts. Als None, wordt 'staging' onder base_dir gebruikt.
+            retention_days: Bewaartermijn in dagen, standaard STAGING_RETENTIE_DAGEN of 7
+            max_per_table: Maximaal aantal extracts per tabel, standaard STAGING_MAX_PER_TABEL of 10
+            compression: Parquet compressie codec
+        """
+        self.base_dir = Path(base_dir) if base_dir else Path.cwd()
+        self.staging_dir = Path(staging_dir) if staging_dir else self.base_dir / "staging"
+        self.retention_days = retention_days if retention_days is not None else int(os.getenv('STAGING_RETENTIE_DAGEN', 7))
+        self.max_per_table = max_per_table if max_per_table is not None else int(os.getenv('STAGING_MAX_PER_TABEL', 10))
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+    
+    def _path(self, table, period=None):
+        """
+        Het pad van een extract voor een tabel en periode.
+        """
+        period = re.sub(r'[^\w.-]', '_', str(period or DEFAULT_PERIOD))
+        suffix = '.parquet' if STAGING_FORMAT == 'parquet' else '.pkl.gz'
+        return self.staging_dir / table / f"{period}{suffix}"
+    
+    def _extracts(self, table):
+        """
+        Alle extracts van een tabel, nieuwste eerst.
+        """
+        table_dir = self.staging_dir / table
+        if not table_dir.exists():
+            return []
+        extracts = [path for path in table_dir.iterdir() if path.is_file() and path.name.endswith(EXTRACT_SUFFIXES)]
+        return sorted(extracts, key=lambda path: path.stat().st_mtime, reverse=True)
+    
+    @staticmethod
+    def _period_from_path(path):
+        """
+        De periode sleutel uit de bestandsnaam van een extract. Alleen de bekende
+        extensie wordt eraf gehaald, want een periode kan zelf punten bevatten.
+        """
+        for suffix in EXTRACT_SUFFIXES:
+            if path.name.endswith(suffix):
+                return path.name[:-len(suffix)]
+        return path.stem
+    
+    def _load_digests(self, table):
+        """
+        Lees de hashes van de downloads per periode voor een tabel.
+        """
+        index_path = self.staging_dir / table / DIGEST_INDEX
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, encoding='utf-8') as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Hashes van staging extracts voor {table} konden niet gelezen worden: {e}")
+            return {}
+    
+    def _save_digests(self, table, digests):
+        """
+        Schrijf de hashes van de downloads per periode voor een tabel atomair weg.
+        """
+        index_path = self.staging_dir / table / DIGEST_INDEX
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as index_file:
+                json.dump(digests, index_file, indent=2)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            self.logger.warning(f"Hashes van staging extracts voor {table} konden niet opgeslagen worden: {e}")
+    
+    def write(self, df, table, period=None, digest=None):
+        """
+        Schrijf een geconverteerd extract naar staging. Een bestaand extract voor
+        dezelfde tabel en periode wordt overschreven.
+        
+        Args:
+            df: Het geconverteerde DataFrame
+            table: Naam van de tabel (of export), bijv. 'Plaatsingen_actief'
+            period: Optionele periode sleutel, bijv. '2024-01-01_2024-02-29'
+            digest: Optionele hash van de download waaruit het extract geconverteerd is
+        
+        Returns:
+            Path: Het pad van het extract, of None bij fout
+        """
+        path = self._path(table, period)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if STAGING_FORMAT == 'parquet':
+                df.to_parquet(tmp_path, index=False, compression=self.compression)
+            else:
+                df.to_pickle(tmp_path, compression='gzip')
+            os.replace(tmp_path, path)
+            self.logger.info(f"{len(df)} rijen voor {table} ({period or DEFAULT_PERIOD}) naar staging geschreven: {path}")
+        except Exception as e:
+            self.logger.error(f"Fout bij het schrijven naar staging voor {table}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return None
+        
+        digests = self._load_digests(table)
+        key = self._period_from_path(path)
+        if digest:
+            digests[key] = digest
+        else:
+            digests.pop(key, None)
+        self._save_digests(table, digests)
+        
+        self.evict(table)
+        return path
+    
+    def read_by_digest(self, table, digest):
+        """
+        Lees het extract dat uit een download met deze hash geconverteerd is,
+        zodat een identieke download niet opnieuw verwerkt hoeft te worden.
+        
+        Args:
+            table: Naam van de tabel (of export)
+            digest: De hash van de download
+        
+        Returns:
+            pandas.DataFrame: Het extract, of None als er geen extract voor deze hash is
+        """
+        if digest is None:
+            return None
+        for period, stored_digest in self._load_digests(table).items():
+            if stored_digest == digest and self._path(table, period).exists():
+                return self.read(table, period)
+        return None
+    
+    def read(self, table, period=None):
+        """
+        Lees een extract uit staging.
+        
+        Args:
+            table: Naam van de tabel (of export)
+            period: Periode sleutel; als None, wordt het meest recente extract gelezen
+        
+        Returns:
+            pandas.DataFrame: Het extract, of None als er geen extract is of bij fout
+        """
+        if period is None:
+            extracts = self._extracts(table)
+            if not extracts:
+                self.logger.error(f"Geen extract in staging gevonden voor {table}")
+                return None
+            path = extracts[0]
+        else:
+            path = self._path(table, period)
+            if not path.exists():
+                self.logger.error(f"Geen extract in staging gevonden voor {table} ({period})")
+                return None
+        
+        try:
+            if path.suffix == '.parquet':
+                df = pd.read_parquet(path, memory_map=True)
+            else:
+                df = pd.read_pickle(path, compression='gzip')
+            self.logger.info(f"{len(df)} rijen voor {table} ({self._period_from_path(path)}) uit staging gelezen")
+            return df
+        except Exception as e:
+            self.logger.error(f"Fout bij het lezen van staging extract {path}: {e}")
+            return None
+    
+    def latest_period(self, table):
+        """
+        De periode sleutel van het meest recente extract van een tabel.
+        
+        Args:
+            table: Naam van de tabel (of export)
+        
+        Returns:
+            str: De periode sleutel, of None als er geen extract is
+        """
+        extracts = self._extracts(table)
+        return self._period_from_path(extracts[0]) if extracts else None
+    
+    def list_periods(self, table):
+        """
+        Alle periode sleutels in staging voor een tabel, nieuwste eerst.
+        
+        Args:
+            table: Naam van de tabel (of export)
+        
+        Returns:
+            list: Periode sleutels
+        """
+        return [self._period_from_path(path) for path in self._extracts(table)]
+    
+    def evict(self, table=None):
+        """
+        Ruim extracts op die ouder zijn dan de bewaartermijn of boven het maximum
+        aantal per tabel vallen. Het meest recente extract van een tabel blijft
+        altijd bewaard.
+        
+        Args:
+            table: Optionele tabel; als None, worden alle tabellen opgeruimd
+        
+        Returns:
+            int: Aantal verwijderde extracts
+        """
+        if table is not None:
+            tables = [table]
+        elif self.staging_dir.exists():
+            tables = [path.name for path in self.staging_dir.iterdir() if path.is_dir()]
+        else:
+            tables = []
+        
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+        removed = 0
+        for name in tables:
+            for index, path in enumerate(self._extracts(name)):
+                if index == 0:
+                    continue
+                if index >= self.max_per_table or path.stat().st_mtime < cutoff:
+                    try:
+                        path.unlink()
+                        removed += 1
+                    except OSError as e:
+                        self.logger.warning(f"Staging extract {path} kon niet verwijderd worden: {e}")
+            
+            digests = self._load_digests(name)
+            remaining = {period: digest for period, digest in digests.items() if self._path(name, period).exists()}
+            if remaining != digests:
+                self._save_digests(name, remaining)
+        
+        if removed:
+            self.logger.info(f"{removed} verouderde extracts uit staging verwijderd")
+        return removed
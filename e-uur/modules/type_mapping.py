@@ -1,7 +1,106 @@
 import pandas as pd
+import numpy as np
 import logging
+from functools import partial
 from datetime import datetime
 
+
+# Tekstwaarden die naar een bit (True/False) worden omgezet; overige waarden worden NULL
+BIT_WAARDEN = {
+    'ja': True,
+    'true': True,
+    '1': True,
+    'nee': False,
+    'false': False,
+    '0': False,
+}
+
+# Pandas dtype na conversie per SQL type
+PANDAS_DTYPES = {
+    'int': 'int64',
+    'bigint': 'int64',
+    'decimal': 'float64',
+    'bit': 'boolean',
+    'nvarchar': 'object',
+    'date': 'object',
+    'datetime': 'datetime64[ns]',
+    'time': 'object',
+}
+
+# Dtype hints voor de Excel reader per SQL type; tekstkolommen worden niet als
+# getal ingelezen, zodat bijvoorbeeld voorloopnullen behouden blijven
+READER_DTYPES = {
+    'nvarchar': 'object',
+}
+
+
+class ConversionPlan:
+    """
+    Een eenmalig samengesteld conversieplan voor één tabel.
+    
+    Het plan bevat de geordende kolomlijst, per kolom een vooraf gebonden
+    converter, de verwachte pandas dtypes en de SQL types (bijv. voor
+    setinputsizes in de database writer).
+    """
+    
+    def __init__(self, table_name, columns, converters, pandas_dtypes, sql_types, add_datetime=False):
+        """
+        Initialiseer het ConversionPlan.
+        
+        Args:
+            table_name: De naam van de tabel
+            columns: Geordende lijst met kolomnamen
+            converters: Lijst met converter functies, in dezelfde volgorde als columns
+            pandas_dtypes: Dictionary met kolomnamen en verwachte pandas dtypes
+            sql_types: Dictionary met kolomnamen en SQL types
+            add_datetime: Of er na conversie een 'Datumtijd' kolom toegevoegd wordt
+        """
+        self.table_name = table_name
+        self.columns = columns
+        self.converters = converters
+        self.pandas_dtypes = pandas_dtypes
+        self.sql_types = sql_types
+        self.add_datetime = add_datetime
+    
+    def missing_columns(self, df):
+        """
+        Geef de kolommen uit het plan die niet in het DataFrame voorkomen.
+        """
+        available = set(df.columns)
+        return [column for column in self.columns if column not in available]
+    
+    def apply(self, df):
+        """
+        Converteer een DataFrame in één doorgang volgens het plan.
+        Alleen de kolommen uit het plan worden meegenomen; het bron DataFrame
+        wordt niet eerst gesliced of gekopieerd.
+        
+        Args:
+            df: Het DataFrame om te converteren
+            
+        Returns:
+            Het geconverteerde DataFrame
+            
+        Raises:
+            ValueError: Bij ontbrekende kolommen of fouten tijdens type conversie
+        """
+        missing = self.missing_columns(df)
+        if missing:
+            raise ValueError(f"Kolom '{missing[0]}' niet gevonden in DataFrame.")
+        
+        converted = {}
+        for column, converter in zip(self.columns, self.converters):
+            try:
+                converted[column] = converter(df[column])
+            except ValueError as e:
+                raise ValueError(f"Fout bij het omzetten van kolom '{column}' naar type '{self.sql_types[column]}': {e}")
+        
+        result = pd.DataFrame(converted, index=df.index)
+        if self.add_datetime:
+            result['Datumtijd'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return result
+
+
 class TypeMapper:
     """
     Een class voor het beheren en toepassen van type mappings voor verschillende tabellen.
@@ -129,6 +228,25 @@ class TypeMapper:
                 "Werknemer": "nvarchar",
             }
         }
+        
+        # Converter per SQL type, met signatuur (kolom_data, kolom_naam)
+        self._converters = {
+            'int': self._convert_to_int,
+            'nvarchar': lambda column_data, column_name: column_data.astype(str),
+            'decimal': lambda column_data, column_name: self._convert_to_decimal(column_data),
+            'bit': lambda column_data, column_name: self._convert_to_bit(column_data),
+            'date': lambda column_data, column_name: pd.to_datetime(column_data, errors='coerce', dayfirst=True).dt.date,
+            'datetime': lambda column_data, column_name: pd.to_datetime(column_data, errors='coerce', dayfirst=True),
+            # Alleen de tijdcomponent; foute waarden worden NaT en daarmee None
+            'time': lambda column_data, column_name: pd.to_datetime(column_data, errors='coerce').dt.time,
+            'bigint': self._convert_to_bigint,
+        }
+        
+        # Gecompileerde conversieplannen per tabel
+        self._plans = {}
+        
+        # Excel reader engine per tabel; tabellen zonder eigen engine gebruiken 'auto'
+        self._reader_engines = {}
     
     def get_type_mapping(self, table_name):
         """
@@ -151,8 +269,41 @@ class TypeMapper:
             type_mapping: Dictionary met kolomnamen en hun types
         """
         self._type_mappings[table_name] = type_mapping
+        self._plans.pop(table_name, None)
         logging.info(f"Type mapping toegevoegd voor tabel: {table_name}")
     
+    def set_reader_engine(self, table_name, engine):
+        """
+        Stel de Excel reader engine in voor een tabel.
+        
+        Args:
+            table_name: De naam van de tabel
+            engine: De engine ('openpyxl', 'calamine', 'csv' of 'auto')
+        """
+        self._reader_engines[table_name] = engine
+    
+    def get_reader_options(self, table_name):
+        """
+        Haal de reader opties op voor het inlezen van een export voor een tabel:
+        de reader engine en dtype hints op basis van de type mapping.
+        
+        Args:
+            table_name: De naam van de tabel
+            
+        Returns:
+            Dict met 'engine' en 'dtype', bruikbaar als keyword arguments voor
+            ExcelProcessor.get_df_from_excel
+        """
+        column_types = self.get_type_mapping(table_name) or {}
+        return {
+            'engine': self._reader_engines.get(table_name, 'auto'),
+            'dtype': {
+                column: READER_DTYPES[dtype]
+                for column, dtype in column_types.items()
+                if dtype in READER_DTYPES
+            },
+        }
+    
     def get_available_tables(self):
         """
         Haal een lijst op van alle beschikbare tabellen.
@@ -201,31 +352,39 @@ class TypeMapper:
         Returns:
             De geconverteerde kolom
         """
-        if dtype == 'int':
-            return self._convert_to_int(column_data, column_name)
-        elif dtype == 'nvarchar':
-            return column_data.astype(str)
-        elif dtype == 'decimal':
-            return pd.to_numeric(column_data, errors='coerce').apply(
-                lambda x: round(x, 2) if pd.notna(x) else None
-            )
-        elif dtype == 'bit':
-            return column_data.apply(
-                lambda x: True if str(x).strip().lower() in ['ja', 'true', '1'] else 
-                         (False if str(x).strip().lower() in ['nee', 'false', '0'] else None)
-            )
-        elif dtype == 'date':
-            return pd.to_datetime(column_data, errors='coerce', dayfirst=True).dt.date
-        elif dtype == 'datetime':
-            return pd.to_datetime(column_data, errors='coerce', dayfirst=True)
-        elif dtype == 'time':
-            # Converteert naar datetime en pakt alleen de tijdcomponent.
-            # 'coerce' zet foute waarden om in NaT (Not a Time), die worden als None behandeld.
-            return pd.to_datetime(column_data, errors='coerce').dt.time
-        elif dtype == 'bigint':
-            return self._convert_to_bigint(column_data, column_name)
-        else:
+        converter = self._converters.get(dtype)
+        if converter is None:
             raise ValueError(f"Onbekend datatype '{dtype}' voor kolom '{column_name}'.")
+        return converter(column_data, column_name)
+    
+    def _convert_to_decimal(self, column_data):
+        """
+        Converteer een kolom naar een getal afgerond op 2 decimalen.
+        Series.round kan bij waarden vlak bij een halve cent anders afronden dan
+        Python's round(); alleen die enkele waarden worden per cel nagerekend.
+        """
+        numeric = pd.to_numeric(column_data, errors='coerce')
+        rounded = numeric.round(2)
+        scaled = numeric * 100
+        near_half = ((scaled - np.floor(scaled)) - 0.5).abs() < 1e-6
+        if near_half.any():
+            rounded[near_half] = numeric[near_half].map(lambda x: round(x, 2))
+        return rounded
+    
+    def _convert_to_bit(self, column_data):
+        """
+        Converteer een kolom naar een nullable boolean (bit) kolom.
+        De tekstnormalisatie gebeurt alleen op de unieke waarden; daarna worden
+        de resultaten via de factorize codes over alle rijen verdeeld.
+        """
+        codes, uniques = pd.factorize(column_data.astype(str))
+        lookup = (
+            pd.Series(uniques).str.strip().str.lower()
+            .map(BIT_WAARDEN)
+            .astype('boolean')
+        )
+        values = lookup.array.take(codes, allow_fill=True)
+        return pd.Series(values, index=column_data.index, name=column_data.name)
     
     def _convert_to_int(self, column_data, column_name):
         """
@@ -269,35 +428,76 @@ class TypeMapper:
         df['Datumtijd'] = current_datetime.strftime('%Y-%m-%d %H:%M:%S')
         return df
 
+    def get_conversion_plan(self, table_name):
+        """
+        Haal het (gecachte) conversieplan op voor een tabel. Het plan wordt
+        bij de eerste aanvraag samengesteld en daarna hergebruikt.
+        
+        Args:
+            table_name: De naam van de tabel
+            
+        Returns:
+            ConversionPlan, of None als er geen type mapping is
+            
+        Raises:
+            ValueError: Bij een onbekend datatype in de mapping
+        """
+        plan = self._plans.get(table_name)
+        if plan is not None:
+            return plan
+        
+        column_types = self.get_type_mapping(table_name)
+        if column_types is None:
+            return None
+        
+        converters = []
+        for column, dtype in column_types.items():
+            converter = self._converters.get(dtype)
+            if converter is None:
+                raise ValueError(f"Onbekend datatype '{dtype}' voor kolom '{column}'.")
+            converters.append(partial(converter, column_name=column))
+        
+        plan = ConversionPlan(
+            table_name=table_name,
+            columns=list(column_types.keys()),
+            converters=converters,
+            pandas_dtypes={column: PANDAS_DTYPES[dtype] for column, dtype in column_types.items()},
+            sql_types=dict(column_types),
+            add_datetime=(table_name == 'Contract_fases'),
+        )
+        self._plans[table_name] = plan
+        return plan
+    
     def apply_conversion(self, df, table_name):
         """
         Pas type conversie toe op een DataFrame voor een specifieke tabel.
         Beperk het DataFrame tot alleen de kolommen die in de type mapping staan.
         Voeg voor Contract_fases een kolom 'Datumtijd' toe.
+        De conversie loopt via het gecompileerde conversieplan van de tabel.
         Args:
             df: Het DataFrame om te converteren
             table_name: De naam van de tabel (bepaalt welke type mapping wordt gebruikt)
         Returns:
             Het geconverteerde DataFrame, of None bij fout
         """
-        # Haal de juiste type mapping op
-        column_types = self.get_type_mapping(table_name)
-        if column_types is None:
+        # Haal het conversieplan op
+        try:
+            plan = self.get_conversion_plan(table_name)
+        except ValueError as e:
+            logging.error(f"Type conversie mislukt voor tabel '{table_name}': {e}")
+            return None
+        if plan is None:
             logging.error(f"Geen type mapping gevonden voor tabel: {table_name}")
             logging.info(f"Beschikbare tabellen: {self.get_available_tables()}")
             return None
-        # Beperk het DataFrame tot alleen de kolommen uit de mapping
-        missing_cols = [col for col in column_types.keys() if col not in df.columns]
+        missing_cols = plan.missing_columns(df)
         if missing_cols:
             logging.warning(f"Ontbrekende kolommen in DataFrame voor tabel {table_name}: {missing_cols}")
-        df = df[[col for col in column_types.keys() if col in df.columns]]
-        # Voer type conversie uit
+        # Voer type conversie uit in één doorgang
         try:
-            df = self.convert_column_types(df, column_types)
+            pd.set_option('future.no_silent_downcasting', True)
+            df = plan.apply(df)
             logging.info(f"Type conversie succesvol toegepast voor tabel: {table_name}")
-            # Voeg Datumtijd toe voor Contract_fases
-            if table_name == 'Contract_fases':
-                df = self.add_datetime_column(df)
             return df
         except Exception as e:
             logging.error(f"Type conversie mislukt voor tabel '{table_name}': {e}")
@@ -1,6 +1,7 @@
 from modules.selenium import EuurPlaatsingDownloader
 from modules.excel_processing import ExcelProcessor
 from modules.database import DatabaseManager
+from modules.staging import StagingStore
 from modules.type_mapping import TypeMapper
 from modules.config import ConfigManager
 from modules.env_tool import env_check
@@ -8,11 +9,17 @@ from modules.log import LoggerManager
 import pandas as pd
 import logging
 import time
+import sys
 import os
 
-def main():
+def main(vanaf_staging=False, sessie=None):
     """
     Hoofdfunctie voor het ophalen en verwerken van looncomponenten uit E-Uur.
+    
+    Args:
+        vanaf_staging: Indien True wordt het laatste extract uit staging geladen
+                       in plaats van opnieuw uit E-Uur te downloaden
+        sessie: Optionele gedeelde EuurSessionManager (zie alle_exports.py)
     """
     
     # Lokaal of productieomgeving bepaling
@@ -36,38 +43,47 @@ def main():
     driver = '{ODBC Driver 18 for SQL Server}'
     greit_connection_string = f'DRIVER={driver};SERVER={server};DATABASE={database};UID={username};PWD={password};Encrypt=no;TrustServerCertificate=no;Connection Timeout=30;'
 
-    # ConfigManager initialiseren
-    config_manager = ConfigManager(greit_connection_string)
-
-    # Script ID bepalen
-    script_id = config_manager.determine_script_id()
-    
-    # Logger configuratie
-    logger_config = {
-        'conn_str': greit_connection_string,
-        'customer': klant,
-        'source': bron,
-        'script': script,
-        'script_id': script_id,
-        'buffer_size': 10,
-        'flush_interval': 30,
-        'log_level': logging.INFO
-    }
-    
-    # Initialiseer LoggerManager
-    logger_manager = LoggerManager(logger_config)
-    logger_manager.start_log()
-
-    # Connectie dictionary maken
-    connection_dict = config_manager.create_connection_dict()
-
-    # Initialiseer de class-based modules
-    excel_processor = ExcelProcessor(base_dir, "stiek/file/Plaatsing.xlsx")
-    type_mapper = TypeMapper()
+    # Downloader vooraf aanmaken, zodat de browser in finally altijd afgesloten kan worden
     download_dir = os.path.join(base_dir, "stiek/file")
-    plaatsingen_downloader = EuurPlaatsingDownloader(base_dir, download_dir)
-    
+    plaatsingen_downloader = EuurPlaatsingDownloader(base_dir, download_dir, sessie=sessie)
+    database_manager = None
+    logger_manager = None
+
     try:
+        # Chrome alvast op de achtergrond starten terwijl de configuratie uit de database opgehaald wordt
+        if not vanaf_staging:
+            plaatsingen_downloader.selenium_manager.prewarm()
+        
+        # ConfigManager initialiseren
+        config_manager = ConfigManager(greit_connection_string)
+        
+        # Script ID bepalen
+        script_id = config_manager.determine_script_id()
+        
+        # Logger configuratie
+        logger_config = {
+            'conn_str': greit_connection_string,
+            'customer': klant,
+            'source': bron,
+            'script': script,
+            'script_id': script_id,
+            'buffer_size': 10,
+            'flush_interval': 30,
+            'log_level': logging.INFO
+        }
+        
+        # Initialiseer LoggerManager
+        logger_manager = LoggerManager(logger_config)
+        logger_manager.start_log()
+        
+        # Connectie dictionary maken
+        connection_dict = config_manager.create_connection_dict()
+        
+        # Initialiseer de class-based modules
+        excel_processor = ExcelProcessor(base_dir, "stiek/file/Plaatsing.xlsx")
+        staging_store = StagingStore(base_dir)
+        type_mapper = TypeMapper()
+        
         for klantnaam, (klant_connection_string, type) in connection_dict.items():
             
             if klantnaam == "Stiek":            
@@ -76,51 +92,89 @@ def main():
                 # DatabaseManager initialiseren
                 database_manager = DatabaseManager(klant_connection_string)
 
-                # Looncomponenten ophalen met nieuwe class-based downloader
-                logging.info("Start download van plaatsingen uit E-Uur")
-                success = plaatsingen_downloader.download_plaatsing(euururl, euurusername, euurpassword, "actief")
+                converted_df = None
+                digest = None
+                file_path = None
                 
-                if success:
-                    logging.info("Plaatsingen succesvol gedownload")
-                    
-                    # DataFrame uit Excel maken met nieuwe ExcelProcessor
-                    logging.info("Start Excel verwerking")
-                    result = excel_processor.get_df_from_excel()
+                if vanaf_staging:
+                    # Laatste geconverteerde extract uit staging laden, zonder E-Uur opnieuw te scrapen
+                    logging.info("Start load vanuit staging")
+                    converted_df = staging_store.read("Plaatsingen_actief")
+                else:
+                    # Looncomponenten ophalen met nieuwe class-based downloader
+                    logging.info("Start download van plaatsingen uit E-Uur")
+                    success = plaatsingen_downloader.download_plaatsing(euururl, euurusername, euurpassword, "actief")
                     
-                    if result is not None:
-                        df, file_path = result
-                        logging.info(f"Excel bestand succesvol verwerkt: {file_path}")
-
-                        # Kolommen type conversie met TypeMapper
-                        logging.info("Start type conversie")
-                        converted_df = type_mapper.apply_conversion(df, "Plaatsingen")
+                    if success:
+                        logging.info("Plaatsingen succesvol gedownload")
+                        # Export uit het geheugen (CDP capture), anders het gedownloade bestand
+                        file_path = plaatsingen_downloader.selenium_manager.last_download or excel_processor.default_excel_path
                         
-                        if converted_df is not None:
-                            logging.info("Type conversie succesvol voltooid")
-                            
-                            # Excel verwijderen met ExcelProcessor
+                        # Ongewijzigde download overslaan op basis van de inhoudshash
+                        unchanged, digest = excel_processor.is_unchanged("Plaatsingen_actief", file_path)
+                        if unchanged:
+                            logging.info("Plaatsingen export unchanged, verwerking overgeslagen")
                             excel_processor.delete_excel_file(file_path)
-                            logging.info("Excel bestand verwijderd")
-                            
-                            # Verwijder en voeg plaatsingen toe op basis van de unieke ID kolom.
-                            database_manager.clear_and_fill_table(converted_df, "Plaatsingen", "Id")
-                            logging.info("Data succesvol overgedragen naar database")
+                            continue
+                        
+                        # Geconverteerd extract van een eerder verwerkte, identieke download hergebruiken
+                        converted_df = staging_store.read_by_digest("Plaatsingen_actief", digest)
+                        
+                        if converted_df is None:
+                            # DataFrame uit Excel maken met nieuwe ExcelProcessor
+                            logging.info("Start Excel verwerking")
+                            result = excel_processor.get_df_from_excel(file_path, **type_mapper.get_reader_options("Plaatsingen"))
                             
-                        else:
-                            logging.error("Type conversie mislukt")
+                            if result is not None:
+                                df, file_path = result
+                                logging.info(f"Excel bestand succesvol verwerkt: {file_path}")
+                                
+                                # Kolommen type conversie met TypeMapper
+                                logging.info("Start type conversie")
+                                converted_df = type_mapper.apply_conversion(df, "Plaatsingen")
+                                
+                                if converted_df is not None:
+                                    logging.info("Type conversie succesvol voltooid")
+                                    
+                                    # Geconverteerd extract bewaren, zodat de load zonder nieuwe download herhaald kan worden
+                                    staging_store.write(converted_df, "Plaatsingen_actief", digest=digest)
+                                else:
+                                    logging.error("Type conversie mislukt")
+                            else:
+                                logging.error("Excel verwerking mislukt")
                     else:
-                        logging.error("Excel verwerking mislukt")
-                else:
-                    logging.error("Plaatsingen download mislukt")
+                        logging.error("Plaatsingen download mislukt")
+                
+                if converted_df is not None:
+                    # Excel verwijderen met ExcelProcessor
+                    if file_path is not None:
+                        excel_processor.delete_excel_file(file_path)
+                        logging.info("Excel bestand verwijderd")
+                    
+                    # Schrijf alleen nieuwe en gewijzigde plaatsingen weg op basis van de unieke ID kolom.
+                    if database_manager.sync_table(converted_df, "Plaatsingen", "Id") is not None:
+                        excel_processor.mark_loaded("Plaatsingen_actief", digest, len(converted_df))
+                        logging.info("Data succesvol overgedragen naar database")
+                    else:
+                        logging.error("Data overdragen naar database mislukt")
                         
     except Exception as e:
         logging.error(f"Script mislukt: {e}")
         raise
 
     finally:
+        # Verbindingsstatistieken loggen
+        if database_manager:
+            database_manager.close()
+
+        # Ongebruikte (voorgestarte) browser van een eigen sessie afsluiten
+        if sessie is None:
+            plaatsingen_downloader.selenium_manager.close_session()
+
         # Eindtijd logging en cleanup
-        logger_manager.end_log()
-        logger_manager.close()
+        if logger_manager:
+            logger_manager.end_log()
+            logger_manager.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(vanaf_staging="--vanaf-staging" in sys.argv)
\ No newline at end of file
@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# De modules worden, net als in de scripts, als 'modules.<naam>' geïmporteerd vanuit e-uur
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,214 @@
+"""
+Tests voor sync_table en de rijhashes (store_row_hashes, _delete_missing_keys).
+
+De database wordt vervangen door een nep connectie die de SQL statements
+vastlegt; de logica rond hashes, sleutels en verwijderen draait zoals in productie.
+"""
+from contextlib import contextmanager
+import logging
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyodbc", exc_type=ImportError)
+
+from modules.database import DatabaseManager
+
+
+class FakeCursor:
+    def __init__(self, database):
+        self.database = database
+        self.rowcount = -1
+        self.fast_executemany = False
+
+    def execute(self, sql, *params):
+        self.database.statements.append((sql, params))
+        if sql.startswith("DELETE"):
+            self.rowcount = self.database.deleted_rows
+
+    def executemany(self, sql, rows):
+        self.database.statements.append((sql, list(rows)))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self):
+        return FakeCursor(self.database)
+
+    def commit(self):
+        self.database.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class FakeDatabase(DatabaseManager):
+    """
+    DatabaseManager zonder SQL Server: statements worden vastgelegd en de
+    opgeslagen hashes, het aantal rijen en de writers zijn in te stellen.
+    """
+    def __init__(self, stored=None, row_count=None):
+        super().__init__("DRIVER={fake}")
+        self.statements = []
+        self.commits = 0
+        self.deleted_rows = 0
+        self.stored = dict(stored or {})
+        self.row_count = len(self.stored) if row_count is None else row_count
+        self.upserts = []
+        self.filled = []
+        self.reloads = []
+
+    @contextmanager
+    def connection(self):
+        yield FakeConnection(self)
+
+    def fetch_row_hashes(self, table):
+        return dict(self.stored)
+
+    def count_rows(self, table):
+        return self.row_count
+
+    def upsert_table(self, df, table, key_column, delete_missing=False, batch_size=1000):
+        self.upserts.append(df.copy())
+        return {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    def fill_table(self, df, table, batch_size=1000, column_types=None, writer=None, **writer_options):
+        self.filled.append((table, df.copy()))
+        return True
+
+    def drop_table(self, table):
+        self.statements.append((f"DROP TABLE {table}", ()))
+        return True
+
+    def clear_and_fill_table(self, df, table, id_column=None, batch_size=1000, atomic=False):
+        self.reloads.append((df.copy(), atomic))
+        return True
+
+
+def plaatsingen(rows):
+    return pd.DataFrame(rows, columns=["Id", "Functie"])
+
+
+def stored_hashes(df):
+    database = DatabaseManager("DRIVER={fake}")
+    keys = database._build_row_keys(df, ["Id"])
+    return dict(zip(keys, database.compute_row_hashes(df)))
+
+
+def test_only_new_and_changed_rows_are_written():
+    previous = plaatsingen([(1, "Kok"), (2, "Schoonmaker"), (3, "Chauffeur")])
+    database = FakeDatabase(stored=stored_hashes(previous))
+
+    current = plaatsingen([(1, "Kok"), (2, "Monteur"), (3, "Chauffeur"), (4, "Planner")])
+    stats = database.sync_table(current, "Plaatsingen", "Id")
+
+    assert stats == {'new': 1, 'changed': 1, 'unchanged': 2, 'deleted': 0}
+    assert database.upserts[0]["Id"].tolist() == [2, 4]
+
+
+def test_unchanged_export_writes_nothing():
+    df = plaatsingen([(1, "Kok"), (2, "Monteur")])
+    database = FakeDatabase(stored=stored_hashes(df))
+
+    stats = database.sync_table(df, "Plaatsingen", "Id")
+
+    assert stats['unchanged'] == 2
+    assert database.upserts == []
+
+
+def test_hashes_of_written_rows_are_merged():
+    database = FakeDatabase()
+
+    database.sync_table(plaatsingen([(1, "Kok"), (2, "Monteur")]), "Plaatsingen", "Id")
+
+    merge_sql, params = next(statement for statement in database.statements if "MERGE" in statement[0])
+    assert params == ("Plaatsingen", "Plaatsingen")
+    assert "NOT MATCHED BY SOURCE" not in merge_sql
+    inserted = next(rows for sql, rows in database.statements if sql.startswith("INSERT INTO #rijhashes"))
+    assert [key for key, _ in inserted] == ["1", "2"]
+    assert database.statements[-1][0] == "DROP TABLE IF EXISTS #rijhashes"
+
+
+def test_delete_missing_removes_absent_keys_and_replaces_hashes():
+    previous = plaatsingen([(1, "Kok"), (2, "Monteur"), (3, "Chauffeur")])
+    database = FakeDatabase(stored=stored_hashes(previous))
+    database.deleted_rows = 1
+
+    stats = database.sync_table(plaatsingen([(1, "Kok"), (2, "Monteur")]), "Plaatsingen", "Id", delete_missing=True)
+
+    assert stats == {'new': 0, 'changed': 0, 'unchanged': 2, 'deleted': 1}
+    staging_table, keys = database.filled[0]
+    assert staging_table.startswith("Plaatsingen_sleutels_")
+    assert keys["Id"].tolist() == [1, 2]
+
+    delete_sql = next(sql for sql, _ in database.statements if sql.startswith("DELETE"))
+    assert "NOT EXISTS" in delete_sql and "bron.[Id] = doel.[Id]" in delete_sql
+    assert f"DROP TABLE {staging_table}" in [sql for sql, _ in database.statements]
+
+    merge_sql = next(sql for sql, _ in database.statements if "MERGE" in sql)
+    assert "WHEN NOT MATCHED BY SOURCE THEN DELETE" in merge_sql
+
+
+def test_row_count_mismatch_ignores_stored_hashes():
+    df = plaatsingen([(1, "Kok"), (2, "Monteur")])
+    database = FakeDatabase(stored=stored_hashes(df), row_count=5)
+
+    stats = database.sync_table(df, "Plaatsingen", "Id", delete_missing=True)
+
+    assert stats['new'] == 2
+    assert database.upserts[0]["Id"].tolist() == [1, 2]
+
+
+def test_duplicate_keys_in_full_export_reload_table_with_warning(caplog):
+    database = FakeDatabase(stored={"1": "0" * 16})
+    df = plaatsingen([(1, "Kok"), (1, "Monteur"), (2, "Planner")])
+
+    with caplog.at_level(logging.WARNING):
+        stats = database.sync_table(df, "Plaatsingen", "Id", delete_missing=True)
+
+    assert stats == {'new': 3, 'changed': 0, 'unchanged': 0, 'deleted': 0}
+    reloaded, atomic = database.reloads[0]
+    assert atomic and len(reloaded) == 3
+    assert database.upserts == []
+    assert "volledig herladen" in caplog.text
+    merge_sql = next(sql for sql, _ in database.statements if "MERGE" in sql)
+    assert "WHEN NOT MATCHED BY SOURCE THEN DELETE" in merge_sql
+
+
+def test_duplicate_keys_in_partial_export_keep_last_row(caplog):
+    database = FakeDatabase()
+    df = plaatsingen([(1, "Kok"), (1, "Monteur"), (2, "Planner")])
+
+    with caplog.at_level(logging.WARNING):
+        stats = database.sync_table(df, "Plaatsingen", "Id")
+
+    assert stats['new'] == 2
+    assert database.upserts[0]["Functie"].tolist() == ["Monteur", "Planner"]
+    assert database.reloads == []
+    assert "dubbele sleutels" in caplog.text
+
+
+def test_missing_key_column_returns_none():
+    database = FakeDatabase()
+
+    assert database.sync_table(plaatsingen([(1, "Kok")]), "Plaatsingen", "Code") is None
+
+
+@pytest.mark.parametrize("max_overflow, expected", [(1, 3), (-1, 8)])
+def test_parallel_workers_follow_shared_pool(monkeypatch, max_overflow, expected):
+    from sqlalchemy.pool import QueuePool
+
+    database = FakeDatabase()
+    database.pool_size, database.max_overflow = 10, 10
+    engine = type("Engine", (), {"pool": QueuePool(lambda: None, pool_size=2, max_overflow=max_overflow)})()
+    monkeypatch.setitem(DatabaseManager._engines, database.connection_string, engine)
+    calls = []
+    monkeypatch.setattr(database, "fill_table", lambda *args, **options: calls.append(options) or True)
+
+    assert database.fill_table_parallel(plaatsingen([(1, "Kok")]), "Plaatsingen", workers=8)
+    assert calls[0]['workers'] == expected
@@ -0,0 +1,140 @@
+"""
+Tests voor DownloadWatcher: wachten op een download (inotify en pollen) en de
+index van newest.
+"""
+import threading
+import time
+import os
+
+import pytest
+
+from modules import download_watcher
+from modules.download_watcher import DownloadWatcher
+
+
+def write_later(path, content=b"data", delay=0.2, partial=True):
+    """
+    Schrijf een bestand na een vertraging, zoals Chrome: eerst als .crdownload
+    en daarna hernoemd naar de definitieve naam.
+    """
+    def write():
+        time.sleep(delay)
+        target = path.with_name(path.name + ".crdownload") if partial else path
+        target.write_bytes(content)
+        if partial:
+            os.replace(target, path)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(params=["inotify", "pollen"])
+def watcher_mode(request, monkeypatch):
+    if request.param == "pollen":
+        monkeypatch.setattr(download_watcher, "_libc", None)
+    elif download_watcher._libc is None:
+        pytest.skip("inotify niet beschikbaar")
+    return request.param
+
+
+def test_wait_for_returns_new_download(tmp_path, watcher_mode):
+    with DownloadWatcher(tmp_path, poll_interval=0.05) as watcher:
+        thread = write_later(tmp_path / "Plaatsing.xlsx")
+        path = watcher.wait_for(r"^Plaatsing\.xlsx$", timeout=5)
+    thread.join()
+
+    assert path == tmp_path / "Plaatsing.xlsx"
+
+
+def test_wait_for_ignores_existing_and_partial_files(tmp_path, watcher_mode):
+    (tmp_path / "Plaatsing.xlsx").write_bytes(b"oud")
+    (tmp_path / "Plaatsing (1).xlsx.crdownload").write_bytes(b"half")
+
+    with DownloadWatcher(tmp_path, poll_interval=0.05) as watcher:
+        assert watcher.wait_for(r"^Plaatsing( \(\d+\))?\.xlsx$", timeout=0.3) is None
+        thread = write_later(tmp_path / "Plaatsing (1).xlsx", delay=0.1)
+        path = watcher.wait_for(r"^Plaatsing( \(\d+\))?\.xlsx$", timeout=5)
+    thread.join()
+
+    assert path == tmp_path / "Plaatsing (1).xlsx"
+
+
+def test_wait_for_sees_overwritten_file(tmp_path, watcher_mode):
+    target = tmp_path / "Export.xlsx"
+    target.write_bytes(b"oud")
+    os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+
+    with DownloadWatcher(tmp_path, poll_interval=0.05) as watcher:
+        thread = write_later(target, b"nieuwe inhoud", partial=False)
+        path = watcher.wait_for(r"^Export\.xlsx$", timeout=5)
+    thread.join()
+
+    assert path == target
+
+
+def test_wait_for_times_out(tmp_path, watcher_mode):
+    with DownloadWatcher(tmp_path, poll_interval=0.05) as watcher:
+        start = time.monotonic()
+        assert watcher.wait_for(r"^Plaatsing\.xlsx$", timeout=0.3) is None
+
+    assert time.monotonic() - start < 2
+
+
+def test_event_overflow_falls_back_to_scan(tmp_path, monkeypatch):
+    watcher = DownloadWatcher(tmp_path).arm()
+    if watcher._fd is None:
+        pytest.skip("inotify niet beschikbaar")
+    calls = []
+
+    def overflow(timeout):
+        calls.append(timeout)
+        (tmp_path / "Plaatsing.xlsx").write_bytes(b"data")
+        return None
+
+    monkeypatch.setattr(watcher, "_read_events", overflow)
+    try:
+        path = watcher.wait_for(r"^Plaatsing\.xlsx$", timeout=5)
+    finally:
+        watcher.close()
+
+    assert path == tmp_path / "Plaatsing.xlsx"
+    assert len(calls) == 1
+
+
+def test_newest_follows_directory_changes(tmp_path):
+    watcher = DownloadWatcher(tmp_path)
+    pattern = r"^Uren_(\d+)\.xlsx$"
+    assert watcher.newest(pattern) == (None, None)
+
+    oud = tmp_path / "Uren_1.xlsx"
+    oud.write_bytes(b"1")
+    os.utime(oud, ns=(1_000_000_000, 1_000_000_000))
+    nieuw = tmp_path / "Uren_2.xlsx"
+    nieuw.write_bytes(b"2")
+    (tmp_path / "Overig.xlsx").write_bytes(b"x")
+
+    path, match = watcher.newest(pattern)
+    assert path == nieuw and match.group(1) == "2"
+
+    nieuw.unlink()
+    path, match = watcher.newest(pattern)
+    assert path == oud and match.group(1) == "1"
+
+
+def test_newest_reuses_index_while_directory_is_unchanged(tmp_path, monkeypatch):
+    (tmp_path / "Uren_1.xlsx").write_bytes(b"1")
+    watcher = DownloadWatcher(tmp_path)
+    watcher.newest(r"^Uren_\d+\.xlsx$")
+
+    scans = []
+    original_snapshot = watcher._snapshot
+    monkeypatch.setattr(watcher, "_snapshot", lambda: scans.append(1) or original_snapshot())
+
+    path, _ = watcher.newest(r"^Uren_\d+\.xlsx$")
+    assert path == tmp_path / "Uren_1.xlsx"
+    assert scans == []
+
+
+def test_newest_missing_directory(tmp_path):
+    assert DownloadWatcher(tmp_path / "bestaat_niet").newest(r".*") == (None, None)
@@ -0,0 +1,62 @@
+"""
+Tests voor het opnemen van export requests als template in EuurHttpClient.
+"""
+from urllib.parse import parse_qsl
+
+import pytest
+
+from modules.euur_client import EuurHttpClient
+
+
+@pytest.fixture
+def client(tmp_path):
+    return EuurHttpClient("https://euur.example/", tmp_path / "templates.json")
+
+
+def test_only_exact_field_values_become_placeholders(client):
+    request = {
+        'method': 'GET',
+        'url': "https://euur.example/export/1?id=11&start=1&filter={x}#1",
+    }
+
+    assert client.record_template("rapport", request, start="1")
+
+    template = client.templates["rapport"]
+    assert template['url'] == "https://euur.example/export/1?id=11&start={start}&filter={{x}}#1"
+    assert template['url'].format(start="2") == "https://euur.example/export/1?id=11&start=2&filter={x}#1"
+
+
+def test_value_in_several_fields_is_not_recorded(client):
+    request = {'url': "https://euur.example/export?page=1&start=1"}
+
+    assert not client.record_template("rapport", request, start="1")
+
+
+def test_encoded_form_values_are_recognised(client):
+    request = {
+        'method': 'POST',
+        'url': "https://euur.example/export",
+        'postData': "van=01%2F01%2F2024&tot=31%2F01%2F2024&omschrijving=van+01%2F01%2F2024",
+    }
+
+    assert client.record_template("uren", request, start_datum="01/01/2024", eind_datum="31/01/2024")
+
+    template = client.templates["uren"]
+    assert template['data'] == "van={start_datum}&tot={eind_datum}&omschrijving=van+01%2F01%2F2024"
+    data = template['data'].format(start_datum="01%2F02%2F2024", eind_datum="29%2F02%2F2024")
+    assert dict(parse_qsl(data))['van'] == "01/02/2024"
+
+
+def test_equal_values_fill_separate_fields(client):
+    request = {'url': "https://euur.example/export?van=01-01-2024&tot=01-01-2024"}
+
+    assert client.record_template("dag", request, start_datum="01-01-2024", eind_datum="01-01-2024")
+
+    assert client.templates["dag"]['url'] == "https://euur.example/export?van={start_datum}&tot={eind_datum}"
+
+
+def test_partial_match_is_not_recorded(client):
+    request = {'url': "https://euur.example/export/2024?periode=2024-01"}
+
+    assert not client.record_template("jaar", request, jaar="2024")
+    assert not client.has_template("jaar")
@@ -0,0 +1,198 @@
+"""
+Tests voor de worker pool van EuurLoonPerPlaatsingDownloader en de afgeleide
+deep link naar een plaatsing. De browser sessies worden vervangen door nep
+sessies; de wachtrij, herkansingen en volgorde draaien zoals in productie.
+"""
+import random
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("selenium")
+
+from modules import selenium as euur_selenium
+from modules.selenium import EuurLoonPerPlaatsingDownloader
+
+
+class FakeSession:
+    """
+    Vervangt EuurSessionManager: houdt bij hoe vaak de sessie gesloten wordt.
+    """
+    instances = []
+    lock = threading.Lock()
+
+    def __init__(self, euururl, euurusername, euurpassword, download_dir, headless=True, cookie_cache=True, **kwargs):
+        self.cookie_cache = cookie_cache
+        self.closed = 0
+        with FakeSession.lock:
+            FakeSession.instances.append(self)
+
+    def close(self):
+        self.closed += 1
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    FakeSession.instances = []
+    monkeypatch.setattr(euur_selenium, "EuurSessionManager", FakeSession)
+    return EuurLoonPerPlaatsingDownloader(workers=3, max_retries=2, plaatsing_url="https://euur/p/{plaatsing_id}")
+
+
+def loon_frame(plaatsing_id):
+    return pd.DataFrame({'ID': [plaatsing_id], 'Looncomponent': ['Uurloon'], 'Loon': ['12,50']})
+
+
+def plaatsingen(count):
+    return [{'ID': plaatsing_id, 'Werknemer': f"Werknemer {plaatsing_id}"} for plaatsing_id in range(1, count + 1)]
+
+
+def test_all_plaatsingen_are_processed_in_input_order(downloader, monkeypatch):
+    generator = random.Random(7)
+
+    def verwerk(sessie, plaatsing):
+        time.sleep(generator.random() / 100)
+        return loon_frame(plaatsing['ID'])
+
+    monkeypatch.setattr(downloader, "_verwerk_plaatsing", verwerk)
+
+    df = downloader.download_loon_per_plaatsing("https://euur", "gebruiker", "wachtwoord", plaatsingen(20))
+
+    assert df['ID'].tolist() == list(range(1, 21))
+    assert len(FakeSession.instances) == 3
+    assert all(not sessie.cookie_cache for sessie in FakeSession.instances)
+    assert all(sessie.closed >= 1 for sessie in FakeSession.instances)
+
+
+def test_failed_plaatsing_is_retried_with_a_fresh_session(downloader, monkeypatch):
+    pogingen = {}
+    lock = threading.Lock()
+
+    def verwerk(sessie, plaatsing):
+        with lock:
+            pogingen[plaatsing['ID']] = pogingen.get(plaatsing['ID'], 0) + 1
+            poging = pogingen[plaatsing['ID']]
+        if plaatsing['ID'] == 2 and poging == 1:
+            raise RuntimeError("inloggen mislukt")
+        return loon_frame(plaatsing['ID'])
+
+    monkeypatch.setattr(downloader, "_verwerk_plaatsing", verwerk)
+
+    df = downloader.download_loon_per_plaatsing("https://euur", "gebruiker", "wachtwoord", plaatsingen(5))
+
+    assert df['ID'].tolist() == [1, 2, 3, 4, 5]
+    assert pogingen[2] == 2
+    # De sessie van de mislukte poging is gesloten en daarna nog een keer bij het stoppen
+    assert sum(sessie.closed for sessie in FakeSession.instances) == len(FakeSession.instances) + 1
+
+
+def test_plaatsing_is_given_up_after_max_retries(downloader, monkeypatch):
+    pogingen = []
+
+    def verwerk(sessie, plaatsing):
+        if plaatsing['ID'] == 3:
+            pogingen.append(plaatsing['ID'])
+            raise RuntimeError("navigatie naar plaatsingen mislukt")
+        return loon_frame(plaatsing['ID'])
+
+    monkeypatch.setattr(downloader, "_verwerk_plaatsing", verwerk)
+
+    df = downloader.download_loon_per_plaatsing("https://euur", "gebruiker", "wachtwoord", plaatsingen(4))
+
+    assert df['ID'].tolist() == [1, 2, 4]
+    assert len(pogingen) == downloader.max_retries + 1
+
+
+def test_empty_results_are_skipped(downloader, monkeypatch):
+    monkeypatch.setattr(
+        downloader, "_verwerk_plaatsing",
+        lambda sessie, plaatsing: pd.DataFrame() if plaatsing['ID'] % 2 else loon_frame(plaatsing['ID'])
+    )
+
+    df = downloader.download_loon_per_plaatsing("https://euur", "gebruiker", "wachtwoord", plaatsingen(6))
+
+    assert df['ID'].tolist() == [2, 4, 6]
+
+
+def test_no_plaatsingen_gives_empty_frame(downloader):
+    assert downloader.download_loon_per_plaatsing("https://euur", "gebruiker", "wachtwoord", []).empty
+
+
+class FakeDriver:
+    def __init__(self, laadt=True, rijen=False):
+        self.laadt = laadt
+        self.rijen = rijen
+        self.current_url = ""
+
+    def get(self, url):
+        self.current_url = url if self.laadt else "https://euur/login"
+
+    def find_elements(self, by, value):
+        if "AssignmentcomponentTable" in value:
+            return [object()] if self.rijen and self.laadt else []
+        if "start-menu" in value:
+            return [object()] if self.laadt else []
+        return []
+
+
+class FakeSeleniumManager:
+    timeout = 1
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def wait_for_network_idle(self, **kwargs):
+        return True
+
+
+def test_derived_link_survives_empty_plaatsing(downloader):
+    downloader.plaatsing_url = "https://euur/p/{plaatsing_id}"
+    downloader._plaatsing_url_afgeleid = True
+
+    assert downloader._open_plaatsing_direct(FakeSeleniumManager(FakeDriver(rijen=False)), 12)
+    assert downloader._open_plaatsing_direct(FakeSeleniumManager(FakeDriver(rijen=True)), 13)
+    assert downloader.plaatsing_url == "https://euur/p/{plaatsing_id}"
+
+
+def test_derived_link_is_dropped_after_repeated_failures(downloader):
+    downloader.plaatsing_url = "https://euur/p/{plaatsing_id}"
+    downloader._plaatsing_url_afgeleid = True
+    manager = FakeSeleniumManager(FakeDriver(laadt=False))
+
+    for _ in range(euur_selenium.MAX_DEEP_LINK_FOUTEN - 1):
+        assert not downloader._open_plaatsing_direct(manager, 12)
+        assert downloader.plaatsing_url is not None
+
+    assert not downloader._open_plaatsing_direct(manager, 12)
+    assert downloader.plaatsing_url is None
+
+
+def test_configured_link_is_kept_after_failures(downloader):
+    manager = FakeSeleniumManager(FakeDriver(laadt=False))
+
+    for _ in range(euur_selenium.MAX_DEEP_LINK_FOUTEN + 1):
+        downloader._open_plaatsing_direct(manager, 12)
+
+    assert downloader.plaatsing_url == "https://euur/p/{plaatsing_id}"
+
+
+def test_link_template_is_derived_from_current_url(downloader):
+    downloader.plaatsing_url = None
+    driver = FakeDriver()
+    driver.current_url = "https://euur/#assignment/4711?tab={x}"
+
+    downloader._leer_plaatsing_url(FakeSeleniumManager(driver), 4711)
+
+    assert downloader.plaatsing_url == "https://euur/#assignment/{plaatsing_id}?tab={{x}}"
+    assert downloader.plaatsing_url.format(plaatsing_id=5) == "https://euur/#assignment/5?tab={x}"
+
+
+def test_ambiguous_url_is_not_used_as_template(downloader):
+    downloader.plaatsing_url = None
+    driver = FakeDriver()
+    driver.current_url = "https://euur/#assignment/11?ref=11"
+
+    downloader._leer_plaatsing_url(FakeSeleniumManager(driver), 11)
+
+    assert downloader.plaatsing_url is None
@@ -0,0 +1,96 @@
+"""
+Tests voor StagingStore: schrijven, lezen, hergebruik via de download hash en opruimen.
+"""
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from modules.staging import DIGEST_INDEX, StagingStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StagingStore(staging_dir=tmp_path, retention_days=7, max_per_table=3)
+
+
+def extract(rows=3):
+    return pd.DataFrame({'Id': range(rows), 'Functie': [f"Functie {index}" for index in range(rows)]})
+
+
+def age(path, days):
+    timestamp = time.time() - days * 86400
+    os.utime(path, (timestamp, timestamp))
+
+
+def test_write_and_read_round_trip(store):
+    df = extract()
+
+    path = store.write(df, "Plaatsingen_actief")
+
+    assert path.exists()
+    pd.testing.assert_frame_equal(store.read("Plaatsingen_actief"), df)
+    assert store.latest_period("Plaatsingen_actief") == "actueel"
+
+
+def test_read_missing_extract_returns_none(store):
+    assert store.read("Plaatsingen_actief") is None
+    assert store.read("Plaatsingen_actief", "2024-01") is None
+
+
+def test_read_by_digest(store):
+    df = extract()
+    store.write(df, "Looncomponenten", digest="abc")
+
+    pd.testing.assert_frame_equal(store.read_by_digest("Looncomponenten", "abc"), df)
+    assert store.read_by_digest("Looncomponenten", "anders") is None
+    assert store.read_by_digest("Looncomponenten", None) is None
+
+
+def test_rewrite_without_digest_forgets_old_digest(store):
+    store.write(extract(), "Looncomponenten", digest="abc")
+    store.write(extract(5), "Looncomponenten")
+
+    assert store.read_by_digest("Looncomponenten", "abc") is None
+
+
+@pytest.mark.parametrize("period", ["01.01.2024", "2024-01-01_2024-02-29", "periode 1/2024"])
+def test_period_keys_survive_round_trip(store, period):
+    df = extract()
+    store.write(df, "UrenRapportage", period=period, digest="d1")
+
+    stored_period = store.latest_period("UrenRapportage")
+    assert store.list_periods("UrenRapportage") == [stored_period]
+    pd.testing.assert_frame_equal(store.read("UrenRapportage", stored_period), df)
+    pd.testing.assert_frame_equal(store.read_by_digest("UrenRapportage", "d1"), df)
+
+
+def test_evict_keeps_max_per_table_and_newest(store, tmp_path):
+    store.max_per_table = 10
+    for index in range(5):
+        path = store.write(extract(), "UrenRapportage", period=f"2024.{index:02d}", digest=f"d{index}")
+        age(path, 5 - index)
+
+    store.max_per_table = 3
+    removed = store.evict("UrenRapportage")
+
+    assert removed == 2
+    assert store.list_periods("UrenRapportage") == ["2024.04", "2024.03", "2024.02"]
+    assert store.read_by_digest("UrenRapportage", "d0") is None
+    assert store.read_by_digest("UrenRapportage", "d4") is not None
+    assert (tmp_path / "UrenRapportage" / DIGEST_INDEX).exists()
+
+
+def test_evict_removes_expired_but_keeps_latest(store):
+    oud = store.write(extract(), "Plaatsingen", period="oud", digest="oud")
+    nieuw = store.write(extract(), "Plaatsingen", period="nieuw", digest="nieuw")
+    age(oud, 30)
+    age(nieuw, 20)
+
+    removed = store.evict()
+
+    assert removed == 1
+    assert store.list_periods("Plaatsingen") == ["nieuw"]
+    assert store.read_by_digest("Plaatsingen", "oud") is None
+    assert store.read_by_digest("Plaatsingen", "nieuw") is not None
@@ -0,0 +1,94 @@
+"""
+Tests voor de gevectoriseerde conversies en het ConversionPlan van TypeMapper.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.type_mapping import TypeMapper
+
+
+@pytest.fixture
+def type_mapper():
+    return TypeMapper()
+
+
+@pytest.mark.parametrize("value", [0.005, 0.015, 0.125, 1.005, 2.675, 1.115, 10.045, -2.675, 2.5, 100])
+def test_decimal_rounds_like_python_round(type_mapper, value):
+    converted = type_mapper._convert_to_decimal(pd.Series([value]))
+
+    assert converted.iloc[0] == round(value, 2)
+
+
+def test_decimal_matches_round_on_half_cent_sample(type_mapper):
+    generator = random.Random(42)
+    values = [generator.randint(-100000, 100000) / 1000 for _ in range(5000)]
+    values += [cents / 100 + 0.005 for cents in range(-500, 500)]
+
+    converted = type_mapper._convert_to_decimal(pd.Series(values))
+
+    assert converted.tolist() == [round(value, 2) for value in values]
+
+
+def test_decimal_invalid_values_become_nan(type_mapper):
+    converted = type_mapper._convert_to_decimal(pd.Series(["1.234", "abc", None, ""], dtype=object))
+
+    assert converted.iloc[0] == 1.23
+    assert converted.iloc[1:].isna().all()
+
+
+def test_bit_is_nullable_boolean(type_mapper):
+    column = pd.Series(["Ja", "nee", " JA ", "1", "false", "misschien", None], dtype=object)
+
+    converted = type_mapper._convert_to_bit(column)
+
+    assert str(converted.dtype) == "boolean"
+    assert converted.iloc[:5].tolist() == [True, False, True, True, False]
+    assert converted.iloc[5:].isna().all()
+
+
+def test_bit_keeps_index_and_name(type_mapper):
+    column = pd.Series(["ja", "nee"], index=[10, 20], name="Actief")
+
+    converted = type_mapper._convert_to_bit(column)
+
+    assert converted.index.tolist() == [10, 20]
+    assert converted.name == "Actief"
+
+
+def test_conversion_plan_is_cached(type_mapper):
+    assert type_mapper.get_conversion_plan("Plaatsingen") is type_mapper.get_conversion_plan("Plaatsingen")
+    assert type_mapper.get_conversion_plan("Onbekend") is None
+
+
+def test_conversion_plan_selects_and_orders_columns(type_mapper):
+    type_mapper.add_type_mapping("Test", {"Id": "bigint", "Bedrag": "decimal", "Actief": "bit"})
+    df = pd.DataFrame({"Extra": ["x", "y"], "Actief": ["Ja", "Nee"], "Bedrag": ["2.675", "1"], "Id": ["7", "8"]})
+
+    converted = type_mapper.apply_conversion(df, "Test")
+
+    assert converted.columns.tolist() == ["Id", "Bedrag", "Actief"]
+    assert converted["Id"].tolist() == [7, 8]
+    assert converted["Bedrag"].tolist() == [round(2.675, 2), 1.0]
+    assert converted["Actief"].tolist() == [True, False]
+    assert df.columns.tolist() == ["Extra", "Actief", "Bedrag", "Id"]
+
+
+def test_conversion_plan_reports_missing_columns(type_mapper):
+    type_mapper.add_type_mapping("Test", {"Id": "bigint", "Bedrag": "decimal"})
+    plan = type_mapper.get_conversion_plan("Test")
+    df = pd.DataFrame({"Id": [1]})
+
+    assert plan.missing_columns(df) == ["Bedrag"]
+    with pytest.raises(ValueError):
+        plan.apply(df)
+    assert type_mapper.apply_conversion(df, "Test") is None
+
+
+def test_invalid_bigint_values_become_zero(type_mapper):
+    converted = type_mapper._convert_to_bigint(pd.Series(["12", "x", None], dtype=object), "Id")
+
+    assert converted.dtype == np.int64
+    assert converted.tolist() == [12, 0, 0]
@@ -1,6 +1,7 @@
 from modules.selenium import EuurUrenRapportageDownloader
 from modules.excel_processing import ExcelProcessor
 from modules.database import DatabaseManager
+from modules.staging import StagingStore
 from modules.type_mapping import TypeMapper
 from modules.config import ConfigManager
 from modules.env_tool import env_check
@@ -10,11 +11,19 @@ from dateutil.relativedelta import relativedelta
 import pandas as pd
 import logging
 import time
+import sys
 import os
 
-def main(start_datum_override=None, eind_datum_override=None):
+def main(start_datum_override=None, eind_datum_override=None, vanaf_staging=False, sessie=None):
     """
     Hoofdfunctie voor het ophalen en verwerken van urenrapportages uit E-Uur.
+    
+    Args:
+        start_datum_override: Optionele begindatum (dd-mm-jjjj) voor een aangepaste periode
+        eind_datum_override: Optionele einddatum (dd-mm-jjjj) voor een aangepaste periode
+        vanaf_staging: Indien True wordt het extract uit staging geladen (de opgegeven
+                       periode, anders de meest recente) in plaats van opnieuw te downloaden
+        sessie: Optionele gedeelde EuurSessionManager (zie alle_exports.py)
     """
     
     # Lokaal of productieomgeving bepaling
@@ -38,137 +47,187 @@ def main(start_datum_override=None, eind_datum_override=None):
     driver = '{ODBC Driver 18 for SQL Server}'
     greit_connection_string = f'DRIVER={driver};SERVER={server};DATABASE={database};UID={username};PWD={password};Encrypt=no;TrustServerCertificate=no;Connection Timeout=30;'
 
-    # ConfigManager initialiseren
-    config_manager = ConfigManager(greit_connection_string)
-
-    # Script ID bepalen
-    script_id = config_manager.determine_script_id()
-    
-    # Logger configuratie
-    logger_config = {
-        'conn_str': greit_connection_string,
-        'customer': klant,
-        'source': bron,
-        'script': script,
-        'script_id': script_id,
-        'buffer_size': 10,
-        'flush_interval': 30,
-        'log_level': logging.INFO
-    }
-    
-    # Initialiseer LoggerManager
-    logger_manager = LoggerManager(logger_config)
-    logger_manager.start_log()
-
-    # Connectie dictionary maken
-    connection_dict = config_manager.create_connection_dict()
-
-    # Initialiseer de class-based modules
-    excel_processor = ExcelProcessor(base_dir)
-    type_mapper = TypeMapper()
+    # Downloader vooraf aanmaken, zodat de browser in finally altijd afgesloten kan worden
     download_dir = os.path.join(base_dir, "stiek/file")
-    uren_downloader = EuurUrenRapportageDownloader(base_dir, download_dir)
-    
-    # Verwerk aangepaste datums indien meegegeven
-    start_datum_obj = None
-    eind_datum_obj = None
-    rapportage_type = 'standaard'
+    uren_downloader = EuurUrenRapportageDownloader(base_dir, download_dir, sessie=sessie)
+    database_manager = None
+    logger_manager = None
 
-    if start_datum_override and eind_datum_override:
-        try:
-            start_datum_obj = datetime.strptime(start_datum_override, '%d-%m-%Y')
-            eind_datum_obj = datetime.strptime(eind_datum_override, '%d-%m-%Y')
-            rapportage_type = 'custom'
-            logging.warning(f"LET OP: Aangepaste datums worden gebruikt: {start_datum_override} tot {eind_datum_override}")
-        except ValueError:
-            logging.error("Ongeldig datumformaat in hardcoded datums. Gebruik dd-mm-jjjj. Script wordt gestopt.")
-            return
-    
     try:
+        # Chrome alvast op de achtergrond starten terwijl de configuratie uit de database opgehaald wordt
+        if not vanaf_staging:
+            uren_downloader.selenium_manager.prewarm()
+        
+        # ConfigManager initialiseren
+        config_manager = ConfigManager(greit_connection_string)
+        
+        # Script ID bepalen
+        script_id = config_manager.determine_script_id()
+        
+        # Logger configuratie
+        logger_config = {
+            'conn_str': greit_connection_string,
+            'customer': klant,
+            'source': bron,
+            'script': script,
+            'script_id': script_id,
+            'buffer_size': 10,
+            'flush_interval': 30,
+            'log_level': logging.INFO
+        }
+        
+        # Initialiseer LoggerManager
+        logger_manager = LoggerManager(logger_config)
+        logger_manager.start_log()
+        
+        # Connectie dictionary maken
+        connection_dict = config_manager.create_connection_dict()
+        
+        # Initialiseer de class-based modules
+        excel_processor = ExcelProcessor(base_dir)
+        staging_store = StagingStore(base_dir)
+        type_mapper = TypeMapper()
+        
+        # Verwerk aangepaste datums indien meegegeven
+        start_datum_obj = None
+        eind_datum_obj = None
+        rapportage_type = 'standaard'
+        
+        if start_datum_override and eind_datum_override:
+            try:
+                start_datum_obj = datetime.strptime(start_datum_override, '%d-%m-%Y')
+                eind_datum_obj = datetime.strptime(eind_datum_override, '%d-%m-%Y')
+                rapportage_type = 'custom'
+                logging.warning(f"LET OP: Aangepaste datums worden gebruikt: {start_datum_override} tot {eind_datum_override}")
+            except ValueError:
+                logging.error("Ongeldig datumformaat in hardcoded datums. Gebruik dd-mm-jjjj. Script wordt gestopt.")
+                return
+        
         for klantnaam, (klant_connection_string, type) in connection_dict.items():
             
             if klantnaam == "Stiek":            
                 logging.info(f"Start verwerking voor klant: {klantnaam}")
 
                 # DatabaseManager initialiseren
-                database_manager = DatabaseManager(klant_connection_string)
+                database_manager = DatabaseManager(klant_connection_string, writer="executemany")
 
-                # Urenrapportage ophalen
-                logging.info("Start download van urenrapportage uit E-Uur")
-                success = uren_downloader.download_urenrapportage(
-                    euururl, 
-                    euurusername, 
-                    euurpassword, 
-                    rapportage_type=rapportage_type,
-                    start_datum=start_datum_obj,
-                    eind_datum=eind_datum_obj
-                )
+                converted_df = None
+                file_path = None
                 
-                if success:
-                    logging.info("Urenrapportage succesvol gedownload")
+                if vanaf_staging:
+                    # Extract uit staging laden: de opgegeven periode, anders de meest recente
+                    periode = staging_store.latest_period("UrenRapportage")
+                    if start_datum_obj and eind_datum_obj:
+                        periode = f"{start_datum_obj.date()}_{eind_datum_obj.date()}"
                     
-                    # Zoek het gedownloade bestand op basis van een patroon
-                    logging.info("Zoeken naar gedownload Excel-bestand...")
-                    uren_file_dir = download_dir
-                    bestands_patroon = r"Urenrapportage_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})\.xlsx"
-                    filepath, datum_groepen = excel_processor.find_file_by_pattern(uren_file_dir, bestands_patroon)
-
-                    if filepath and datum_groepen:
-                        # Datums uit bestandsnaam halen
-                        begindatum_str, einddatum_str = datum_groepen
+                    if periode:
+                        begindatum_str, einddatum_str = periode.split("_")
                         begindatum = datetime.strptime(begindatum_str, "%Y-%m-%d").date()
                         einddatum = datetime.strptime(einddatum_str, "%Y-%m-%d").date()
-                        logging.info(f"Urenrapportage gevonden voor periode: {begindatum} tot {einddatum}")
-
-                        # DataFrame uit Excel maken met nieuwe ExcelProcessor
-                        logging.info("Start Excel verwerking")
-                        result = excel_processor.get_df_from_excel(custom_filepath=filepath)
+                        logging.info(f"Start load vanuit staging voor periode: {begindatum} tot {einddatum}")
+                        converted_df = staging_store.read("UrenRapportage", periode)
+                    else:
+                        logging.error("Geen urenrapportage extract in staging gevonden")
+                else:
+                    # Urenrapportage ophalen
+                    logging.info("Start download van urenrapportage uit E-Uur")
+                    success = uren_downloader.download_urenrapportage(
+                        euururl, 
+                        euurusername, 
+                        euurpassword, 
+                        rapportage_type=rapportage_type,
+                        start_datum=start_datum_obj,
+                        eind_datum=eind_datum_obj
+                    )
                     
-                        if result is not None:
-                            df, file_path = result
-                            logging.info(f"Excel bestand succesvol verwerkt: {file_path}")
-
-                            # Kolommen type conversie met TypeMapper
-                            logging.info("Start type conversie")
-                            converted_df = type_mapper.apply_conversion(df, "UrenRapportage")
+                    if success:
+                        logging.info("Urenrapportage succesvol gedownload")
+                        
+                        if uren_downloader.selenium_manager.last_download is not None:
+                            # Export uit het geheugen (CDP capture); de periode komt van de downloader
+                            filepath = uren_downloader.selenium_manager.last_download
+                            datum_groepen = tuple(datum.strftime("%Y-%m-%d") for datum in uren_downloader.periode)
+                        else:
+                            # Zoek het gedownloade bestand op basis van een patroon
+                            logging.info("Zoeken naar gedownload Excel-bestand...")
+                            uren_file_dir = download_dir
+                            bestands_patroon = r"Urenrapportage_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})\.xlsx"
+                            filepath, datum_groepen = excel_processor.find_file_by_pattern(uren_file_dir, bestands_patroon)
+                        
+                        if filepath and datum_groepen:
+                            # Datums uit bestandsnaam halen
+                            begindatum_str, einddatum_str = datum_groepen
+                            begindatum = datetime.strptime(begindatum_str, "%Y-%m-%d").date()
+                            einddatum = datetime.strptime(einddatum_str, "%Y-%m-%d").date()
+                            logging.info(f"Urenrapportage gevonden voor periode: {begindatum} tot {einddatum}")
                             
-                            if converted_df is not None:
-                                logging.info("Type conversie succesvol voltooid")
+                            # DataFrame uit Excel maken met nieuwe ExcelProcessor
+                            logging.info("Start Excel verwerking")
+                            result = excel_processor.get_df_from_excel(custom_filepath=filepath, **type_mapper.get_reader_options("UrenRapportage"))
+                            
+                            if result is not None:
+                                df, file_path = result
+                                logging.info(f"Excel bestand succesvol verwerkt: {file_path}")
                                 
-                                # Verwijder eerst de bestaande data voor de betreffende periode
-                                date_column_name = "Datum"
-                                if database_manager.delete_by_date_range("UrenRapportage", date_column_name, begindatum, einddatum):
+                                # Kolommen type conversie met TypeMapper
+                                logging.info("Start type conversie")
+                                converted_df = type_mapper.apply_conversion(df, "UrenRapportage")
                                 
-                                    # Voeg de nieuwe data toe
-                                    database_manager.fill_table(converted_df, "UrenRapportage")
-                                    logging.info("Data succesvol overgedragen naar database")
+                                if converted_df is not None:
+                                    logging.info("Type conversie succesvol voltooid")
                                     
-                                    # Excel verwijderen met ExcelProcessor
-                                    excel_processor.delete_excel_file(file_path)
-                                    logging.info("Excel bestand verwijderd")
+                                    # Geconverteerd extract per periode bewaren, zodat de load herhaald kan worden
+                                    staging_store.write(converted_df, "UrenRapportage", f"{begindatum}_{einddatum}")
                                 else:
-                                    logging.error("Verwijderen van bestaande data voor de periode is mislukt. Database niet bijgewerkt.")
-
+                                    logging.error("Type conversie mislukt")
                             else:
-                                logging.error("Type conversie mislukt")
+                                logging.error("Excel verwerking mislukt")
                         else:
-                            logging.error("Excel verwerking mislukt")
+                            logging.error("Geen urenrapportage bestand gevonden dat overeenkomt met het patroon.")
                     else:
-                        logging.error("Geen urenrapportage bestand gevonden dat overeenkomt met het patroon.")
-                else:
-                    logging.error("Urenrapportage download mislukt")
+                        logging.error("Urenrapportage download mislukt")
+                
+                if converted_df is not None:
+                    # Vervang de data van de periode in één transactie, na parallel laden in een staging tabel
+                    date_column_name = "Datum"
+                    if database_manager.replace_date_range(
+                        converted_df,
+                        "UrenRapportage",
+                        date_column_name,
+                        begindatum,
+                        einddatum,
+                        column_types=type_mapper.get_conversion_plan("UrenRapportage").sql_types,
+                        workers=4
+                    ):
+                        logging.info("Data succesvol overgedragen naar database")
+                        
+                        # Excel verwijderen met ExcelProcessor
+                        if file_path is not None:
+                            excel_processor.delete_excel_file(file_path)
+                            logging.info("Excel bestand verwijderd")
+                    else:
+                        logging.error("Vervangen van de data voor de periode is mislukt. Database niet bijgewerkt.")
                         
     except Exception as e:
         logging.error(f"Script mislukt: {e}", exc_info=True)
         raise
 
     finally:
+        # Verbindingsstatistieken loggen
+        if database_manager:
+            database_manager.close()
+
+        # Ongebruikte (voorgestarte) browser van een eigen sessie afsluiten
+        if sessie is None:
+            uren_downloader.selenium_manager.close_session()
+
         # Eindtijd logging en cleanup
-        logger_manager.end_log()
-        logger_manager.close()
+        if logger_manager:
+            logger_manager.end_log()
+            logger_manager.close()
 
 if __name__ == "__main__":
-    main()
+    main(vanaf_staging="--vanaf-staging" in sys.argv)
     """loop_start_date = datetime(2023, 1, 1)
     loop_end_date = datetime(2025, 6, 1)  # Stopt na de periode die in mei 2025 eindigt
     current_start_date = loop_start_date
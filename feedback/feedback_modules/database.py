@@ -50,22 +50,59 @@ def clear_table(connection_string, table):
         cursor.close()
         connection.close()
 
-def write_to_database(df, tabel, connection_string, batch_size=1000):
+def _write_with_to_sql(df, tabel, connection_string, batch_size):
     db_params = urllib.parse.quote_plus(connection_string)
     engine = create_engine(f"mssql+pyodbc:///?odbc_connect={db_params}", fast_executemany=True)
 
     total_rows = len(df)
     rows_added = 0
     
+    # Werk in batches
+    for start in range(0, total_rows, batch_size):
+        batch_df = df.iloc[start:start + batch_size]
+        # Schrijf direct naar de database
+        batch_df.to_sql(tabel, con=engine, index=False, if_exists="append", schema="dbo")
+        rows_added += len(batch_df)
+        print(f"{rows_added} rijen toegevoegd aan de tabel tot nu toe...")
+
+    return rows_added
+
+def _write_with_executemany(df, tabel, connection_string, batch_size):
+    # Directe pyodbc insert met fast_executemany, zonder type-inferentie per batch
+    column_list = ', '.join(f"[{column}]" for column in df.columns)
+    placeholders = ', '.join(['?'] * len(df.columns))
+    sql = f"INSERT INTO dbo.[{tabel}] ({column_list}) VALUES ({placeholders})"
+
+    rows_added = 0
+    connection = pyodbc.connect(connection_string)
     try:
-        # Werk in batches
-        for start in range(0, total_rows, batch_size):
+        cursor = connection.cursor()
+        cursor.fast_executemany = True
+        for start in range(0, len(df), batch_size):
             batch_df = df.iloc[start:start + batch_size]
-            # Schrijf direct naar de database
-            batch_df.to_sql(tabel, con=engine, index=False, if_exists="append", schema="dbo")
-            rows_added += len(batch_df)
+            # Ontbrekende waarden (NaN/NaT) als NULL meegeven
+            rows = list(batch_df.astype(object).where(batch_df.notna(), None).itertuples(index=False, name=None))
+            cursor.executemany(sql, rows)
+            rows_added += len(rows)
             print(f"{rows_added} rijen toegevoegd aan de tabel tot nu toe...")
-        
+        connection.commit()
+        cursor.close()
+    finally:
+        connection.close()
+
+    return rows_added
+
+def write_to_database(df, tabel, connection_string, batch_size=1000, writer="to_sql"):
+    # Kies de writer backend: 'to_sql' (SQLAlchemy) of 'executemany' (directe pyodbc)
+    writers = {
+        "to_sql": _write_with_to_sql,
+        "executemany": _write_with_executemany,
+    }
+
+    rows_added = 0
+    
+    try:
+        rows_added = writers[writer](df, tabel, connection_string, batch_size)
         print(f"DataFrame succesvol toegevoegd/bijgewerkt in de tabel: {tabel}")
     except Exception as e:
         print(f"Fout bij het toevoegen naar de database: {e}")